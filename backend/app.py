@@ -1,13 +1,45 @@
 # //backend/App.py
 
-from flask import Flask, request, jsonify
+import os
+
+# "threading" (default) or "eventlet". eventlet must patch the stdlib before
+# anything else imports sockets or threads.
+ASYNC_MODE = os.getenv("ASYNC_MODE", "threading")
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+
+from flask import Flask, request, jsonify, abort
 from flask_socketio import SocketIO, join_room, leave_room, emit
 from datetime import datetime, timezone
-import os
+import functools
 from flask_cors import CORS
-import random
 import uuid
-import requests
+import atexit
+from collections import deque
+from cards import CODE_TO_INDEX
+from hand import Hand, card_points
+import game_state
+import encoded
+from tables import Table, DealerState, SNAPSHOT_STATS
+from shoe import Shoe, SeededShoe, DEFAULT_DECKS, DEFAULT_PENETRATION
+from deck_provider import RecordedDeck
+from rules import Rules, outcome_label
+from outbox import Outbox
+from locks import TableLocks
+from lifecycle import TableLifecycle, table_size
+from deck_client import DeckClient, PrefetchDeck, DECK_API_BASE
+from timers import TimerWheel
+from lobby import Lobby
+from chat import Chat
+from history import RoundLog, History, KINDS as HISTORY_KINDS
+from snapshot import Snapshotter, read_snapshot
+from strategy_tables import StrategyTables, DEFAULT_PATH as STRATEGY_PATH
+import logs
+from metrics import Metrics, ByteCountingJson
+import profiler
+import shards
+from shards import ShardRouter
 
 
 # Chekclist of implemented features:
@@ -19,13 +51,18 @@ import requests
 
 #✅ Turn progression via advance_turn → dealer logic when players finish.
 
-#✅ Round resolution with payouts in resolve_game.
+#✅ Round resolution in dealer_plays: round_over carries each seat's result.
 
 #✅ Round reset via restart_round, including an automatic countdown.
 
 
 port = int(os.environ.get("PORT", 5000))
 
+# JSON lines on stderr (see logs.py). LOG_LEVEL is DEBUG, INFO, WARNING, ... or
+# OFF; LOG_SAMPLE keeps that fraction of tables' records below WARNING.
+logs.setup(os.getenv("LOG_LEVEL", "INFO"), sample=float(os.getenv("LOG_SAMPLE", 1)))
+log = logs.get_logger("app")
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "secret!")
 app.secret_key = "Super-secret_key"
@@ -37,117 +74,365 @@ allowed_origins = [
 ]
 
 CORS(app, supports_credentials=True, origins=allowed_origins)
-socketio = SocketIO(app, cors_allowed_origins=allowed_origins, async_mode="threading")
-
-# In-memory storage
-rooms = {}
-players = {}
 
+# This process's slice of the tables (see shards.py); one shard owns everything.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 1))
+SHARD_INDEX = int(os.getenv("SHARD_INDEX", 0))
+router = ShardRouter(SHARD_INDEX, SHARD_COUNT, shards.QUEUE)
 
-# Card values
-CARD_VALUES = {
-    "ACE": 11,
-    "2": 2, "3": 3, "4": 4, "5": 5,
-    "6": 6, "7": 7, "8": 8, "9": 9,
-    "10": 10, "JACK": 10, "QUEEN": 10, "KING": 10,
-}
+# Prometheus metrics on /metrics (see metrics.py). METRICS=0 leaves the
+# handlers unwrapped and the encoder uncounted.
+metrics = Metrics(enabled=os.getenv("METRICS", "1") == "1")
+HANDLER_SECONDS = metrics.histogram("handler_seconds", "Socket handler and game step latency", label="handler")
+DEALER_SECONDS = metrics.histogram("dealer_play_seconds", "Time for the dealer to play out its hand")
+# PROFILER=1 enables /debug/profile, which samples stacks on demand
+PROFILER = os.getenv("PROFILER", "0") == "1"
 
-DECK_API_URL = "https://deckofcardsapi.com/api/deck/new/shuffle/?deck_count=6"
+# encoded.dumps lets cached snapshots go out without being serialized again
+socket_json = ByteCountingJson(encoded) if metrics.enabled else encoded
+socketio = SocketIO(app, cors_allowed_origins=allowed_origins, async_mode=ASYNC_MODE, json=socket_json,
+                    **router.socketio_options())
 
+# In-memory storage
+rooms = {}      # table_id -> Table
+players = {}    # sid -> Seat (the same objects as Table.by_sid)
+table_locks = TableLocks()
+
+
+DECK_COUNT = int(os.getenv("DECK_COUNT", DEFAULT_DECKS))
+SHOE_PENETRATION = float(os.getenv("SHOE_PENETRATION", DEFAULT_PENETRATION))
+# same rule definitions the offline simulator (simulate.py) plays by
+RULES = Rules(DECK_COUNT, SHOE_PENETRATION, hit_soft_17=os.getenv("DEALER_HITS_SOFT_17", "0") == "1")
+
+# Default deck backend for new rooms: "local", "seeded", "recorded" or "remote"
+# (see deck_provider.py). /create-room can pick a different one per room.
+DECK_SOURCE = os.getenv("DECK_SOURCE", "local")
+# With local shoes the deck API can still supply the shuffles in the background.
+DECK_API_SEEDING = os.getenv("DECK_API_SEEDING", "0") == "1"
+deck_client = DeckClient(os.getenv("DECK_API_BASE", DECK_API_BASE), timeout=float(os.getenv("DECK_API_TIMEOUT", 5)))
+
+# Seconds to keep coalescing a table's emits after a handler returns (0 = flush at handler end)
+EMIT_WINDOW = float(os.getenv("EMIT_WINDOW", 0))
+
+# Bounds on the rooms registry (see lifecycle.py): caps evict the least recently
+# used tables, the reaper closes tables left empty or idle for their TTL (seconds).
+lifecycle = TableLifecycle(
+    max_tables=int(os.getenv("MAX_TABLES", 10_000)),
+    max_per_client=int(os.getenv("MAX_TABLES_PER_CLIENT", 50)),
+    idle_ttl=float(os.getenv("IDLE_TABLE_TTL", 3600)),
+    empty_ttl=float(os.getenv("EMPTY_TABLE_TTL", 300)),
+    create_rate=float(os.getenv("TABLE_CREATE_RATE", 1)),
+    create_burst=int(os.getenv("TABLE_CREATE_BURST", 60)),
+)
+REAP_INTERVAL = float(os.getenv("REAP_INTERVAL", 30))
+
+# Seats per table, and the lobby that indexes tables with free seats (see lobby.py).
+# Lobby subscribers get one batched diff per LOBBY_INTERVAL seconds at most.
+TABLE_SEATS = int(os.getenv("TABLE_SEATS", 7))
+LOBBY_INTERVAL = float(os.getenv("LOBBY_INTERVAL", 1))
+LOBBY_ROOM = "lobby"
+lobby = Lobby(TABLE_SEATS)
+
+# Chat (see chat.py): the last CHAT_HISTORY messages per table and CHAT_GLOBAL_HISTORY
+# global ones are kept for joiners; new messages go out in one batch per channel every
+# CHAT_INTERVAL seconds. Each socket may send CHAT_RATE messages a second, CHAT_BURST at once.
+CHAT_INTERVAL = float(os.getenv("CHAT_INTERVAL", 0.1))
+# names only the server speaks as; global chat refuses them (table chat uses the seat's name)
+RESERVED_CHAT_NAMES = frozenset(("system", "dealer"))
+chat = Chat(
+    history=int(os.getenv("CHAT_HISTORY", 50)),
+    global_history=int(os.getenv("CHAT_GLOBAL_HISTORY", 100)),
+    rate=float(os.getenv("CHAT_RATE", 1)),
+    burst=int(os.getenv("CHAT_BURST", 5)),
+    max_length=int(os.getenv("CHAT_MAX_LENGTH", 500)),
+)
+
+# Per-table deadlines in seconds, all on one timer wheel (see timers.py); 0 turns one off.
+# A turn that sees no action for TURN_TIMEOUT stays; RESTART_DELAY after a round the
+# hands are cleared and BETTING_WINDOW later the seats that bet are dealt in.
+TURN_TIMEOUT = float(os.getenv("TURN_TIMEOUT", 30))
+RESTART_DELAY = float(os.getenv("RESTART_DELAY", 5))
+BETTING_WINDOW = float(os.getenv("BETTING_WINDOW", 15))
+timers = TimerWheel(tick=float(os.getenv("TIMER_TICK", 0.05)))
+
+# Hit/stand tables for the "hint" event, built offline by strategy_tables.py.
+# The game runs without hints if the file is missing.
+try:
+    strategy = StrategyTables(os.getenv("STRATEGY_TABLES", STRATEGY_PATH))
+except (OSError, ValueError) as e:
+    log.warning("strategy tables unavailable, hints disabled", error=str(e))
+    strategy = None
+
+# Append-only round history (see history.py), off unless HISTORY_DIR is set.
+# Each shard writes its own segments; HISTORY_FSYNC_INTERVAL bounds what a crash loses.
+HISTORY_DIR = os.getenv("HISTORY_DIR", "")
+history = None
+if HISTORY_DIR:
+    history = RoundLog(HISTORY_DIR, prefix=f"rounds-s{SHARD_INDEX}",
+                       fsync_interval=float(os.getenv("HISTORY_FSYNC_INTERVAL", 1)))
+    atexit.register(history.close)
+
+# Table snapshots (see snapshot.py), off unless SNAPSHOT_PATH is set. The tables are
+# restored from it at startup and it is rewritten every SNAPSHOT_INTERVAL seconds.
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "")
+if SNAPSHOT_PATH and SHARD_COUNT > 1:
+    SNAPSHOT_PATH = f"{SNAPSHOT_PATH}.s{SHARD_INDEX}"
+snapshots = None
+if SNAPSHOT_PATH:
+    snapshots = Snapshotter(SNAPSHOT_PATH, rooms, table_locks, float(os.getenv("SNAPSHOT_INTERVAL", 10)))
+# Restored seats are held for their players this long, then dropped if nobody rejoined.
+RESTORE_GRACE = float(os.getenv("RESTORE_GRACE", 120))
+
+def locked_state(table_id):
+    """The table's current snapshot, or None if it is gone. Taken under the
+    table's lock: a delayed outbox flush calls this from its own thread."""
+    with table_locks(table_id):
+        room = rooms.get(table_id)
+        return room.state() if room is not None else None
+
+
+outbox = Outbox(
+    send=lambda event, payload, room, skip_sid: socketio.emit(event, payload, room=room, skip_sid=skip_sid),
+    snapshot=lambda table_id: locked_state(table_id),
+    window=EMIT_WINDOW,
+    spawn=socketio.start_background_task,
+    sleep=socketio.sleep,
+)
+
+
+def handler_table(args):
+    """table_id a socket handler acts on: from its payload, else the sender's seat."""
+    data = args[0] if args and isinstance(args[0], dict) else {}
+    seat = players.get(request.sid)
+    return data.get("table_id") or (seat.table_id if seat else None)
+
+
+def table_handler(handler):
+    """Serialize a socket handler on its table's lock and coalesce its emits.
+    The outbox flushes before the lock is released, so seq order is preserved.
+    The table counts as used for the idle reaper and LRU eviction."""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        table_id = handler_table(args)
+        with table_locks(table_id):
+            try:
+                with outbox.batch():
+                    return handler(*args, **kwargs)
+            finally:
+                room = rooms.get(table_id)
+                if room is not None:
+                    lifecycle.touch(table_id, len(room.seats))
+    return wrapper
+
+
+# handlers another shard may forward to this one, by event name
+routed_handlers = {}
+
+
+def sharded(event):
+    """Run a socket handler here if this shard owns its table, else forward
+    the event to the owning shard."""
+    def decorator(handler):
+        routed_handlers[event] = handler
+
+        @functools.wraps(handler)
+        def wrapper(*args):
+            table_id = handler_table(args) or router.remote_seats.get(request.sid)
+            if router.owns(table_id):
+                return handler(*args)
+            if event == "join":
+                router.remote_seats[request.sid] = table_id
+            elif event == "disconnect":
+                router.remote_seats.pop(request.sid, None)
+            # disconnect's only argument is the reason, which the handler does not take
+            data = args[0] if args and event != "disconnect" else None
+            router.forward(table_id, event, request.sid, data)
+        return wrapper
+    return decorator
+
+
+def run_routed(event, sid, data):
+    """Run an event forwarded by another shard as if its client were connected here."""
+    if event == "start_game":
+        with app.test_request_context("/start-game", method="POST", json=data):
+            return start_game()
+    handler = routed_handlers[event]
+    with app.test_request_context("/socket.io"):
+        request.sid = sid
+        request.namespace = "/"
+        return handler(data) if data is not None else handler()
 
 
 # Utility Functions
 
-def create_deck():
-    """Fetch or build a shuffled deck. When using local fallback, include 'code' and 'image'
-    fields so frontend can render an external/static image for each card."""
+def seed_shoe_from_api(shoe):
+    """Fetch a shuffled shoe from the deck API (one request for the whole shoe)
+    and queue it as the shoe's next order. Runs in a background thread."""
     try:
-        resp = requests.get(DECK_API_URL, timeout=5)
-        resp.raise_for_status()
-        deck_id = resp.json().get("deck_id")
-        return {"deck_id": deck_id, "cards": []}
+        deck_id = deck_client.new_deck(shoe.decks)
+        cards = deck_client.draw(deck_id, len(shoe))
+        shoe.queue_order(CODE_TO_INDEX[c["code"]] for c in cards)
     except Exception as e:
-        print(f"Deck API failed, using local deck: {e}")
-        suits = ["HEARTS", "DIAMONDS", "CLUBS", "SPADES"]
-        ranks = list(CARD_VALUES.keys())
-
-        # map long rank / short code used by deckofcards api static images
-        rank_code_map = {
-            "ACE": "A", "JACK": "J", "QUEEN": "Q", "KING": "K",
-            # numeric ranks keep their number; use "10" for tens
-            "10": "10", "2": "2", "3": "3", "4": "4", "5": "5",
-            "6": "6", "7": "7", "8": "8", "9": "9"
-        }
-
-        suit_code_map = {
-            "HEARTS": "H",
-            "DIAMONDS": "D",
-            "CLUBS": "C",
-            "SPADES": "S"
-        }
-
-        cards = []
-        for r in ranks:
-            for s in suits:
-                rank_code = rank_code_map.get(r, r)
-                suit_code = suit_code_map.get(s, s[0])
-                code = f"{rank_code}{suit_code}"
-                image = f"httpa://deckofcardsapi.com/static/img.{code}.png"
-                cards.append({"value": r, "suit": s, "code": code, "image": image})
-        # for multiplayer 6 pairity decks in DECK_API_URL;
-        cards = cards * 6
-        random.shuffle(cards)
-        return {"deck_id": None, "cards": cards}
+        log.warning("deck API seeding failed, keeping local shuffle", error=str(e))
+
+
+def parse_deck_config(config=None):
+    """Check a per-room deck config such as {"source": "seeded", "seed": 42,
+    "decks": 2} and fill in the defaults, without building anything. Raises
+    ValueError, KeyError or TypeError for an unknown source or bad options."""
+    config = dict(config or {})
+    source = config.setdefault("source", DECK_SOURCE)
+    if source not in ("local", "remote", "seeded", "recorded"):
+        raise ValueError(f"Unknown deck source: {source}")
+    config["decks"] = decks = int(config.get("decks", DECK_COUNT))
+    config["penetration"] = penetration = float(config.get("penetration", SHOE_PENETRATION))
+    if decks < 1:
+        raise ValueError("A shoe needs at least one deck.")
+    if not 0 < penetration <= 1:
+        raise ValueError("Penetration must be in (0, 1].")
+    if source == "seeded":
+        config["seed"] = int(config.get("seed", 0))
+    if source == "recorded":
+        config["codes"] = codes = list(config.get("codes") or [])
+        unknown = [code for code in codes if code not in CODE_TO_INDEX]
+        if unknown:
+            raise ValueError(f"Unknown card codes: {unknown}")
+    return config
+
+
+def create_deck(config=None):
+    """Build the table's DeckProvider from an optional per-room config (see
+    parse_deck_config). Cards carry 'code' and 'image' fields so the frontend
+    can render the deckofcardsapi static image for each card."""
+    config = parse_deck_config(config)
+    source, decks, penetration = config["source"], config["decks"], config["penetration"]
+
+    if source == "seeded":
+        return SeededShoe(config["seed"], decks, penetration)
+    if source == "recorded":
+        return RecordedDeck.from_codes(config["codes"])
+
+    shoe = Shoe(decks, penetration)
+    if source == "remote":
+        return PrefetchDeck(deck_client, decks, fallback=shoe, spawn=socketio.start_background_task)
+    if DECK_API_SEEDING:
+        socketio.start_background_task(seed_shoe_from_api, shoe)
+    return shoe
+
+
+@metrics.timed(HANDLER_SECONDS, "draw_card")
+def draw_card(table_id):
+    """Draw a card from the table's deck. Returns dict containing value,suit,code,image."""
+    return rooms[table_id].deck.draw_card()
 
 
-def draw_card(table_id):
-    """Draw a card from deck (API or local). Returns dict containing value,suit,code,image."""
-    room = rooms[table_id]
-    deck = room["deck"]
-
-    # If we have an API deck_id, prefer drawing from the API and return the image + code.
-    if deck.get("deck_id"):  # API deck
-        try:
-            resp = requests.get(
-                f"https://deckofcardsapi.com/api/deck/{deck['deck_id']}/draw/?count=1",
-                timeout=5
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            if data.get("success") and data.get("cards"):
-                api_card = data["cards"][0]
-                # Provide consistent fields for frontend
-                return {
-                    "value": api_card.get("value"),
-                    "suit": api_card.get("suit"),
-                    "code": api_card.get("code"),
-                    "image": api_card.get("image") or (api_card.get("images") or {}).get("png")
-                    }
-        except Exception as e:
-            print(f"API draw failed, fallback: {e}")
-
-    # Fallback/local
-    if not deck.get("cards"):
-        deck.update(create_deck())
-
-    # Local card objects already include value,suit,code,image per create_deck()
-    return deck["cards"].pop()
-
-def calculate_score(hand):
-    score, aces = 0, 0
-    for card in hand:
-        score += CARD_VALUES.get(card["value"], 0)
-        if card["value"] == "ACE":
-            aces += 1
-    while score > 21 and aces:
-        score -= 10
-        aces -= 1
-    return score
+def deal_round(table_id, seats):
+    """Reserve and deal the whole opening round in one draw.
+    Returns (seat_hands, dealer_hand) with one 2-card hand per seat."""
+    return rooms[table_id].deck.deal_round(seats)
+
+def client_key():
+    """Who is creating a table, for the per-client limits: the remote address,
+    else the socket."""
+    return request.remote_addr or getattr(request, "sid", None)
+
+
+def evict_table(table_id, reason):
+    """Close a table: tell its players, drop their seats and free its state.
+    Returns False without waiting if a handler holds the table's lock (or a
+    table sharing its stripe); the reaper retries on its next pass."""
+    lock = table_locks(table_id)
+    if not lock.acquire(blocking=False):
+        return False
+    try:
+        with table_locks.registry:
+            room = rooms.pop(table_id, None)
+            for sid in room.by_sid if room else ():
+                players.pop(sid, None)
+        if room is None:
+            lifecycle.forget(table_id, reason)
+            return False
+        timers.cancel(room.timer)
+        lobby.remove(table_id)
+        chat.forget(table_id)
+        socketio.emit("room_not_found", {"table_id": table_id, "reason": reason}, room=table_id)
+        socketio.close_room(table_id)
+        lifecycle.forget(table_id, reason, table_size(room))
+    finally:
+        lock.release()
+    log.info("table evicted", table_id=table_id, reason=reason)
+    return True
+
+
+def evict_tables(victims, reason):
+    for table_id in victims:
+        evict_table(table_id, reason)
+
+
+def lobby_update(room):
+    """Tell the lobby the table's current seats and phase."""
+    lobby.update(room.table_id, len(room.seats), room.stakes, "playing" if room.game_started else "betting")
+
+
+def publish_lobby_diff():
+    """Send lobby subscribers what changed since the last diff, if anything did."""
+    diff = lobby.drain()
+    if diff:
+        socketio.emit("lobby_update", diff, room=LOBBY_ROOM)
+
+
+def publish_lobby():
+    """Background loop publishing a lobby diff every LOBBY_INTERVAL."""
+    while True:
+        socketio.sleep(LOBBY_INTERVAL)
+        publish_lobby_diff()
+
+
+def say(table_id, message):
+    """Send a System chat message to the table now, in order with the state
+    events around it, and keep it in the table's recent messages."""
+    outbox.emit("chat_message", chat.record(table_id, "System", message), table_id)
+
+
+def publish_chat_batches():
+    """Send each channel the chat messages posted since the last batch, one
+    ``chat_batch`` emit per channel. Global messages go to every socket."""
+    for table_id, messages in chat.drain():
+        if table_id is None:
+            socketio.emit("chat_batch", {"messages": messages})
+        else:
+            socketio.emit("chat_batch", {"table_id": table_id, "messages": messages}, room=table_id)
+
+
+def publish_chat():
+    """Background loop publishing chat batches every CHAT_INTERVAL."""
+    while True:
+        socketio.sleep(CHAT_INTERVAL)
+        publish_chat_batches()
+
+
+def parse_stakes(value):
+    """Minimum bet from a request: a non-negative number, 0 when missing.
+    Raises ValueError otherwise."""
+    stakes = float(value or 0)
+    if not stakes >= 0 or stakes == float("inf"):
+        raise ValueError(f"Invalid stakes: {value}")
+    return int(stakes) if stakes.is_integer() else stakes
+
+
+def reap_tables():
+    """Background loop closing tables that stayed empty or idle past their TTL."""
+    while True:
+        socketio.sleep(REAP_INTERVAL)
+        for table_id, reason in lifecycle.expired():
+            evict_table(table_id, reason)
+        chat.expire()
+
 
 def emit_error(message, room=None):
     """Emit an error socket event."""
     if room:
-        socketio.emit("error_message", {"error": message}, room=room)
+        outbox.emit("error_message", {"error": message}, room)
     else:
         emit("error_message", {"error": message})
 
@@ -156,31 +441,48 @@ def emit_error(message, room=None):
 # Routes
 @app.route("/create-room", methods=["POST"])
 def create_room():
+    data = request.get_json(silent=True) or {}
+    try:
+        deck_config = parse_deck_config(data.get("deck"))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": f"Invalid deck config: {e}"}), 400
+    try:
+        stakes = parse_stakes(data.get("stakes"))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    # only a valid request spends a create token, and only then is a deck built
+    client = client_key()
+    if not lifecycle.allow_create(client):
+        return jsonify({"error": "Too many new tables, try again later"}), 429
+    deck = create_deck(deck_config)
+
     table_id = str(uuid.uuid4())
-    rooms[table_id] = {
-        "players": {},         # keyed by player_id -> { sid, username }
-        "players_data": {},    # keyed by player_id -> per-round data
-        "deck": create_deck(),
-        "dealer": {"hand": [], "score": 0},
-        "bets": {},
-        "game_started": False,
-        "turn_order": [],
-        "current_turn_index": 0,
-    }
+    while not router.owns(table_id):
+        table_id = str(uuid.uuid4())
+    with table_locks.registry:
+        room = rooms[table_id] = Table(table_id, deck, stakes)
+    lobby_update(room)
+    evict_tables(lifecycle.created(table_id, client), "cap")
     return jsonify({"table_id": table_id})
 
 @app.route("/start-game", methods=["POST"])
 def start_game():
     data = request.get_json() or {}
     table_id = data.get("table_id") or data.get("tableId")
+    if table_id and not router.owns(table_id):
+        router.forward(table_id, "start_game", None, data)
+        return jsonify({"message": "Game start forwarded", "table_id": table_id}), 202
     if not table_id or table_id not in rooms:
         return jsonify({"error": "Invalid table"}), 400
 
-    room = rooms[table_id]
-    if not room.get("players"):
-        return jsonify({"error": "No players in room"}), 400
+    with table_locks(table_id), outbox.batch():
+        room = rooms[table_id]
+        if not room.seats:
+            return jsonify({"error": "No players in room"}), 400
+        if room.game_started:
+            return jsonify({"error": "Round already in progress"}), 400
 
-    start_game_internal(table_id)
+        start_game_internal(table_id)
 
     return jsonify({
         "message": "Game started",
@@ -189,27 +491,146 @@ def start_game():
 
 
 
+@app.route("/emit-stats", methods=["GET"])
+def emit_stats():
+    """Emits requested by handlers vs actually sent after coalescing, per event
+    type, and how often a game_state snapshot came from the cache."""
+    requested, sent = outbox.stats()
+    return jsonify({"requested": requested, "sent": sent, "snapshots": dict(SNAPSHOT_STATS)})
+
+
+@app.route("/table-stats", methods=["GET"])
+def table_stats():
+    """Size of the in-memory registries, plus tables created, evicted (by
+    reason) and refused by the rate limit, and the bytes evictions reclaimed."""
+    return jsonify({"tables": len(rooms), "players": len(players), "locks": len(table_locks),
+                    **lifecycle.stats})
+
+
+metrics.gauge("tables", "Tables in this process", lambda: len(rooms))
+metrics.gauge("seated_players", "Sockets seated at a table", lambda: len(players))
+metrics.gauge("sockets", "Connected Engine.IO sockets", lambda: len(socketio.server.eio.sockets))
+metrics.counter("emits_requested_total", "Events handlers asked to emit", lambda: outbox.stats()[0], "event")
+metrics.counter("emits_total", "Events emitted after coalescing", lambda: outbox.stats()[1], "event")
+if metrics.enabled:
+    metrics.counter("emit_packets_total", "Socket.IO packets encoded", lambda: socket_json.packets)
+    metrics.counter("emit_bytes_total", "Bytes of Socket.IO packets encoded, once per emit before fan-out",
+                    lambda: socket_json.bytes)
+metrics.counter("snapshot_cache_total", "game_state snapshot lookups", lambda: dict(SNAPSHOT_STATS), "result")
+metrics.counter("deck_api_requests_total", "Deck API requests by result",
+                lambda: {k: deck_client.stats[k] for k in ("ok", "error", "circuit_open")}, "result")
+metrics.counter("deck_cards_total", "Cards dealt by remote decks, from the API buffer or the local fallback",
+                lambda: {"buffered": deck_client.stats["buffered_cards"],
+                         "fallback": deck_client.stats["fallback_cards"]}, "source")
+metrics.counter("tables_created_total", "Tables created", lambda: lifecycle.stats["created"])
+metrics.counter("tables_evicted_total", "Tables closed by the reaper or the caps",
+                lambda: {k[len("evicted_"):]: v for k, v in lifecycle.stats.items() if k.startswith("evicted_")},
+                "reason")
+metrics.counter("table_reclaimed_bytes_total", "Approximate bytes freed by evictions",
+                lambda: lifecycle.stats["reclaimed_bytes"])
+if history:
+    metrics.counter("history_records_total", "Round history records written, by kind",
+                    lambda: {kind: history.stats[kind] for kind in HISTORY_KINDS}, "kind")
+    metrics.counter("history_bytes_total", "Bytes of round history written", lambda: history.stats["bytes"])
+    metrics.counter("history_fsyncs_total", "Round history fsyncs", lambda: history.stats["fsyncs"])
+if snapshots:
+    metrics.gauge("snapshot_tables", "Tables in the last snapshot", lambda: snapshots.stats["tables"])
+    metrics.gauge("snapshot_seconds", "Time the last snapshot took", lambda: snapshots.stats["seconds"])
+    metrics.counter("snapshot_tables_encoded_total", "Tables encoded for snapshots; unchanged tables reuse their bytes",
+                    lambda: snapshots.stats["encoded"])
+metrics.counter("chat_messages_total", "Chat messages posted, by kind", lambda: {
+    kind: chat.stats[kind] for kind in ("player", "global", "system")}, "kind")
+metrics.counter("chat_rate_limited_total", "Chat messages refused by the per-socket rate limit",
+                lambda: chat.stats["rate_limited"])
+metrics.counter("chat_dropped_total", "Chat messages dropped from an overfull batch", lambda: chat.stats["dropped"])
+metrics.counter("chat_batches_total", "chat_batch emits", lambda: chat.stats["batches"])
+metrics.gauge("lobby_tables", "Tables in the lobby index", lambda: len(lobby))
+metrics.gauge("timers", "Pending turn, betting and restart deadlines", lambda: len(timers))
+metrics.counter("timers_fired_total", "Deadlines that came due", lambda: timers.fired)
+metrics.counter("shard_events_total", "Events forwarded to and received from other shards",
+                lambda: {"forwarded": router.forwarded, "received": router.received}, "direction")
+
+
+@app.route("/tables", methods=["GET"])
+def list_tables():
+    """Tables with a free seat, fullest first, filtered by ?stakes= and
+    ?phase= (betting or playing). Pass the returned ``next`` as ?cursor= for
+    the following page of ?limit= (default 50, at most 200)."""
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    try:
+        rows, cursor = lobby.page(request.args.get("stakes", type=float), request.args.get("phase"),
+                                  request.args.get("cursor"), limit)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    return jsonify({"tables": rows, "next": cursor, "total": len(lobby)})
+
+
+@app.route("/history/<table_id>", methods=["GET"])
+def table_history(table_id):
+    """The table's last ?limit= (default 20, at most 200) recorded rounds, or
+    just ?round=, each with the seats whose recorded result does not replay."""
+    if history is None:
+        abort(404)
+    history.flush()
+    round_no = request.args.get("round", type=int)
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 200)
+    rounds = deque(History(HISTORY_DIR).rounds(table_id, round_no), maxlen=limit)
+    return jsonify({"table_id": table_id,
+                    "rounds": [{**r.view(), "mismatches": r.mismatches(RULES)} for r in rounds]})
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Everything above plus the latency histograms, in the Prometheus text format."""
+    if not metrics.enabled:
+        abort(404)
+    return metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.route("/debug/profile", methods=["GET"])
+def profile():
+    """Sample every thread for ?seconds= (default 5, at most 60) and return the
+    ?top= hottest stacks in collapsed format, ready for flamegraph.pl."""
+    if not PROFILER:
+        abort(404)
+    try:
+        seconds = float(request.args.get("seconds", 5))
+        top = int(request.args.get("top", 50))
+    except ValueError:
+        return jsonify({"error": "seconds and top must be numbers"}), 400
+    if not 0 < seconds < float("inf") or top < 1:
+        return jsonify({"error": "seconds and top must be positive"}), 400
+    stacks = profiler.sample(min(seconds, 60.0), include_idle=request.args.get("idle") == "1")
+    return profiler.collapsed(stacks, top), 200, {"Content-Type": "text/plain"}
+
 
 # Socket Events
 @socketio.on("connect")
 def on_connect():
-    print("🔌 Client connected:", request.sid)
+    log.info("client connected", sid=request.sid)
+    backlog = chat.backlog(None)
+    if backlog:
+        emit("chat_history", {"table_id": None, "messages": backlog})
 
 @socketio.on("disconnect")
-def on_disconnect():
+@sharded("disconnect")
+@metrics.timed(HANDLER_SECONDS, "disconnect")
+@table_handler
+def on_disconnect(reason=None):
+    # python-socketio passes the disconnect reason; older releases pass nothing
     sid = request.sid
-    print("❌ Client disconnected:", sid)
-    p = players.pop(sid, None)
-    if p:
-        table_id = p.get("table_id")
-        player_id = p.get("player_id")
-        if table_id in rooms:
-            room = rooms[table_id]
-            room.get("players", {}).pop(player_id, None)
-            room.get("players_data", {}).pop(player_id, None)
-            emit_game_state(room, table_id)
+    log.info("client disconnected", sid=sid)
+    with table_locks.registry:
+        seat = players.pop(sid, None)
+    room = rooms.get(seat.table_id) if seat else None
+    if room and room.remove_seat(sid):
+        emit_delta(room.table_id, "player_left", game_state.make_delta(room, playerId=seat.player_id))
+        lobby_update(room)
 
 @socketio.on("join")
+@sharded("join")
+@metrics.timed(HANDLER_SECONDS, "join")
+@table_handler
 def on_join(data):
     username = data.get("username")
     table_id = data.get("table_id")
@@ -217,310 +638,497 @@ def on_join(data):
 
     if not username or not table_id:
         return emit_error("Invalid join request")
+    if not isinstance(username, str) or username.strip().lower() in RESERVED_CHAT_NAMES:
+        return emit_error("That name is reserved")
 
 
-    # Create room if needed
-    if table_id not in rooms:
-        rooms[table_id] = {
-            "players": {},
-            "players_data": {},
-            "deck": create_deck(),
-            "dealer": {"hand": [], "score": 0},
-            "bets": {},
-            "game_started": False,
-            "turn_order": [],
-            "current_turn_index": 0,
-        }
+    # Create room if needed, then seat the player (a rejoin keeps the seat and hand)
+    victims = ()
+    with table_locks.registry:
+        room = rooms.get(table_id)
+        if room is None:
+            try:
+                stakes = parse_stakes(data.get("stakes"))
+            except (ValueError, TypeError) as e:
+                return emit_error(str(e))
+            client = client_key()
+            if not lifecycle.allow_create(client):
+                return emit_error("Too many new tables, try again later")
+            room = rooms[table_id] = Table(table_id, create_deck(), stakes)
+            victims = lifecycle.created(table_id, client)
+        elif player_id not in room.seats and len(room.seats) >= TABLE_SEATS:
+            return emit_error("Table is full")
+        seat = players[request.sid] = room.add_seat(player_id, username, request.sid)
+    # other tables' locks must not be taken while holding the registry
+    evict_tables(victims, "cap")
+    lobby_update(room)
 
-    room = rooms[table_id]
     join_room(table_id)
+    backlog = chat.backlog(table_id)
 
-    # register globally by socket sid
-    players[request.sid] = {"username": username, "player_id": player_id, "table_id": table_id}
-
-    # register in room keyed by player_id (so frontend can index by playerId)
-    room["players"][player_id] = {"sid": request.sid, "username": username}
-
-    # ensure players_data has entry for this player (useful pre-game)
-    if player_id not in room.get("players_data", {}):
-        room["players_data"][player_id] = {"username": username, "hand": [], "score": 0, "bet": 0}
-        # add to turn order only if not present
-        if player_id not in room.get("turn_order", []):
-            room["turn_order"].append(player_id)
-
-    print(f"[JOIN] {username} joined table {table_id} with player_id={player_id}")
-    print("[DEBUG] Room snapshot before emit_game_state:")
-    print(f"  players: {list(room['players'].keys())}")
-    print(f"  players_data: {list(room.get('players_data', {}).keys())}")
+    log.info("player joined", table_id=table_id, player_id=player_id, username=username)
+    log.debug("seats before game_state", table_id=table_id, seats=lambda: list(room.seats))
 
     # notify table
-    socketio.emit("chat_message", {"username": "System", "message": f"{username} joined the table."}, room=table_id)
-    emit("joined_room", {"table_id": table_id}, room=request.sid)
+    say(table_id, f"{username} joined the table.")
+    outbox.emit("joined_room", {"table_id": table_id}, table_id, to=request.sid)
+    outbox.emit("chat_history", {"table_id": table_id, "messages": backlog}, table_id, to=request.sid)
+
+    # the joiner gets a full snapshot, everyone else just the new seat
+    delta = game_state.make_delta(room, playerId=player_id, player=seat.view())
+    outbox.emit("player_joined", delta, table_id, skip_sid=request.sid)
+    emit_game_state(room, table_id, to=request.sid)
+
+    # auto-start single-player for quick testing (not on a seat reclaimed mid-round)
+    if len(room.seats) == 1 and not room.game_started:
+        say(table_id, "Single-Player mode: Starting round...")
+        start_game_internal(table_id)
 
-    # emit current game state so frontend updates
-    emit_game_state(room, table_id)
 
-    # auto-start single-player for quick testing
-    if len(room["players"]) == 1:
-        socketio.emit("chat_message", {"username": "System", "message": "Single-Player mode: Starting round..."}, room=table_id)
-        start_game_internal(table_id)
+@socketio.on("chat_message")
+@sharded("chat_message")
+@metrics.timed(HANDLER_SECONDS, "chat_message")
+@table_handler
+def on_chat_message(data):
+    """A player's chat message, for the table they sit at or (with ``isGlobal``)
+    everyone. It goes out with the channel's next ``chat_batch``."""
+    data = data or {}
+    text = data.get("message")
+    if not isinstance(text, str) or not text.strip():
+        return emit_error("Empty chat message")
+    seat = players.get(request.sid)
+    if data.get("isGlobal"):
+        username = seat.username if seat else data.get("username") or "Anonymous"
+        if not isinstance(username, str) or username.strip().lower() in RESERVED_CHAT_NAMES:
+            return emit_error("That name is reserved")
+        if not chat.allow(request.sid):
+            return emit_error("Too many chat messages, slow down")
+        chat.post(None, username, text.strip(), kind="global")
+        return
+    table_id = data.get("table_id") or data.get("tableId")
+    if seat is None or seat.table_id != table_id or rooms.get(table_id) is None:
+        return emit_error("Join the table to chat there")
+    if not chat.allow(request.sid):
+        return emit_error("Too many chat messages, slow down")
+    chat.post(table_id, seat.username, text.strip())
 
 
 @socketio.on("place_bet")
+@sharded("place_bet")
+@metrics.timed(HANDLER_SECONDS, "place_bet")
+@table_handler
 def place_bet(data):
     table_id = data.get("table_id")
     bet = data.get("bet")
-    player = players.get(request.sid)
-    if not table_id or bet is None or not player:
+    room = rooms.get(table_id)
+    seat = room.by_sid.get(request.sid) if room else None
+    if not table_id or bet is None or not seat:
         return emit_error("Invalid bet")
 
-    room = rooms.get(table_id)
-    if not room:
-        return emit_error("Table not found")
+    if room.game_started:
+        return emit_error("Round already in progress", room=table_id)
 
-    # use username in bets map for readability
-    if player["username"] in room.get("bets", {}):
+    if seat.pending_bet is not None:
         return emit_error("Bet already placed", room=table_id)
 
-    room.setdefault("bets", {})[player["username"]] = bet
-    socketio.emit("chat_message", {"username": "System", "message": f"{player['username']} bet {bet}"}, room=table_id)
+    if room.stakes and not (isinstance(bet, (int, float)) and bet >= room.stakes):
+        return emit_error(f"Minimum bet is {room.stakes}", room=table_id)
+
+    seat.pending_bet = bet
+    if history:
+        history.bet(table_id, room.round + 1, seat.player_id, bet)
+    say(table_id, f"{seat.username} bet {bet}")
+
+    delta = game_state.make_delta(room, playerId=seat.player_id, pending_bet=bet)
+    emit_delta(table_id, "bet_placed", delta)
 
-    if len(room["bets"]) == len(room.get("players", {})):
+    if room.bets_placed() == len(room.seated()):
         start_game_internal(table_id)
-    else:
-        emit_game_state(room, table_id)
+    elif room.timer is None:
+        # the window ran out before anyone bet; this first bet opens a new one
+        open_betting(room, table_id)
 
 
 
 @socketio.on("hit")
+@sharded("hit")
+@metrics.timed(HANDLER_SECONDS, "hit")
+@table_handler
 def hit(data):
-    print("HIT EVENT RECEIVED", data)
     try:
         table_id = data.get("table_id")
         room = rooms.get(table_id)
         if not room:
             return emit_error("Invalid table")
 
-        ply = players.get(request.sid)
-        if not ply:
+        seat = room.by_sid.get(request.sid)
+        if not seat:
             return emit_error("Player not found")
 
-        player_key = ply.get("player_id")
-
-        print("IDENTITY CHECK")
-        print("request.sid:", request.sid)
-        print("player_key (from socket):", player_key)
-        print("playerId (from client):", data.get("playerId"))
-
-
-        if player_key not in room["players_data"]:
-            print("[ERROR] Invalid playerId in HIT:", player_key)
-            return
-
-
+        player_key = seat.player_id
 
+        if not room.game_started:
+            return emit_error("No round in progress", room=table_id)
 
         # current turn is stored as player_key (player_id)
-        current_turn_key = room.get("turn_order", [None])[room.get("current_turn_index", 0)] if room.get("turn_order") else None
-        turn_order = room.get("turn_order", [])
+        current_turn_key = game_state.current_turn(room)
+        turn_order = room.turn_order
 
-        print("TURN DEBUG")
-        print("player_key:", player_key)
-        print("turn_order:", room.get("turn_order"))
-        print("current_turn_index:", room.get("current_turn_index"))
-        print("current_turn_key:", current_turn_key)
+        log.debug("hit", table_id=table_id, sid=request.sid, player_id=player_key,
+                  client_player_id=data.get("playerId"), turn_order=lambda: list(turn_order),
+                  current_turn_index=room.current_turn_index, current_turn=current_turn_key)
 
         # Allow single-player tables
         if len(turn_order) > 1 and player_key != current_turn_key:
             return emit_error("Not your turn", room=table_id)
 
-        print("DEBUG HIT TURN CHECK")
-        print("request.sid:", request.sid)
-        print("player_key:", player_key)
-        print("current_turn_key:", current_turn_key)
-        print("turn_order:", room.get("turn_order"))
-
-        player_obj = room.get("players_data", {}).get(player_key)
-        if not player_obj:
-            return emit_error("Player data missing", room=table_id)
-
         # draw card safely
         card = draw_card(table_id)
         if not card:
             return emit_error("Failed to draw a card", room=table_id)
 
-        player_obj["hand"].append(card)
+        seat.hand.append(card)
+        if history:
+            history.hit(table_id, room.round, player_key, card)
 
-        # score safely
-        try:
-            player_obj["score"] = calculate_score(player_obj["hand"])
-        except Exception as e:
-            return emit_error(f"Score calc error: {str(e)}", room=table_id)
+        emit_delta(table_id, "card_dealt", game_state.card_dealt(room, player_key, card, seat.hand.score))
 
         # bust condition
-        if player_obj["score"] > 21:
-            socketio.emit(
-                "chat_message",
-                {"username": "System", "message": f"{ply['username']} busts!"},
-                room=table_id
-                )
+        if seat.hand.is_bust:
+            say(table_id, f"{seat.username} busts!")
             advance_turn(room, table_id)
-
-        # emit new game state
-        emit_game_state(room, table_id)
+        else:
+            set_timer(room, TURN_TIMEOUT, turn_timed_out)
 
     except Exception as e:
         # catches hidden server error that freezes UI
+        log.exception("hit failed", table_id=data.get("table_id"))
         return emit_error(f"Server error in HIt: {str(e)}", room=data.get("table_id"))
 
 @socketio.on("stay")
+@sharded("stay")
+@metrics.timed(HANDLER_SECONDS, "stay")
+@table_handler
 def stay(data):
     table_id = data.get("table_id")
     room = rooms.get(table_id)
     if not room:
         return emit_error("Invalid table")
 
-    ply = players.get(request.sid)
-    if not ply:
+    seat = room.by_sid.get(request.sid)
+    if not seat:
         return emit_error("Player not found", room=table_id)
-    player_key = ply.get("player_id") or request.sid
 
-    current_turn_key = room.get("turn_order", [None])[room.get("current_turn_index", 0)] if room.get("turn_order") else None
-    if player_key != current_turn_key:
+    current_turn_key = game_state.current_turn(room)
+    if seat.player_id != current_turn_key:
         return emit_error("Not your turn", room=table_id)
 
 
-    socketio.emit("chat_message", {"username": "System", "message": f"{ply['username']} stays"}, room=table_id)
+    if history:
+        history.stay(table_id, room.round, seat.player_id)
+    say(table_id, f"{seat.username} stays")
     advance_turn(room, table_id)
-    emit_game_state(room, table_id)
 
 
-# Game Logic
-def start_game_internal(table_id):
-    room = rooms[table_id]
-    # Turn_order should be list of player_keys (player_id")
-    room["turn_order"] = [pid for pid in room.get("players", {}).keys()]
-    room["current_turn_index"] = 0
-
-    print("[DEBUG] Turn order initialized:", room["turn_order"])
-    room.update({
-        "game_started": True,
-        "bets": {},
-        "dealer": {"hand": [draw_card(table_id), draw_card(table_id)], "score": 0},
-        "players_data": {},
-    })
+@socketio.on("resync")
+@sharded("resync")
+@metrics.timed(HANDLER_SECONDS, "resync")
+@table_handler
+def resync(data):
+    """Client detected a gap in delta seq numbers and wants a full snapshot."""
+    table_id = (data or {}).get("table_id")
+    room = rooms.get(table_id)
+    if not room:
+        return emit_error("Invalid table")
+    emit_game_state(room, table_id, to=request.sid)
 
-    # Deal to each joined player (room["players"] keyed by player_id)
-    for player_id, pdata in list(room.get("players", {}).items()):
-        sid = pdata.get("sid")
-        username = pdata.get("username")
-        if not sid or not username:
-            print(f"[WARN] start_game_internal: missing sid/username for player_id={player_id}")
-            continue
 
-        hand = [draw_card(table_id), draw_card(table_id)]
-        room["players_data"][player_id] = {
-            "username": username,
-            "hand": hand,
-            "score": calculate_score(hand),
-            "bet": room.get("bets", {}).get(username, 0),
-        }
+@socketio.on("hint")
+@sharded("hint")
+@metrics.timed(HANDLER_SECONDS, "hint")
+@table_handler
+def hint(data):
+    """Suggest hit or stand for the sender's hand against the dealer's upcard.
+    Only the asking player gets the answer."""
+    table_id = (data or {}).get("table_id")
+    room = rooms.get(table_id)
+    if not room:
+        return emit_error("Invalid table")
+    if strategy is None:
+        return emit_error("Hints are not available")
+
+    seat = room.by_sid.get(request.sid)
+    dealer_hand = room.dealer.hand
+    if not room.game_started or not seat or not dealer_hand:
+        return emit_error("No round in progress")
+
+    hand = seat.hand
+    upcard = card_points(dealer_hand[0])
+    advice = strategy.hint(hand.score, hand.soft, upcard,
+                           getattr(room.deck, "decks", DECK_COUNT), RULES.hit_soft_17)
+    if advice is None:
+        return emit_error("Hand is already bust")
+    outbox.emit("hint", {"playerId": seat.player_id, "score": hand.score, "upcard": upcard, **advice},
+                table_id, to=request.sid)
+
+
+@socketio.on("lobby_subscribe")
+def lobby_subscribe(data=None):
+    """Send the first page of open tables, then batched ``lobby_update`` diffs."""
+    join_room(LOBBY_ROOM)
+    rows, cursor = lobby.page(limit=50)
+    emit("lobby_tables", {"tables": rows, "next": cursor, "total": len(lobby)})
+
+
+@socketio.on("lobby_unsubscribe")
+def lobby_unsubscribe(data=None):
+    leave_room(LOBBY_ROOM)
+
+
+@socketio.on("quick_join")
+@metrics.timed(HANDLER_SECONDS, "quick_join")
+def quick_join(data):
+    """Seat the player at the fullest table with a free seat (optionally at
+    ``stakes``), or at a new table if none has room. Takes the same fields
+    as ``join`` minus ``table_id``. If another player takes the last seat
+    first the client gets "Table is full" and can ask again."""
+    data = data or {}
+    try:
+        stakes = parse_stakes(data.get("stakes")) if data.get("stakes") is not None else None
+    except (ValueError, TypeError) as e:
+        return emit_error(str(e))
+    table_id = lobby.quick_join(stakes) or str(uuid.uuid4())
+    on_join({**data, "table_id": table_id})
 
 
-    print(f"[DEBUG] Starting game for table {table_id}. Players: {list(room['players'].keys())}")
-    emit_game_state(room, table_id)
+# Game Logic
+def start_game_internal(table_id, seated=None):
+    """Deal a round to ``seated`` (by default every seat with a player at it);
+    the other seats sit it out."""
+    room = rooms[table_id]
+    # reshuffle between rounds once the cut card has come out
+    if room.deck.needs_reshuffle:
+        room.deck.reshuffle()
+
+    # Turn order is every seat dealt in, in join order (player_ids)
+    if seated is None:
+        seated = room.seated()
+    room.turn_order = [seat.player_id for seat in seated]
+    room.current_turn_index = 0
+
+    hands, dealer_hand = deal_round(table_id, len(seated))
+    room.game_started = True
+    room.dealer = DealerState(Hand(dealer_hand))
+
+    # seats sitting the round out keep no cards or result from the last one
+    for seat in room.seats.values():
+        seat.result = None
+        if seat not in seated:
+            seat.hand, seat.bet = Hand(), 0
+
+    # bets placed before the deal become this round's stakes
+    for seat, cards in zip(seated, hands):
+        seat.hand = Hand(cards)
+        seat.bet = seat.pending_bet or 0
+        seat.pending_bet = None
+
+    room.round += 1
+    if history:
+        history.deal(table_id, room.round, ((seat.player_id, seat.bet, seat.hand) for seat in seated),
+                     room.dealer.hand)
+    log.debug("round started", table_id=table_id, turn_order=lambda: list(room.turn_order))
+    lobby_update(room)
+    emit_delta(table_id, "round_started", game_state.round_started(room))
+    set_timer(room, TURN_TIMEOUT, turn_timed_out)
 
 
 def advance_turn(room, table_id):
-    room["current_turn_index"] += 1
-    if room["current_turn_index"] >= len(room.get("turn_order", [])):
+    room.current_turn_index += 1
+    if room.current_turn_index >= len(room.turn_order):
         dealer_plays(room, table_id)
     else:
-        emit_game_state(room, table_id)
+        emit_delta(table_id, "turn_changed", game_state.turn_changed(room))
+        set_timer(room, TURN_TIMEOUT, turn_timed_out)
 
+@metrics.timed(DEALER_SECONDS)
 def dealer_plays(room, table_id):
-    dealer = room["dealer"]
+    dealer = room.dealer
 
-    #dealer hits until 17+
-    while calculate_score(dealer["hand"]) < 17:
-        card = draw_card(table_id)
-        dealer["hand"].append(card)
+    #dealer hits until 17+ (soft 17 per RULES), drawing the expected run of hits in one reservation
+    room.deck.draw_until(dealer.hand, lambda hand: not RULES.dealer_hits(hand.score, hand.soft))
 
     # set final score
-    dealer["score"] = calculate_score(dealer["hand"])
+    dealer.score = dealer.hand.score
 
-    # mark the game as finished
-    room["game_started"] = False
+    outcomes = round_outcomes(room)
+    # kept on the seats too, so a snapshot that replaces round_over still shows them
+    for player_id, outcome in outcomes:
+        room.seats[player_id].result = outcome
+    if history:
+        history.result(table_id, room.round, dealer.hand, outcomes)
 
-    # force reveal hands
-    room["reveal_dealer_hand"] = True
-    room["reveal_hands"] = True
-    room["game_over"] = True
+    # mark the game as finished; snapshots now reveal every hand
+    room.game_started = False
+    lobby_update(room)
 
     # emit new state
+    emit_delta(table_id, "round_over", game_state.round_over(room, dict(outcomes)))
+
+    if RESTART_DELAY > 0:
+        outbox.emit("countdown", {"phase": "restart", "seconds": RESTART_DELAY}, table_id)
+        say(table_id, f"Next round in {RESTART_DELAY:g} seconds")
+    set_timer(room, RESTART_DELAY, restart_round)
+
+
+def restart_round(room, table_id):
+    """Clear the finished round from the table and open betting for the next
+    one. Bets placed during the countdown still count."""
+    for seat in room.seats.values():
+        seat.hand = Hand()
+        seat.bet = 0
+        seat.result = None
+    room.dealer = DealerState()
+    game_state.next_seq(room)
     emit_game_state(room, table_id)
+    open_betting(room, table_id)
 
 
-def resolve_game(room, table_id):
-    dealer_score = room["dealer"]["score"]
-    results = {}
-    for username, pdata in room.get("players_data", {}).items():
-        score = pdata["score"]
-        if score > 21:
-            results[username] = "Lose (bust)"
-        elif dealer_score > 21 or score > dealer_score:
-            results[username] = "Win"
-        elif score == dealer_score:
-            results[username] = "Push"
-        else:
-            results[username] = "Lose"
-    socketio.emit("round_result", {"results": results}, room=table_id)
-    room["game_started"] = False
+def open_betting(room, table_id):
+    """Start the betting window: BETTING_WINDOW from now the seats that bet are dealt in."""
+    if BETTING_WINDOW > 0:
+        outbox.emit("countdown", {"phase": "betting", "seconds": BETTING_WINDOW}, table_id)
+        say(table_id, f"Place your bets: dealing in {BETTING_WINDOW:g} seconds")
+    set_timer(room, BETTING_WINDOW, close_betting)
 
 
+def close_betting(room, table_id):
+    """Betting window deadline: deal in whoever bet, and sit the rest out.
+    With no bets the table waits, and the next bet opens a new window."""
+    if not room.game_started and room.bets_placed():
+        start_game_internal(table_id, [seat for seat in room.seated() if seat.pending_bet is not None])
+
+
+def turn_timed_out(room, table_id):
+    """Turn deadline: the player whose turn it is stays."""
+    seat = room.seats.get(game_state.current_turn(room))
+    if seat is not None:
+        if history:
+            history.stay(table_id, room.round, seat.player_id)
+        say(table_id, f"{seat.username} ran out of time and stays")
+    advance_turn(room, table_id)
+
+
+def timer_token(room):
+    """Where the table's game stands: a deadline armed at one point is stale
+    once the round, the turn or the phase has moved past it."""
+    return room.round, room.current_turn_index, room.game_started
+
+
+def set_timer(room, delay, action):
+    """Replace the table's pending deadline with ``action(room, table_id)`` in
+    ``delay`` seconds, or with none if ``delay`` is 0."""
+    timers.cancel(room.timer)
+    room.timer = timers.schedule(delay, run_timer, room.table_id, action, timer_token(room)) if delay > 0 else None
+
+
+def run_timer(table_id, action, token):
+    """Timer wheel callback: run a deadline under the table's lock, unless the
+    table has set or cancelled its timer since this one came due, or the game
+    has moved on from where it was armed."""
+    with table_locks(table_id), outbox.batch():
+        room = rooms.get(table_id)
+        if room is None or room.timer is None or room.timer.active or timer_token(room) != token:
+            return
+        room.timer = None
+        action(room, table_id)
 
-# Game State Emission
-def emit_game_state(room, table_id):
-    """Emit full game state to all clients in the table."""
-
-# Defensive Defaults
-    dealer = room.get("dealer", {"hand": [], "score": 0})
-    game_started = room.get("game_started", False)
-    players_data = room.get("players_data", {})
-    turn_order = room.get("turn_order", [])
-    current_index = room.get("current_turn_index", 0)
-
-# Build exposed dealer info (hide second card if game started)
-    dealer_hand = dealer.get("hand", [])
-    if game_started and dealer_hand:
-        dealer_display = [
-        dealer_hand[0],
-        {"value": "hidden", "suit": "hidden", "code": "BACK", "image": None, "hidden": True}
-    ]
-        dealer_score = "?"
-    else:
-        dealer_display = dealer_hand
-        dealer_score = calculate_score(dealer_hand) if dealer_hand else 0
 
-# Turn logic
-    turn = None
-    if game_started and turn_order:
-        turn = turn_order[current_index] if current_index < len(turn_order) else None
+def round_outcomes(room):
+    """(player_id, outcome label) for every seat dealt into the round."""
+    dealer_hand = room.dealer.hand
+    return [(player_id, outcome_label(seat.hand.score, dealer_hand.score,
+                                      seat.hand.is_blackjack, dealer_hand.is_blackjack, RULES))
+            for player_id, seat in room.seats.items() if seat.hand]
 
-    state = {
-        "dealer": {"hand": dealer_display, "score": dealer_score},
-        "players": players_data,
-        "turn": turn,
-        "reveal_dealer_hand": not game_started,
-        "reveal_hands": not game_started,
-        "game_over": not game_started,
-    }
 
-    print(f"[DEBUG] Emitting game_state for table {table_id}: players={list(players_data.keys())}")
-    socketio.emit("game_state", state, room=table_id)
+# Game State Emission
+@metrics.timed(HANDLER_SECONDS, "emit_game_state")
+def emit_game_state(room, table_id, to=None):
+    """Emit a full game state snapshot, to one client (join/resync) or the whole table."""
+    state = room.state()
+    log.debug("game_state", table_id=table_id, to=to, players=lambda: list(state.data["players"]))
+    outbox.emit("game_state", state, table_id, to=to)
+
+
+def emit_delta(table_id, event, delta):
+    """Broadcast one seq-stamped delta event (see game_state.py) to the table."""
+    outbox.emit(event, delta, table_id)
 
 
 # Run
 
+def drop_unclaimed_seats(table_id):
+    """Timer wheel callback, RESTORE_GRACE after a restore: free the restored
+    seats their players did not come back for."""
+    with table_locks(table_id), outbox.batch():
+        room = rooms.get(table_id)
+        if room is None:
+            return
+        turn = game_state.current_turn(room)
+        dropped = room.drop_unclaimed()
+        for player_id in dropped:
+            emit_delta(table_id, "player_left", game_state.make_delta(room, playerId=player_id))
+        if turn in dropped:
+            advance_turn(room, table_id)
+        if dropped:
+            log.info("unclaimed seats dropped", table_id=table_id, seats=len(dropped))
+            lobby_update(room)
+            lifecycle.touch(table_id, len(room.seats))
+
+
+def restore_tables():
+    """Load the tables from the last snapshot, if there is one, and rearm
+    their deadlines. Players reclaim their seats by rejoining within
+    RESTORE_GRACE seconds."""
+    try:
+        created, tables = read_snapshot(SNAPSHOT_PATH, remote_deck=lambda decks, fallback: PrefetchDeck(
+            deck_client, decks, fallback=fallback, spawn=socketio.start_background_task))
+    except FileNotFoundError:
+        return 0
+    for room in tables:
+        rooms[room.table_id] = room
+        lifecycle.restored(room.table_id, len(room.seats))
+        lobby_update(room)
+        if room.game_started:
+            set_timer(room, TURN_TIMEOUT, turn_timed_out)
+        elif room.dealer.hand:
+            set_timer(room, RESTART_DELAY, restart_round)
+        else:
+            set_timer(room, BETTING_WINDOW, close_betting)
+        if room.seats:
+            timers.schedule(RESTORE_GRACE, drop_unclaimed_seats, room.table_id)
+    log.info("tables restored", tables=len(tables), path=SNAPSHOT_PATH,
+             age=round(datetime.now(timezone.utc).timestamp() - created, 1))
+    return len(tables)
+
+
+def main():
+    if snapshots:
+        restore_tables()
+        socketio.start_background_task(snapshots.run, socketio.sleep)
+        atexit.register(snapshots.snapshot)
+    if router.count > 1:
+        socketio.start_background_task(router.serve, run_routed)
+    socketio.start_background_task(reap_tables)
+    socketio.start_background_task(timers.run, socketio.sleep)
+    socketio.start_background_task(publish_lobby)
+    socketio.start_background_task(publish_chat)
+    if history:
+        socketio.start_background_task(history.run, socketio.sleep)
+    # the threading mode runs on Werkzeug, which refuses to start outside a tty unless allowed
+    run_options = {"allow_unsafe_werkzeug": True} if ASYNC_MODE == "threading" else {}
+    socketio.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 5000)), **run_options)
+
+
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,362 @@
+# //backend/benchmarks/bench_bots.py
+
+"""Load-test the game flow with Socket.IO bots, and check for regressions
+against a saved baseline.
+
+Starts a local deck API stub and ``app.py`` with remote decks pointed at
+the stub. Then ``--tables`` x ``--seats`` bots play over real websockets:
+join, place_bet, hit below 17 or stay, round over, and again for
+``--rounds`` rounds. Bots can be split across ``--clients`` processes.
+
+Reports:
+* rounds/sec
+* p50/p95/p99 latency per event: emit to the first state event (or error)
+  that answers it
+* emits and encoded bytes per action, from the server's /emit-stats and
+  /metrics
+* server RSS growth per table. Finished tables stay registered until
+  the reaper's TTL. Connections are closed by then, so this is mostly
+  table state plus allocator high water.
+
+``--save`` writes the results as the baseline JSON, and refuses to if any
+bot stalled, failed to connect or got an error. Otherwise they are
+compared with the baseline, and the run exits 1 if anything is more than
+``--tolerance`` worse. Baselines are machine-specific: save one on the
+machine that will run the comparison.
+
+Run from backend/ (needs requirements-bench.txt):
+    python -m benchmarks.bench_bots --tables 1000 --seats 2 --rounds 3
+    python -m benchmarks.bench_bots --save    # record a new baseline
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import socketio
+
+from deck_stub import DeckStub
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "bots.json")
+STATE_EVENTS = ("game_state", "player_joined", "player_left", "bet_placed", "round_started",
+                "card_dealt", "turn_changed", "round_over", "error_message")
+STALL_TIMEOUT = 15
+# events that answer each action; card_dealt and bet_placed only when they are the bot's own.
+# A handler that emits more than one state event sends a single game_state instead.
+ANSWERS = {
+    "join": ("game_state",),
+    "place_bet": ("bet_placed", "round_started", "game_state", "error_message"),
+    "hit": ("card_dealt", "game_state", "error_message"),
+    "stay": ("turn_changed", "round_over", "game_state", "error_message"),
+}
+
+
+def start_server(port, deck_api):
+    env = dict(os.environ, PORT=str(port), DECK_SOURCE="remote", DECK_API_BASE=deck_api, LOG_LEVEL="WARNING",
+               # every bot comes from 127.0.0.1, so lift the per-client table limits
+               MAX_TABLES_PER_CLIENT="1000000", TABLE_CREATE_BURST="1000000")
+    proc = subprocess.Popen([sys.executable, "app.py"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def rss_bytes(pid):
+    """Resident set size of ``pid`` (Linux), or None."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        return resp.read().decode()
+
+
+def server_counters(url):
+    """(emits sent, encoded bytes) so far."""
+    emits = sum(json.loads(fetch(f"{url}/emit-stats"))["sent"].values())
+    encoded = 0
+    for line in fetch(f"{url}/metrics").splitlines():
+        if line.startswith("blackjack_emit_bytes_total "):
+            encoded = int(float(line.split()[1]))
+    return emits, encoded
+
+
+class TableRun:
+    """Round count shared by a table's bots. They all stop together: a seat
+    that left early would strand the others waiting on its bet."""
+
+    def __init__(self, table_id, rounds, stats):
+        self.table_id = table_id
+        self.rounds_left = rounds
+        self.stats = stats
+        self.ended = set()       # seq of each round-ending event, seen by every seat
+        self.finished = asyncio.Event()
+
+    def round_ended(self, seq):
+        if seq in self.ended:
+            return
+        self.ended.add(seq)
+        self.stats["rounds"] += 1
+        self.rounds_left -= 1
+        if self.rounds_left <= 0:
+            self.finished.set()
+
+
+class Bot:
+    """One seat, driven entirely by the events its table sends."""
+
+    def __init__(self, url, table, player_id, stats):
+        self.url = url
+        self.table = table
+        self.table_id = table.table_id
+        self.player_id = player_id
+        self.stats = stats
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.in_round = False
+        self.turn = None
+        self.score = 0
+        self.bet_placed = False
+        self.pending = None        # (action, sent at) awaiting its answer
+        self.finished = table.finished
+        self.last_event = time.perf_counter()
+        for name in STATE_EVENTS:
+            self.client.on(name, self._handler(name))
+
+    def _handler(self, name):
+        async def handler(data):
+            await self.on_event(name, data or {})
+        return handler
+
+    async def on_event(self, name, data):
+        self.last_event = now = time.perf_counter()
+        if self.pending is not None and name in ANSWERS[self.pending[0]] \
+                and data.get("playerId", self.player_id) == self.player_id:
+            action, sent = self.pending
+            self.pending = None
+            self.stats["latency"].setdefault(action, []).append(now - sent)
+            if name == "error_message":
+                self.stats["errors"] += 1
+        if name == "game_state":
+            # coalesced deltas arrive as one snapshot, which may end the round
+            was_in_round = self.in_round
+            self.in_round = not data.get("game_over", True)
+            self.turn = data.get("turn")
+            self.score = data.get("players", {}).get(self.player_id, {}).get("score", self.score)
+            if was_in_round and not self.in_round:
+                self.round_ended(data.get("seq"))
+        elif name == "round_started":
+            self.in_round, self.turn, self.bet_placed = True, data.get("turn"), False
+            self.score = data.get("players", {}).get(self.player_id, {}).get("score", 0)
+        elif name == "card_dealt" and data.get("playerId") == self.player_id:
+            self.score = data.get("score", self.score)
+        elif name == "turn_changed":
+            self.turn = data.get("turn")
+        elif name == "round_over":
+            self.round_ended(data.get("seq"))
+        await self.act()
+
+    def round_ended(self, seq):
+        self.in_round, self.turn, self.bet_placed = False, None, False
+        self.table.round_ended(seq)
+
+    async def act(self):
+        if self.finished.is_set() or self.pending is not None:
+            return
+        if not self.in_round and not self.bet_placed:
+            self.bet_placed = True
+            await self.send("place_bet", {"table_id": self.table_id, "bet": 10})
+        elif self.in_round and self.turn == self.player_id:
+            await self.send("hit" if self.score < 17 else "stay", {"table_id": self.table_id})
+
+    async def send(self, action, data):
+        self.pending = (action, time.perf_counter())
+        self.stats["actions"] += 1
+        try:
+            await self.client.emit(action, data)
+        except socketio.exceptions.SocketIOError:
+            # dropped by the server; play() notices and gives up
+            self.pending = None
+
+    async def play(self):
+        try:
+            await self.client.connect(self.url, transports=["websocket"], wait_timeout=10)
+        except socketio.exceptions.ConnectionError:
+            self.stats["failed"] += 1
+            return
+        try:
+            # the join's game_state answers it; a lone seat's round starts right away
+            await self.send("join", {"table_id": self.table_id, "playerId": self.player_id,
+                                     "username": self.player_id})
+            while not self.finished.is_set():
+                try:
+                    await asyncio.wait_for(self.finished.wait(), timeout=1)
+                except asyncio.TimeoutError:
+                    if time.perf_counter() - self.last_event > STALL_TIMEOUT or not self.client.connected:
+                        self.stats["stalled"] += 1
+                        return
+        except socketio.exceptions.SocketIOError:
+            self.stats["failed"] += 1
+        finally:
+            await self.client.disconnect()
+
+
+async def play_tables(url, table_ids, seats, rounds, concurrency):
+    stats = {"rounds": 0, "actions": 0, "errors": 0, "stalled": 0, "failed": 0, "latency": {}}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def table(table_id):
+        async with limit:
+            run = TableRun(table_id, rounds, stats)
+            bots = [Bot(url, run, f"{table_id}-s{s}", stats) for s in range(seats)]
+            await asyncio.gather(*(bot.play() for bot in bots), return_exceptions=True)
+
+    await asyncio.gather(*(table(t) for t in table_ids))
+    return stats
+
+
+def client_process(args):
+    return asyncio.run(play_tables(*args))
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+
+def run(args):
+    with DeckStub() as stub:
+        proc = start_server(args.port, stub.base_url)
+        url = f"http://127.0.0.1:{args.port}"
+        try:
+            rss_before = rss_bytes(proc.pid)
+            emits_before, bytes_before = server_counters(url)
+            table_ids = [f"bots-{i}" for i in range(args.tables)]
+            chunks = [(url, table_ids[i::args.clients], args.seats, args.rounds, args.concurrency)
+                      for i in range(args.clients)]
+            start = time.perf_counter()
+            with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+                parts = pool.map(client_process, chunks)
+            elapsed = time.perf_counter() - start
+            emits_after, bytes_after = server_counters(url)
+            rss_after = rss_bytes(proc.pid)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    stats = {"rounds": 0, "actions": 0, "errors": 0, "stalled": 0, "failed": 0, "latency": {}}
+    for part in parts:
+        for key in ("rounds", "actions", "errors", "stalled", "failed"):
+            stats[key] += part[key]
+        for action, values in part["latency"].items():
+            stats["latency"].setdefault(action, []).extend(values)
+
+    latency_ms = {}
+    for action, values in sorted(stats["latency"].items()):
+        values.sort()
+        latency_ms[action] = {f"p{int(q * 100)}": round(percentile(values, q) * 1e3, 3) for q in (0.5, 0.95, 0.99)}
+    actions = max(stats["actions"], 1)
+    # empty tables stay registered until the reaper's TTL, so this is what one table keeps
+    per_table = (rss_after - rss_before) / args.tables if rss_before and rss_after else None
+    return {
+        "config": {"tables": args.tables, "seats": args.seats, "rounds": args.rounds, "clients": args.clients,
+                   "cpus": os.cpu_count(), "python": platform.python_version()},
+        "rounds_per_sec": round(stats["rounds"] / elapsed, 2),
+        "latency_ms": latency_ms,
+        "emits_per_action": round((emits_after - emits_before) / actions, 3),
+        "bytes_per_action": round((bytes_after - bytes_before) / actions, 1),
+        "rss_bytes_per_table": round(per_table) if per_table is not None else None,
+        "dropped_bots_pct": round(100 * (stats["stalled"] + stats["failed"]) / (args.tables * args.seats), 2),
+        **{key: stats[key] for key in ("rounds", "actions", "errors", "stalled", "failed")},
+    }
+
+
+def compare(result, baseline, tolerance):
+    """(name, baseline, now, regressed) for every metric both runs have.
+    Throughput regresses by falling, everything else by rising. p99 is too
+    noisy to gate on and is shown with ``regressed`` None. Dropped bots are
+    compared in percentage points, not relative to a baseline near 0."""
+    rows = [("rounds_per_sec", baseline.get("rounds_per_sec"), result["rounds_per_sec"], True)]
+    for action, now in result["latency_ms"].items():
+        for q, value in now.items():
+            rows.append((f"{action} {q} ms", baseline.get("latency_ms", {}).get(action, {}).get(q), value, False))
+    for key in ("emits_per_action", "bytes_per_action", "rss_bytes_per_table"):
+        rows.append((key, baseline.get(key), result[key], False))
+    out = []
+    for name, before, now, higher_is_better in rows:
+        if before is None or now is None:
+            continue
+        if name.endswith("p99 ms"):
+            worse = None
+        else:
+            worse = now < before * (1 - tolerance) if higher_is_better else now > before * (1 + tolerance)
+        out.append((name, before, now, worse))
+    before = baseline.get("dropped_bots_pct")
+    if before is not None:
+        out.append(("dropped_bots_pct", before, result["dropped_bots_pct"], result["dropped_bots_pct"] > before + 1))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=3, help="rounds each table plays")
+    parser.add_argument("--clients", type=int, default=2, help="client processes running the bots")
+    parser.add_argument("--concurrency", type=int, default=50, help="tables in flight per client process")
+    parser.add_argument("--port", type=int, default=5090)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fraction worse than the baseline")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+    if args.save:
+        if result["stalled"] or result["failed"] or result["errors"]:
+            print("not saving: bots stalled, failed or got errors, so this run cannot be a baseline")
+            sys.exit(1)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save to record one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != result["config"]:
+        print(f"warning: baseline config {baseline.get('config')} differs from this run")
+    regressions = 0
+    for name, before, now, worse in compare(result, baseline, args.tolerance):
+        regressions += bool(worse)
+        verdict = "REGRESSION" if worse else "ok" if worse is not None else ""
+        print(f"  {name:<24} {before:>12} -> {now:>12}  {verdict}")
+    if regressions:
+        print(f"{regressions} metric(s) more than {args.tolerance:.0%} worse than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
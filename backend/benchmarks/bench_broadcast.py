@@ -0,0 +1,92 @@
+# //backend/benchmarks/bench_broadcast.py
+
+"""Outbound game-state bytes per round on a 7-seat table: full-state emits
+after every action (the old emit_game_state pattern) vs seq-stamped deltas.
+
+Counts bytes once per emit; Socket.IO fans each emit out to every seat.
+
+Run from backend/:  python -m benchmarks.bench_broadcast
+"""
+
+import json
+import random
+import time
+
+import game_state
+from hand import Hand
+from shoe import Shoe
+from tables import Table, DealerState
+
+SEATS = 7
+ROUNDS = 500
+
+
+def new_room():
+    return Table("bench", Shoe(rng=random.Random(1)))
+
+
+def play_round(room, full, delta):
+    """Drive one round, calling full(room) where the old code emitted a full
+    state and delta(payload) for each delta the new code emits."""
+    ids = list(room.seats)
+    for pid in ids:  # bets
+        full(room)
+        delta(game_state.make_delta(room, playerId=pid, bet=10))
+
+    hands, dealer = room.deck.deal_round(len(ids))
+    room.game_started, room.turn_order, room.current_turn_index = True, ids, 0
+    room.dealer = DealerState(Hand(dealer))
+    for pid, cards in zip(ids, hands):
+        room.seats[pid].hand = Hand(cards)
+    full(room)
+    delta(game_state.round_started(room))
+
+    for pid in ids:
+        hand = room.seats[pid].hand
+        while hand.score < 15:  # hit
+            card = room.deck.draw_card()
+            hand.append(card)
+            delta(game_state.card_dealt(room, pid, card, hand.score))
+            if hand.is_bust:
+                break
+            full(room)
+        # stay or bust: advance_turn emitted, then the handler emitted again
+        room.current_turn_index += 1
+        if room.current_turn_index >= len(ids):
+            room.deck.draw_until(room.dealer.hand, lambda h: h.score >= 17)
+            room.game_started = False
+            full(room)
+            delta(game_state.round_over(room, dict.fromkeys(ids, "Win")))
+        else:
+            full(room)
+            delta(game_state.turn_changed(room))
+        full(room)
+
+
+def main():
+    room = new_room()
+    for i in range(SEATS):
+        room.add_seat(f"player-{i}", f"user{i}", f"sid-{i}")
+
+    stats = {"full": [0, 0, 0.0], "delta": [0, 0, 0.0]}
+
+    def record(kind, payload_fn):
+        start = time.perf_counter()
+        size = len(json.dumps(payload_fn()))
+        entry = stats[kind]
+        entry[0] += 1
+        entry[1] += size
+        entry[2] += time.perf_counter() - start
+
+    for _ in range(ROUNDS):
+        play_round(room,
+                   full=lambda r: record("full", lambda: game_state.build_state(r)),
+                   delta=lambda d: record("delta", lambda: d))
+
+    for kind, (emits, size, cpu) in stats.items():
+        print(f"{kind:<6} {emits / ROUNDS:6.1f} emits/round  {size / ROUNDS:9,.0f} B/round  "
+              f"{cpu / ROUNDS * 1e6:8.1f} us serialize/round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# //backend/benchmarks/bench_chat.py
+
+"""Chat throughput and emit count, batched against one emit per message.
+
+``--tables`` busy tables each get ``--rate`` player messages a second for
+``--seconds`` of simulated time. Every emit is JSON-encoded once, as
+Socket.IO does, and then queued once per socket in the room (``--seats``),
+standing in for the per-socket send.
+
+* per message: each message is encoded and emitted on its own, as the
+  server did before chat.py
+* batched: messages go through ``Chat`` and each table's are drained every
+  ``--interval`` seconds into a single ``chat_batch`` emit
+
+Run from backend/:  python -m benchmarks.bench_chat --tables 1000
+"""
+
+import argparse
+import json
+import queue
+import random
+import time
+
+from chat import Chat
+
+
+def messages(tables, rate, seconds, seed=1):
+    """(time, table_id, username, text) in time order."""
+    rng = random.Random(seed)
+    out = []
+    for t in range(tables):
+        at = rng.expovariate(rate)
+        while at < seconds:
+            out.append((at, f"t{t}", f"player{rng.randint(0, 6)}", "nice hand, good luck everyone"))
+            at += rng.expovariate(rate)
+    out.sort()
+    return out
+
+
+class Room:
+    """Counts emits and queues each one for every socket in the room."""
+
+    def __init__(self, seats):
+        self.sockets = [queue.SimpleQueue() for _ in range(seats)]
+        self.emits = 0
+
+    def emit(self, payload):
+        packet = json.dumps(payload)
+        for socket in self.sockets:
+            socket.put(packet)
+        self.emits += 1
+
+
+def per_message(stream, seats):
+    room = Room(seats)
+    start = time.perf_counter()
+    for _, table_id, username, text in stream:
+        room.emit({"username": username, "message": text, "tableId": table_id, "isglobal": False})
+    return time.perf_counter() - start, room.emits
+
+
+def batched(stream, seats, interval):
+    chat = Chat()
+    room = Room(seats)
+    next_drain = interval
+    start = time.perf_counter()
+    for at, table_id, username, text in stream:
+        while at >= next_drain:
+            for drained_table, batch in chat.drain():
+                room.emit({"table_id": drained_table, "messages": batch})
+            next_drain += interval
+        chat.post(table_id, username, text)
+    for drained_table, batch in chat.drain():
+        room.emit({"table_id": drained_table, "messages": batch})
+    return time.perf_counter() - start, room.emits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=20, help="messages per table per second")
+    parser.add_argument("--seconds", type=float, default=10, help="simulated time")
+    parser.add_argument("--seats", type=int, default=7, help="sockets per table")
+    parser.add_argument("--interval", type=float, default=0.1, help="batch window in seconds")
+    args = parser.parse_args()
+
+    stream = messages(args.tables, args.rate, args.seconds)
+    print(f"{args.tables} tables, {args.rate:g} messages/s each, {len(stream)} messages over {args.seconds:g} s")
+    runs = (("per message", per_message(stream, args.seats)),
+            (f"batched {args.interval * 1000:.0f} ms", batched(stream, args.seats, args.interval)))
+    for name, (elapsed, emits) in runs:
+        print(f"{name:<14} {len(stream) / elapsed:9.0f} messages/s  {emits / args.seconds:7.0f} emits/s  "
+              f"{emits * args.seats / args.seconds:8.0f} socket packets/s  {len(stream) / emits:5.1f} messages per emit")
+
+
+if __name__ == "__main__":
+    main()
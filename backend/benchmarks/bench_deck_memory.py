@@ -0,0 +1,50 @@
+# //backend/benchmarks/bench_deck_memory.py
+
+"""Memory for 10k concurrent rooms: old list-of-dicts decks vs index shoes.
+
+Run from backend/:  python -m benchmarks.bench_deck_memory
+"""
+
+import random
+import time
+import tracemalloc
+
+from shoe import Shoe
+
+ROOMS = 10_000
+
+
+def old_local_deck():
+    # the pre-shoe create_deck fallback: 52 fresh dicts per room, 6 references each
+    suits = ["HEARTS", "DIAMONDS", "CLUBS", "SPADES"]
+    ranks = ["ACE", "2", "3", "4", "5", "6", "7", "8", "9", "10", "JACK", "QUEEN", "KING"]
+    cards = []
+    for r in ranks:
+        for s in suits:
+            code = f"{r[0] if len(r) > 2 else r}{s[0]}"
+            cards.append({"value": r, "suit": s, "code": code, "image": f"https://deckofcardsapi.com/static/img/{code}.png"})
+    cards = cards * 6
+    random.shuffle(cards)
+    return {"deck_id": None, "cards": cards}
+
+
+def measure(factory):
+    tracemalloc.start()
+    start = time.perf_counter()
+    decks = [factory() for _ in range(ROOMS)]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decks
+    return size, elapsed
+
+
+def main():
+    for name, factory in (("list of dicts", old_local_deck), ("index shoe", Shoe)):
+        size, elapsed = measure(factory)
+        print(f"{name:<14} {size / 2**20:8.1f} MiB total  {size / ROOMS:8.0f} B/room  "
+              f"{elapsed / ROOMS * 1e6:6.1f} us/room")
+
+
+if __name__ == "__main__":
+    main()
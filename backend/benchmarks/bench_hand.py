@@ -0,0 +1,44 @@
+# //backend/benchmarks/bench_hand.py
+
+"""Per-lookup cost of calculate_score on a plain list vs a cached Hand.
+
+Run from backend/:  python -m benchmarks.bench_hand
+"""
+
+import random
+import timeit
+
+from cards import CARDS
+from hand import Hand, calculate_score
+
+LOOKUPS = 200_000
+
+
+def main():
+    rng = random.Random(1)
+    for size in (2, 3, 5):
+        cards = [rng.choice(CARDS) for _ in range(size)]
+        plain, hand = list(cards), Hand(cards)
+        old = timeit.timeit(lambda: calculate_score(plain), number=LOOKUPS) / LOOKUPS
+        new = timeit.timeit(lambda: hand.score, number=LOOKUPS) / LOOKUPS
+        print(f"{size} cards: calculate_score {old * 1e9:7.0f} ns   Hand.score {new * 1e9:7.0f} ns")
+
+    # dealer_plays pattern: rescore after every appended card
+    def rescore_list():
+        h = []
+        while calculate_score(h) < 17:
+            h.append(rng.choice(CARDS))
+
+    def rescore_hand():
+        h = Hand()
+        while h.score < 17:
+            h.append(rng.choice(CARDS))
+
+    runs = 50_000
+    old = timeit.timeit(rescore_list, number=runs) / runs
+    new = timeit.timeit(rescore_hand, number=runs) / runs
+    print(f"dealer loop:  list {old * 1e6:6.2f} us   Hand {new * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# //backend/benchmarks/bench_history.py
+
+"""Cost of the round history on the hot path, and how fast it reads back.
+
+1. Handler latency with the history off and on: one seated player hits
+   until the round ends, then bets to start the next one, through the
+   Flask-SocketIO test client (as in bench_logging). Best of three runs.
+2. Microseconds per record for the ``RoundLog`` calls alone.
+3. Reading back: ``--rounds`` rounds spread over ``--tables`` tables are
+   written and sealed, then one table's round is looked up through the
+   memory-mapped index and, for comparison, by scanning the segments.
+
+Run from backend/:  python -m benchmarks.bench_history --events 20000 --rounds 200000
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+import app as app_module
+from app import app, socketio, rooms, players
+from cards import CARDS
+from hand import Hand
+from history import RoundLog, History, index_path, segment_paths
+
+
+def handler_latency(history, directory, events):
+    rooms.clear()
+    players.clear()
+    with mock.patch.object(app_module, "history", history), mock.patch.object(app_module, "HISTORY_DIR", directory):
+        client = socketio.test_client(app)
+        client.emit("join", {"table_id": "bench-history", "playerId": "p1", "username": "bench"})
+        room = rooms["bench-history"]
+        times = []
+        for _ in range(events):
+            action = "hit" if room.game_started else "place_bet"
+            start = time.perf_counter()
+            client.emit(action, {"table_id": "bench-history", "bet": 10})
+            times.append(time.perf_counter() - start)
+            client.get_received()
+        client.disconnect()
+    times.sort()
+    return statistics.fmean(times), times[len(times) // 2], times[int(len(times) * 0.99)]
+
+
+def write_rounds(log, rounds, tables):
+    """Bet, deal, two hits, stay and result per round; returns the record count."""
+    dealer = Hand(CARDS[i] for i in (4, 40))
+    for n in range(rounds):
+        table_id, round_no = f"table-{n % tables}", n // tables + 1
+        log.bet(table_id, round_no, f"player-{n % tables}", 10)
+        log.deal(table_id, round_no, [(f"player-{n % tables}", 10, Hand(CARDS[i] for i in (0, 9)))], dealer)
+        log.hit(table_id, round_no, f"player-{n % tables}", CARDS[13])
+        log.hit(table_id, round_no, f"player-{n % tables}", CARDS[21])
+        log.stay(table_id, round_no, f"player-{n % tables}")
+        log.result(table_id, round_no, dealer, [(f"player-{n % tables}", "Win")])
+    return rounds * 6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=200_000)
+    parser.add_argument("--tables", type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench-history-")
+    try:
+        handler_latency(None, directory, 1000)    # warm up
+        log = RoundLog(os.path.join(directory, "live"))
+        # the box's noise is larger than the difference, so alternate and keep each mode's best run
+        best = {}
+        for _ in range(3):
+            for label, history in (("off", None), ("on", log)):
+                best[label] = min(best.get(label, (1,)), handler_latency(history, directory, args.events))
+        for label, (mean, p50, p99) in best.items():
+            print(f"history {label:<3} mean {mean * 1e6:7.1f} us  p50 {p50 * 1e6:7.1f} us  "
+                  f"p99 {p99 * 1e6:7.1f} us per event")
+        log.close()
+
+        log = RoundLog(os.path.join(directory, "bulk"), segment_bytes=4 << 20)
+        start = time.perf_counter()
+        records = write_rounds(log, args.rounds, args.tables)
+        elapsed = time.perf_counter() - start
+        log.close()
+        paths = segment_paths(log.directory)
+        size = sum(os.path.getsize(p) for p in paths)
+        print(f"write   {elapsed / records * 1e6:7.2f} us per record, {size / records:5.1f} bytes per record, "
+              f"{len(paths)} segments, {log.stats['writes']} writes")
+
+        reader = History(log.directory)
+        wanted = ("table-7", args.rounds // args.tables // 2)
+        start = time.perf_counter()
+        [found] = reader.rounds(*wanted)
+        indexed = time.perf_counter() - start
+        for path in paths:
+            os.remove(index_path(path))
+        start = time.perf_counter()
+        [scanned] = reader.rounds(*wanted)
+        scan = time.perf_counter() - start
+        assert found.view() == scanned.view()
+        print(f"lookup  {wanted[0]} round {wanted[1]}: index {indexed * 1e3:7.2f} ms, scan {scan * 1e3:8.1f} ms")
+
+        start = time.perf_counter()
+        count = sum(1 for _ in reader.rounds("table-7"))
+        print(f"replay  {count} rounds of one table by scan in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
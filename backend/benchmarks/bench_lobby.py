@@ -0,0 +1,79 @@
+# //backend/benchmarks/bench_lobby.py
+
+"""Lobby index cost against scanning every table.
+
+``--tables`` tables with random seat counts, stakes and phases go into a
+``Lobby``. The benchmark then times:
+
+* a seat change (``update``), as a join or disconnect makes
+* ``quick_join`` against a scan of all tables for the fullest open one,
+  which is what finding a table without the index costs
+* one ``/tables`` page, first and deep
+
+Run from backend/:  python -m benchmarks.bench_lobby --tables 100000
+"""
+
+import argparse
+import random
+import time
+
+from lobby import Lobby
+
+SEATS = 7
+STAKES = (0, 5, 25, 100)
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    lobby = Lobby(SEATS)
+    tables = {}
+    start = time.perf_counter()
+    for i in range(args.tables):
+        state = tables[f"t{i}"] = [rng.randint(0, SEATS), rng.choice(STAKES), rng.choice(("betting", "playing"))]
+        lobby.update(f"t{i}", *state)
+    print(f"{args.tables} tables indexed in {time.perf_counter() - start:.2f} s")
+
+    ids = list(tables)
+
+    def seat_change():
+        table_id = rng.choice(ids)
+        state = tables[table_id]
+        state[0] = max(0, min(SEATS, state[0] + rng.choice((-1, 1))))
+        lobby.update(table_id, *state)
+
+    def scan(stakes=25):
+        best = None
+        for table_id, (seated, table_stakes, phase) in tables.items():
+            if table_stakes == stakes and seated < SEATS and phase == "betting":
+                key = (SEATS - seated, table_id)
+                if best is None or key < best:
+                    best = key
+        return best
+
+    rows, cursor = lobby.page(limit=50)
+    for _ in range(args.tables // 100):
+        _, cursor = lobby.page(cursor=cursor, limit=50)
+    deep = cursor
+
+    print(f"update          {per_call(seat_change, args.calls) * 1e6:8.2f} us")
+    print(f"quick_join      {per_call(lambda: lobby.quick_join(25), args.calls) * 1e6:8.2f} us")
+    print(f"scan for a seat {per_call(scan, 20) * 1e6:8.0f} us")
+    print(f"page (first)    {per_call(lambda: lobby.page(limit=50), 2000) * 1e6:8.2f} us")
+    print(f"page (deep)     {per_call(lambda: lobby.page(cursor=deep, limit=50), 2000) * 1e6:8.2f} us")
+    print(f"diff drained    {len(lobby.drain()['changed'])} rows")
+
+
+if __name__ == "__main__":
+    main()
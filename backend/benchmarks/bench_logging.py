@@ -0,0 +1,102 @@
+# //backend/benchmarks/bench_logging.py
+
+"""Handler latency with logging off, at INFO and at DEBUG.
+
+One seated player hits until the round ends, then bets to start the next
+one (single-player tables auto-start). Each step is one socket event
+through the Flask-SocketIO test client, so the timing covers the whole
+handler: table lock, game logic, outbox flush and any log records. Logs go
+to /dev/null through the usual queue listener.
+
+Handler time is noisy next to the logging cost, so the second table times
+only the logging a hit does. It compares the 11 ``print`` calls the handler
+used to make (stdout to /dev/null) with its single ``log.debug`` record.
+
+Run from backend/:  python -m benchmarks.bench_logging --events 20000
+"""
+
+import argparse
+import contextlib
+import os
+import statistics
+import time
+
+import logs
+from app import app, socketio, rooms, players
+
+
+def run(level, events):
+    with open(os.devnull, "w") as sink:
+        logs.setup(level, stream=sink)
+        rooms.clear()
+        players.clear()
+        client = socketio.test_client(app)
+        client.emit("join", {"table_id": "bench-logging", "playerId": "p1", "username": "bench"})
+        room = rooms["bench-logging"]
+        times = []
+        for _ in range(events):
+            action = "hit" if room.game_started else "place_bet"
+            start = time.perf_counter()
+            client.emit(action, {"table_id": "bench-logging", "bet": 10})
+            times.append(time.perf_counter() - start)
+            client.get_received()
+        client.disconnect()
+        logs.flush()
+    times.sort()
+    return statistics.fmean(times), times[len(times) // 2], times[int(len(times) * 0.99)]
+
+
+def old_prints(data, sid, player_key, turn_order, index, current):
+    print("HIT EVENT RECEIVED", data)
+    print("IDENTITY CHECK")
+    print("request.sid:", sid)
+    print("player_key (from socket):", player_key)
+    print("playerId (from client):", data.get("playerId"))
+    print("TURN DEBUG")
+    print("player_key:", player_key)
+    print("turn_order:", turn_order)
+    print("current_turn_index:", index)
+    print("current_turn_key:", current)
+    print("[DEBUG] Emitting game_state for table", data["table_id"])
+
+
+def log_calls(level, calls):
+    """Seconds per hit spent on logging alone."""
+    data, turn_order = {"table_id": "t1", "playerId": "p1"}, ["p1", "p2", "p3"]
+    with open(os.devnull, "w") as sink:
+        if level == "print":
+            with contextlib.redirect_stdout(sink):
+                start = time.perf_counter()
+                for _ in range(calls):
+                    old_prints(data, "sid-1", "p1", turn_order, 0, "p1")
+                elapsed = time.perf_counter() - start
+        else:
+            logs.setup(level, stream=sink)
+            log = logs.get_logger("bench")
+            start = time.perf_counter()
+            for _ in range(calls):
+                log.debug("hit", table_id="t1", sid="sid-1", player_id="p1",
+                          client_player_id=data.get("playerId"), turn_order=lambda: list(turn_order),
+                          current_turn_index=0, current_turn="p1")
+            elapsed = time.perf_counter() - start
+            logs.flush()
+    return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    args = parser.parse_args()
+
+    run("OFF", 1000)    # warm up
+    for level in ("OFF", "INFO", "DEBUG"):
+        mean, p50, p99 = run(level, args.events)
+        print(f"{level:<6} mean {mean * 1e6:7.1f} us  p50 {p50 * 1e6:7.1f} us  p99 {p99 * 1e6:7.1f} us per event")
+
+    print("logging per hit, handler excluded:")
+    for level in ("print", "OFF", "INFO", "DEBUG"):
+        print(f"  {level:<6} {log_calls(level, args.events) * 1e6:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# //backend/benchmarks/bench_modes.py
+
+"""Load-test the server in each ASYNC_MODE: idle-connection capacity and
+p50/p99 action latency.
+
+Starts ``app.py`` in a subprocess per mode, opens ``--idle`` websocket
+connections that just sit there, then has ``--bots`` players each run
+``--actions`` hit/place_bet round trips while the idle sockets stay open.
+
+Run from backend/ (needs requirements-bench.txt):
+    python -m benchmarks.bench_modes --modes threading eventlet --idle 2000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import socketio
+
+STATE_EVENTS = ("game_state", "round_started", "card_dealt", "turn_changed", "round_over", "error_message")
+
+
+def start_server(mode, port):
+    # every bot comes from 127.0.0.1, so lift the per-client table limits
+    env = dict(os.environ, ASYNC_MODE=mode, PORT=str(port), MAX_TABLES_PER_CLIENT="1000000", TABLE_CREATE_BURST="1000000")
+    proc = subprocess.Popen([sys.executable, "app.py"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"server in {mode} mode did not start")
+
+
+async def open_idle(url, count, batch=200):
+    clients, failed = [], 0
+    for start in range(0, count, batch):
+        group = [socketio.AsyncClient(reconnection=False) for _ in range(min(batch, count - start))]
+        results = await asyncio.gather(*(c.connect(url, transports=["websocket"], wait_timeout=10) for c in group),
+                                       return_exceptions=True)
+        for client, result in zip(group, results):
+            if isinstance(result, Exception):
+                failed += 1
+            else:
+                clients.append(client)
+    return clients, failed
+
+
+async def bot(url, index, actions, latencies):
+    client = socketio.AsyncClient(reconnection=False)
+    replies = asyncio.Queue()
+    running = {"round": False}
+
+    def track(name):
+        async def handler(data):
+            if name in ("round_started", "game_state"):
+                running["round"] = not data.get("game_over", False)
+            elif name == "round_over":
+                running["round"] = False
+            await replies.put(name)
+        return handler
+
+    for name in STATE_EVENTS:
+        client.on(name, track(name))
+
+    await client.connect(url, transports=["websocket"], wait_timeout=10)
+    table_id = f"bench-{index}"
+    await client.emit("join", {"table_id": table_id, "playerId": f"bot-{index}", "username": f"bot{index}"})
+    await asyncio.sleep(0.5)
+    while not replies.empty():
+        replies.get_nowait()
+
+    for _ in range(actions):
+        action = "hit" if running["round"] else "place_bet"
+        start = time.perf_counter()
+        await client.emit(action, {"table_id": table_id, "bet": 10})
+        try:
+            await asyncio.wait_for(replies.get(), timeout=10)
+            latencies.append(time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            latencies.append(float("inf"))
+        while not replies.empty():
+            replies.get_nowait()
+    await client.disconnect()
+
+
+async def run_mode(mode, port, idle, bots, actions):
+    proc = start_server(mode, port)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        idle_clients, failed = await open_idle(url, idle)
+        latencies = []
+        await asyncio.gather(*(bot(url, i, actions, latencies) for i in range(bots)))
+        await asyncio.gather(*(c.disconnect() for c in idle_clients), return_exceptions=True)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    finite = sorted(x for x in latencies if x != float("inf"))
+    p99 = finite[int(len(finite) * 0.99) - 1] if finite else float("nan")
+    p50 = statistics.median(finite) if finite else float("nan")
+    print(f"{mode:<10} idle connected {len(idle_clients):>6}/{idle:<6} failed {failed:>5}   "
+          f"p50 {p50 * 1e3:7.2f} ms  p99 {p99 * 1e3:7.2f} ms  timeouts {len(latencies) - len(finite)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=["threading", "eventlet"])
+    parser.add_argument("--idle", type=int, default=1000)
+    parser.add_argument("--bots", type=int, default=50)
+    parser.add_argument("--actions", type=int, default=40)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+    for mode in args.modes:
+        asyncio.run(run_mode(mode, args.port, args.idle, args.bots, args.actions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# //backend/benchmarks/bench_providers.py
+
+"""One harness for every DeckProvider backend: single draws, bulk draws and
+7-seat opening deals per second. The remote backend runs against the local
+deck API stub.
+
+Run from backend/:  python -m benchmarks.bench_providers
+"""
+
+import time
+
+from deck_client import DeckClient, PrefetchDeck
+from deck_provider import RecordedDeck
+from deck_stub import DeckStub
+from shoe import Shoe, SeededShoe
+
+OPS = 100_000
+
+
+def rate(fn, n=OPS):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def run(name, deck):
+    def deal():
+        if deck.needs_reshuffle:
+            deck.reshuffle()
+        deck.deal_round(7)
+
+    single = rate(deck.draw_card)
+    bulk = rate(lambda: deck.draw(16)) * 16
+    deals = rate(deal, OPS // 10)
+    print(f"{name:<10} draw_card {single:>12,.0f}/s   draw(16) {bulk:>12,.0f} cards/s   deal_round(7) {deals:>10,.0f}/s")
+
+
+def main():
+    run("local", Shoe(6))
+    run("seeded", SeededShoe(1, 6))
+    run("recorded", RecordedDeck(Shoe(6).cards))
+    with DeckStub() as stub:
+        client = DeckClient(stub.base_url)
+        deck = PrefetchDeck(client, 6, batch=312, low_water=156)
+        time.sleep(0.5)  # let the first prefetch land
+        run("remote", deck)
+        print(f"remote fallback draws: {deck.fallback_draws:,} of {OPS * 17 + OPS // 10 * 16:,}")
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
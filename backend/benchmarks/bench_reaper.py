@@ -0,0 +1,62 @@
+# //backend/benchmarks/bench_reaper.py
+
+"""Registry memory under a flood of joins to random table ids, with and
+without the lifecycle caps, and the cost of one reaper pass.
+
+Each join creates a table with one seat and a one-deck shoe, as on_join
+does for an unknown table_id. The flood comes from many clients, so only
+the global ``max_tables`` cap applies; rate limits are lifted.
+
+Run from backend/:  python -m benchmarks.bench_reaper
+"""
+
+import time
+import tracemalloc
+
+from lifecycle import TableLifecycle, table_size
+from shoe import Shoe
+from tables import Table
+
+JOINS = 100_000
+MAX_TABLES = 10_000
+
+
+def flood(life):
+    rooms = {}
+    reclaimed = 0
+    for i in range(JOINS):
+        table_id = f"junk-{i}"
+        room = rooms[table_id] = Table(table_id, Shoe(1))
+        room.add_seat(f"p{i}", "bot", f"s{i}")
+        for victim in (life.created(table_id, f"client-{i}") if life is not None else ()):
+            evicted = rooms.pop(victim)
+            size = table_size(evicted)
+            life.forget(victim, "cap", size)
+            reclaimed += size
+    return rooms, reclaimed
+
+
+def main():
+    for name, life in (("unbounded", None),
+                       (f"max_tables={MAX_TABLES}", TableLifecycle(max_tables=MAX_TABLES, create_burst=JOINS))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        rooms, reclaimed = flood(life)
+        elapsed = time.perf_counter() - start
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<18} {len(rooms):>7,} tables  {size / 2**20:7.1f} MiB held  {peak / 2**20:7.1f} MiB peak  "
+              f"{elapsed / JOINS * 1e6:5.1f} us/join  ~{reclaimed / 2**20:.1f} MiB reclaimed")
+
+    # a reaper pass over a full registry where nothing is due
+    life = TableLifecycle(max_tables=JOINS, create_burst=JOINS)
+    for i in range(JOINS):
+        life.created(f"t{i}", f"client-{i}")
+        life.touch(f"t{i}", 1)
+    start = time.perf_counter()
+    due = life.expired()
+    print(f"reaper pass over {JOINS:,} live tables: {(time.perf_counter() - start) * 1e3:.2f} ms, {len(due)} due")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# //backend/benchmarks/bench_restore.py
+
+"""Snapshot and restore cost for a large number of tables.
+
+``--tables`` tables are set up mid-round (a few seats each, hands dealt,
+bets placed) on local shoes. The benchmark then times:
+
+* a full snapshot, every table encoded
+* an incremental snapshot after ``--changed`` of the tables moved, where the
+  rest reuse their cached bytes
+* reading the file back into tables, which is what startup waits for
+
+Run from backend/:  python -m benchmarks.bench_restore --tables 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from hand import Hand
+from shoe import Shoe
+from snapshot import Snapshotter, read_snapshot
+from tables import Table
+
+
+def make_tables(count, decks, rng):
+    rooms = {}
+    for i in range(count):
+        table = rooms[f"t{i}"] = Table(f"t{i}", Shoe(decks, rng=rng))
+        for s in range(rng.randint(1, 5)):
+            seat = table.add_seat(f"p{i}-{s}", f"player{s}", f"sid{i}-{s}")
+            seat.bet = rng.choice((5, 10, 25))
+            seat.hand = Hand(table.deck.draw(2))
+        table.dealer.hand = Hand(table.deck.draw(2))
+        table.game_started = True
+        table.round = rng.randint(1, 50)
+    return rooms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=100_000)
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--changed", type=float, default=0.05, help="share of tables changed between snapshots")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    start = time.perf_counter()
+    rooms = make_tables(args.tables, args.decks, rng)
+    print(f"{args.tables} tables ({args.decks}-deck shoes) built in {time.perf_counter() - start:.2f} s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tables.snap")
+        lock = threading.RLock()
+        snapshots = Snapshotter(path, rooms, lambda table_id: lock)
+
+        start = time.perf_counter()
+        snapshots.snapshot()
+        full = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        for table_id in rng.sample(list(rooms), int(args.tables * args.changed)):
+            room = rooms[table_id]
+            room.seats[room.turn_order[0]].hand.append(room.deck.draw_card())
+            room.touch()
+        start = time.perf_counter()
+        encoded = snapshots.snapshot()
+        incremental = time.perf_counter() - start
+
+        # as at startup, the tables are only in the file
+        rooms.clear()
+        start = time.perf_counter()
+        _, tables = read_snapshot(path)
+        restore = time.perf_counter() - start
+
+    print(f"snapshot (full)        {full:6.2f} s  {size / 1e6:7.1f} MB  {size / args.tables:6.0f} bytes per table")
+    print(f"snapshot (incremental) {incremental:6.2f} s  {encoded} tables encoded")
+    print(f"restore                {restore:6.2f} s  {len(tables)} tables  "
+          f"{restore / len(tables) * 1e6:5.1f} us per table")
+
+
+if __name__ == "__main__":
+    main()
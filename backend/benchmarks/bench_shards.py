@@ -0,0 +1,121 @@
+# //backend/benchmarks/bench_shards.py
+
+"""Tables per second as table shards are added.
+
+For each worker count, starts ``shards.py --workers N`` and has client
+processes play a fixed set of tables over real websockets. Each table is a
+connect, join (the round auto-starts), stay, wait for ``round_over``,
+disconnect. Clients connect to the owning shard's port by default. With
+``--any-port`` they connect anywhere, so most events are forwarded over the
+shard queue. Throughput should grow close to linearly until the server
+workers plus the client processes outnumber the cores.
+
+Run from backend/ (needs requirements-bench.txt):
+    python -m benchmarks.bench_shards --tables 2000 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import socketio
+
+from shards import shard_for
+
+
+def start_shards(workers, port):
+    # every client comes from 127.0.0.1, so lift the per-client table limits
+    env = dict(os.environ, MAX_TABLES_PER_CLIENT="1000000", TABLE_CREATE_BURST="1000000")
+    proc = subprocess.Popen([sys.executable, "shards.py", "--workers", str(workers), "--port", str(port)],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    for p in range(port, port + workers):
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", p), timeout=0.2).close()
+                break
+            except OSError:
+                if time.time() > deadline:
+                    proc.kill()
+                    raise RuntimeError(f"shard on port {p} did not start")
+                time.sleep(0.1)
+    return proc
+
+
+async def play_table(url, table_id):
+    client = socketio.AsyncClient(reconnection=False)
+    joined, done = asyncio.Event(), asyncio.Event()
+    client.on("game_state", lambda data: joined.set())
+    client.on("round_over", lambda data: done.set())
+    await client.connect(url, transports=["websocket"], wait_timeout=10)
+    try:
+        # events from one client may be handled out of order, so stay only once seated
+        await client.emit("join", {"table_id": table_id, "playerId": f"p-{table_id}", "username": "bench"})
+        await asyncio.wait_for(joined.wait(), timeout=10)
+        await client.emit("stay", {"table_id": table_id})
+        await asyncio.wait_for(done.wait(), timeout=10)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        await client.disconnect()
+
+
+async def play_tables(port, workers, table_ids, any_port, concurrency):
+    rng = random.Random(0)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(table_id):
+        shard = rng.randrange(workers) if any_port else shard_for(table_id, workers)
+        async with limit:
+            return await play_table(f"http://127.0.0.1:{port + shard}", table_id)
+
+    return sum(await asyncio.gather(*(one(t) for t in table_ids)))
+
+
+def client_process(args):
+    return asyncio.run(play_tables(*args))
+
+
+def run(workers, tables, clients, port, any_port, concurrency):
+    proc = start_shards(workers, port)
+    try:
+        table_ids = [f"bench-{workers}-{i}" for i in range(tables)]
+        chunks = [(port, workers, table_ids[i::clients], any_port, concurrency) for i in range(clients)]
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(clients) as pool:
+            played = sum(pool.map(client_process, chunks))
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return played, played / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=2, help="client processes driving the tables")
+    parser.add_argument("--concurrency", type=int, default=10, help="tables in flight per client process")
+    parser.add_argument("--any-port", action="store_true", help="connect to a random shard instead of the owner")
+    parser.add_argument("--port", type=int, default=5070)
+    args = parser.parse_args()
+
+    print(f"{args.tables} tables, {os.cpu_count()} cores, {args.clients} client processes")
+    first = None
+    for workers in args.workers:
+        played, rate = run(workers, args.tables, args.clients, args.port, args.any_port, args.concurrency)
+        first = first or rate
+        print(f"  {workers:>2} workers: {rate:8,.0f} tables/sec  ({rate / first:.2f}x the first run)  "
+              f"played {played}/{args.tables}")
+
+
+if __name__ == "__main__":
+    main()
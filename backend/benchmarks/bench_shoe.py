@@ -0,0 +1,58 @@
+# //backend/benchmarks/bench_shoe.py
+
+"""Cards/sec for the old per-card HTTP draw vs the local Shoe.
+
+Run from backend/:  python -m benchmarks.bench_shoe
+"""
+
+import time
+import requests
+
+from deck_stub import DeckStub
+from shoe import Shoe
+
+
+def old_draw(base_url, deck_id):
+    # the pre-shoe draw_card path: one blocking request per card
+    resp = requests.get(f"{base_url}/{deck_id}/draw/?count=1", timeout=5)
+    resp.raise_for_status()
+    api_card = resp.json()["cards"][0]
+    return {
+        "value": api_card.get("value"),
+        "suit": api_card.get("suit"),
+        "code": api_card.get("code"),
+        "image": api_card.get("image"),
+    }
+
+
+def rate(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def main(http_cards=2000, local_cards=1_000_000):
+    with DeckStub() as stub:
+        base = stub.base_url
+        deck_id = requests.get(f"{base}/new/shuffle/?deck_count=6").json()["deck_id"]
+
+        def http_draw():
+            nonlocal deck_id
+            try:
+                old_draw(base, deck_id)
+            except (IndexError, KeyError):
+                deck_id = requests.get(f"{base}/new/shuffle/?deck_count=6").json()["deck_id"]
+
+        old_rate = rate(http_draw, http_cards)
+
+    shoe = Shoe(6)
+    new_rate = rate(shoe.draw_card, local_cards)
+
+    print(f"HTTP draw (local stub): {old_rate:>12,.0f} cards/sec")
+    print(f"Local shoe draw:        {new_rate:>12,.0f} cards/sec")
+    print(f"Speedup:                {new_rate / old_rate:>12,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# //backend/benchmarks/bench_snapshots.py
+
+"""Emit CPU per action for game_state snapshots: rebuilding and encoding the
+state dict on every emit vs the per-table cache of encoded snapshots.
+
+Replays bench_broadcast's 7-seat rounds. Each action is followed by the full
+snapshots the old code emitted, plus ``--resyncs`` resync requests. Each
+snapshot is encoded into a Socket.IO packet, as the server does per emit.
+
+Run from backend/:  python -m benchmarks.bench_snapshots --resyncs 2
+"""
+
+import argparse
+import json
+import time
+
+from socketio import packet
+
+import encoded
+import game_state
+from tables import SNAPSHOT_STATS
+from benchmarks.bench_broadcast import SEATS, ROUNDS, new_room, play_round
+
+
+def run(snapshot, json_module, resyncs):
+    packet.Packet.json = json_module
+    room = new_room()
+    for i in range(SEATS):
+        room.add_seat(f"player-{i}", f"user{i}", f"sid-{i}")
+    actions = 0
+    elapsed = 0.0
+
+    def emit(r):
+        nonlocal elapsed
+        start = time.perf_counter()
+        packet.Packet(packet.EVENT, data=["game_state", snapshot(r)]).encode()
+        elapsed += time.perf_counter() - start
+
+    def delta(_):
+        nonlocal actions
+        actions += 1
+        for _ in range(resyncs):
+            emit(room)
+
+    for _ in range(ROUNDS):
+        play_round(room, full=emit, delta=delta)
+    return elapsed / actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resyncs", type=int, default=2, help="resync requests after each action")
+    args = parser.parse_args()
+
+    rebuild = run(game_state.build_state, json, args.resyncs)
+    SNAPSHOT_STATS.clear()
+    cached = run(lambda r: r.state(), encoded, args.resyncs)
+    packet.Packet.json = json
+    print(f"rebuild every emit  {rebuild * 1e6:8.1f} us/action")
+    print(f"cached snapshots    {cached * 1e6:8.1f} us/action  "
+          f"({rebuild / cached:.1f}x)  hits {SNAPSHOT_STATS['hit']:,}  misses {SNAPSHOT_STATS['miss']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# //backend/benchmarks/bench_tables.py
+
+"""Memory and access time for 100k tables: the old nested room dicts vs the
+``__slots__`` Table/Seat/DealerState model.
+
+Each table has two seated players and an empty dealer hand, plus the
+global sid registry entries. Decks are left out (bench_deck_memory covers
+them), so this measures only the table model.
+
+Run from backend/:  python -m benchmarks.bench_tables
+"""
+
+import time
+import tracemalloc
+
+from hand import Hand
+from tables import Table
+
+ROOMS = 100_000
+SEATS = 2
+
+
+def old_room(t, players):
+    # the literal create_room/on_join used to build, plus what join added per player
+    room = {
+        "players": {}, "players_data": {}, "deck": None,
+        "dealer": {"hand": Hand(), "score": 0}, "bets": {}, "game_started": False,
+        "turn_order": [], "current_turn_index": 0, "seq": 0,
+    }
+    for s in range(SEATS):
+        pid, sid, name = f"p{t}-{s}", f"s{t}-{s}", f"user{s}"
+        players[sid] = {"username": name, "player_id": pid, "table_id": f"t{t}"}
+        room["players"][pid] = {"sid": sid, "username": name}
+        room["players_data"][pid] = {"username": name, "hand": Hand(), "score": 0, "bet": 0}
+        room["turn_order"].append(pid)
+    return room
+
+
+def new_room(t, players):
+    room = Table(f"t{t}", None)
+    for s in range(SEATS):
+        sid = f"s{t}-{s}"
+        players[sid] = room.add_seat(f"p{t}-{s}", f"user{s}", sid)
+    return room
+
+
+def old_read(room):
+    return (room["game_started"], room["seq"], room["current_turn_index"],
+            room["dealer"]["hand"], room["players_data"]["p0-0"]["hand"])
+
+
+def new_read(room):
+    return (room.game_started, room.seq, room.current_turn_index,
+            room.dealer.hand, room.seats["p0-0"].hand)
+
+
+def measure(factory):
+    # both models build the same id strings, so the difference is the containers
+    tracemalloc.start()
+    players = {}
+    rooms = {f"t{t}": factory(t, players) for t in range(ROOMS)}
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rooms, size
+
+
+def main():
+    for name, factory, read in (("nested dicts", old_room, old_read), ("slots model", new_room, new_read)):
+        rooms, size = measure(factory)
+        room = rooms["t0"]
+        reads = 1_000_000
+        start = time.perf_counter()
+        for _ in range(reads):
+            read(room)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<13} {size / 2**20:8.1f} MiB total  {size / ROOMS:6.0f} B/table  "
+              f"{elapsed / reads * 1e9:6.1f} ns per 5-field read")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# //backend/benchmarks/bench_timers.py
+
+"""Timer wheel overhead with tens of thousands of pending deadlines.
+
+Every one of ``--timers`` tables keeps one deadline pending, as a table in
+play does: each fired timer is re-armed 5 to 30 s out, and each tick
+``--actions`` tables act and have their deadline cancelled and scheduled
+again (a hit resetting the turn timeout). The clock is simulated, so the
+timings are the wheel's own CPU cost, not sleeping.
+
+For comparison the same load runs on a ``heapq`` of deadlines with lazy
+cancellation, the usual alternative to a wheel.
+
+Run from backend/:  python -m benchmarks.bench_timers --timers 50000 --seconds 120
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+from timers import TimerWheel
+
+TICK = 0.05
+
+
+class HeapTimers:
+    """Deadlines in a heap; a cancelled entry stays until it reaches the top."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.heap = []
+        self.seq = 0
+
+    def schedule(self, delay, callback, *args):
+        self.seq += 1
+        entry = [self.clock() + delay, self.seq, callback, args, True]
+        heapq.heappush(self.heap, entry)
+        return entry
+
+    def cancel(self, entry):
+        entry[4] = False
+
+    def advance(self):
+        now, heap = self.clock(), self.heap
+        while heap and heap[0][0] <= now:
+            _, _, callback, args, live = heapq.heappop(heap)
+            if live:
+                callback(*args)
+
+
+def run(make, timers, actions, seconds, seed=1):
+    rng = random.Random(seed)
+    now = [0.0]
+    wheel = make(lambda: now[0])
+    pending = [None] * timers
+
+    def fired(table):
+        pending[table] = wheel.schedule(rng.uniform(5, 30), fired, table)
+
+    start = time.perf_counter()
+    for table in range(timers):
+        pending[table] = wheel.schedule(rng.uniform(0, 30), fired, table)
+    schedule_time = time.perf_counter() - start
+
+    ticks, tick_time, action_time = int(seconds / TICK), 0.0, 0.0
+    for _ in range(ticks):
+        now[0] += TICK
+        start = time.perf_counter()
+        for table in rng.sample(range(timers), actions):
+            wheel.cancel(pending[table])
+            pending[table] = wheel.schedule(rng.uniform(5, 30), fired, table)
+        action_time += time.perf_counter() - start
+        start = time.perf_counter()
+        wheel.advance()
+        tick_time += time.perf_counter() - start
+    return schedule_time / timers, action_time / (ticks * actions), tick_time / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, default=50_000)
+    parser.add_argument("--actions", type=int, default=200, help="deadlines reset per tick")
+    parser.add_argument("--seconds", type=float, default=120, help="simulated time")
+    args = parser.parse_args()
+
+    print(f"{args.timers} pending deadlines, {args.actions} resets per {TICK * 1000:.0f} ms tick, "
+          f"{args.seconds:g} s simulated")
+    for name, make in (("wheel", lambda clock: TimerWheel(TICK, clock=clock)), ("heapq", HeapTimers)):
+        schedule, reset, tick = run(make, args.timers, args.actions, args.seconds)
+        print(f"{name:<6} schedule {schedule * 1e6:5.2f} us  cancel+schedule {reset * 1e6:5.2f} us  "
+              f"advance {tick * 1e3:6.3f} ms per tick ({tick / TICK * 100:4.1f}% of one core)")
+
+
+if __name__ == "__main__":
+    main()
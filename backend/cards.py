@@ -0,0 +1,73 @@
+# //backend/cards.py
+
+"""Interned card table.
+
+The 52 cards are built once at import and shared by every shoe and hand.
+``Card`` is a read-only dict, so hands still JSON-encode to the same
+``value/suit/code/image`` objects the frontend renders.
+"""
+
+SUITS = ["HEARTS", "DIAMONDS", "CLUBS", "SPADES"]
+RANKS = ["ACE", "2", "3", "4", "5", "6", "7", "8", "9", "10", "JACK", "QUEEN", "KING"]
+
+# Card values
+CARD_VALUES = {
+    "ACE": 11,
+    "2": 2, "3": 3, "4": 4, "5": 5,
+    "6": 6, "7": 7, "8": 8, "9": 9,
+    "10": 10, "JACK": 10, "QUEEN": 10, "KING": 10,
+}
+
+# short codes used by the deckofcardsapi static images ("0" is the ten)
+RANK_CODES = {
+    "ACE": "A", "JACK": "J", "QUEEN": "Q", "KING": "K", "10": "0",
+    "2": "2", "3": "3", "4": "4", "5": "5", "6": "6", "7": "7", "8": "8", "9": "9",
+}
+SUIT_CODES = {"HEARTS": "H", "DIAMONDS": "D", "CLUBS": "C", "SPADES": "S"}
+
+IMAGE_URL = "https://deckofcardsapi.com/static/img/{code}.png"
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("Card objects are shared and cannot be modified.")
+
+
+class Card(dict):
+    """Immutable card. ``index`` is its position in ``CARDS`` (rank * 4 + suit)
+    and ``points`` its blackjack value with aces counted as 11."""
+
+    __slots__ = ("index", "points")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __init__(self, index):
+        rank, suit = RANKS[index // 4], SUITS[index % 4]
+        code = RANK_CODES[rank] + SUIT_CODES[suit]
+        super().__init__(value=rank, suit=suit, code=code, image=IMAGE_URL.format(code=code))
+        object.__setattr__(self, "index", index)
+        object.__setattr__(self, "points", CARD_VALUES[rank])
+
+    def __setattr__(self, name, value):
+        _readonly(self)
+
+    def __reduce__(self):
+        # unpickle/deepcopy back to the interned instance
+        return card_from_index, (self.index,)
+
+    def __repr__(self):
+        return f"Card({self['code']})"
+
+
+CARDS = tuple(Card(i) for i in range(52))
+CODE_TO_INDEX = {card["code"]: card.index for card in CARDS}
+
+
+def card_from_index(index):
+    """The shared card for an index 0..51."""
+    return CARDS[index]
+
+
+def card_code(index):
+    """Deck of cards API code ("AS", "0H", ...) for a card index 0..51."""
+    return CARDS[index]["code"]
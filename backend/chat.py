@@ -0,0 +1,112 @@
+# //backend/chat.py
+
+"""Chat: recent messages per table and globally, rate limited and sent in batches.
+
+Each table has a ring buffer (a ``deque`` with ``maxlen=history``) of its
+latest messages, and the global channel (table_id None) has its own of
+``global_history``. Posting a message appends it to its ring and to the
+channel's pending batch. app.py drains the batches every ``CHAT_INTERVAL``
+and sends each channel's batch as one ``chat_batch`` emit. A busy table then
+costs one emit per interval however many messages it gets. A pending batch
+is bounded like the ring: if more than ``history`` messages arrive within
+one interval, the oldest are dropped (counted in ``stats["dropped"]``).
+
+System messages (joins, bets, stays, ...) describe game events, so they
+must not arrive after the state events that follow them. They only go into
+the ring (``record``) and app.py sends each one straight away, in order with
+the handler's other emits. Player messages first take a token from the
+sender's bucket (``rate`` per second, ``burst`` saved up), so one client
+cannot flood a table. A player joining a table gets its ring in one
+``chat_history`` payload.
+"""
+
+from collections import Counter, deque
+import threading
+import time
+
+from lifecycle import TokenBucket
+
+
+class Chat:
+
+    def __init__(self, history=50, global_history=100, rate=1.0, burst=5, max_length=500, clock=time.monotonic):
+        self.history = history
+        self.global_history = global_history
+        self.rate = rate
+        self.burst = burst
+        self.max_length = max_length
+        self.clock = clock
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._rings = {}            # table_id (None for global) -> deque of messages
+        self._pending = {}          # table_id -> deque of messages since the last drain
+        self._buckets = {}          # sender -> TokenBucket
+
+    def __len__(self):
+        return len(self._rings)
+
+    def allow(self, sender):
+        """Take a message token for ``sender``; False means rate limited."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(sender)
+            if bucket is None:
+                bucket = self._buckets[sender] = TokenBucket(self.rate, self.burst, now)
+            if bucket.take(now):
+                return True
+        self.stats["rate_limited"] += 1
+        return False
+
+    def post(self, table_id, username, text, kind="player"):
+        """Add a message to ``table_id``'s channel (None for global) and its
+        next batch, and return it. ``kind`` only labels the count in ``stats``."""
+        return self._add(table_id, username, text, kind, batch=True)
+
+    def record(self, table_id, username, text, kind="system"):
+        """Add a message to the channel's recent messages only, for a caller
+        that sends it itself; returns it."""
+        return self._add(table_id, username, text, kind, batch=False)
+
+    def _add(self, table_id, username, text, kind, batch):
+        message = {"username": username, "message": text[:self.max_length], "tableId": table_id,
+                   "isglobal": table_id is None}
+        size = self.history if table_id is not None else self.global_history
+        with self._lock:
+            ring = self._rings.get(table_id)
+            if ring is None:
+                ring = self._rings[table_id] = deque(maxlen=size)
+            ring.append(message)
+            if batch:
+                pending = self._pending.get(table_id)
+                if pending is None:
+                    pending = self._pending[table_id] = deque(maxlen=size)
+                elif len(pending) == size:
+                    self.stats["dropped"] += 1
+                pending.append(message)
+        self.stats[kind] += 1
+        return message
+
+    def backlog(self, table_id):
+        """The channel's recent messages, oldest first."""
+        with self._lock:
+            return list(self._rings.get(table_id, ()))
+
+    def drain(self):
+        """Messages posted since the last drain, as (table_id, [messages]) per channel."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        self.stats["batches"] += len(pending)
+        return [(table_id, list(messages)) for table_id, messages in pending.items()]
+
+    def forget(self, table_id):
+        """Drop a closed table's messages."""
+        with self._lock:
+            self._rings.pop(table_id, None)
+            self._pending.pop(table_id, None)
+
+    def expire(self):
+        """Drop the buckets of senders that have been quiet long enough to refill."""
+        now = self.clock()
+        with self._lock:
+            self._buckets = {sender: bucket for sender, bucket in self._buckets.items()
+                             if bucket.tokens + (now - bucket.updated) * bucket.rate < bucket.burst}
@@ -0,0 +1,177 @@
+# //backend/deck_client.py
+
+from collections import Counter, deque
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cards import CARDS, CODE_TO_INDEX
+from deck_provider import DeckProvider
+from shoe import Shoe
+import logs
+
+log = logs.get_logger("deck_client")
+
+DECK_API_BASE = "https://deckofcardsapi.com/api/deck"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of making a request while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures; after ``reset_after``
+    seconds it lets one trial request through (half-open)."""
+
+    def __init__(self, threshold=3, reset_after=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None and self.clock() - self.opened_at < self.reset_after
+
+    def allow(self):
+        return not self.is_open
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = self.clock()
+
+
+class DeckClient:
+    """Deck of Cards API client on one pooled, keep-alive session.
+
+    Under ``ASYNC_MODE=eventlet`` the sockets are monkey-patched, so these
+    calls yield to other green threads instead of blocking a worker. Requests
+    fail fast with ``CircuitOpen`` while the breaker is open.
+
+    ``stats`` counts requests by result ("ok", "error", "circuit_open") and
+    the cards PrefetchDecks on this client dealt from the API buffer
+    ("buffered_cards") or from their local fallback shoe ("fallback_cards").
+    """
+
+    def __init__(self, base_url=DECK_API_BASE, pool_size=20, timeout=5, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = Counter()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(self, path):
+        if not self.breaker.allow():
+            self.stats["circuit_open"] += 1
+            raise CircuitOpen("Deck API circuit is open")
+        try:
+            resp = self.session.get(f"{self.base_url}/{path}", timeout=self.timeout)
+            resp.raise_for_status()
+            data = resp.json()
+            if not data.get("success", True):
+                raise ValueError(data.get("error", "Deck API request failed"))
+        except Exception:
+            self.stats["error"] += 1
+            self.breaker.record_failure()
+            raise
+        self.stats["ok"] += 1
+        self.breaker.record_success()
+        return data
+
+    def new_deck(self, deck_count=1):
+        """Create a shuffled API deck and return its deck_id."""
+        return self._get(f"new/shuffle/?deck_count={deck_count}")["deck_id"]
+
+    def draw(self, deck_id, count=1):
+        """Draw ``count`` cards; returns the API's raw card dicts."""
+        return self._get(f"{deck_id}/draw/?count={count}")["cards"]
+
+    def close(self):
+        self.session.close()
+
+
+class PrefetchDeck(DeckProvider):
+    """Remote API deck served from a local buffer.
+
+    Draws pop cards that were fetched ahead of time, so they never wait on
+    the network. When the buffer drops below ``low_water`` a background
+    task (``spawn``) fetches the next ``batch``. If the buffer is empty,
+    because the API is slow or the breaker is open, cards come from the local
+    ``fallback`` shoe instead.
+    """
+
+    def __init__(self, client, decks=6, batch=52, low_water=26, fallback=None, spawn=None):
+        self.client = client
+        self.decks = decks
+        self.batch = batch
+        self.low_water = low_water
+        self.fallback = fallback or Shoe(decks)
+        self.spawn = spawn or (lambda fn: threading.Thread(target=fn, daemon=True).start())
+        self.buffer = deque()
+        self.deck_id = None
+        self.api_remaining = 0
+        self.fallback_draws = 0
+        self._refilling = False
+        self._lock = threading.Lock()
+        self._maybe_refill()
+
+    def __len__(self):
+        return 52 * self.decks
+
+    def remaining(self):
+        return len(self.buffer) + self.api_remaining
+
+    def reshuffle(self):
+        """Drop the buffered cards and start a new API deck."""
+        self.buffer.clear()
+        self.deck_id = None
+        self.api_remaining = 0
+        self._maybe_refill()
+
+    def _maybe_refill(self):
+        with self._lock:
+            if self._refilling or len(self.buffer) >= self.low_water or not self.client.breaker.allow():
+                return
+            self._refilling = True
+        self.spawn(self._refill)
+
+    def _refill(self):
+        try:
+            if self.deck_id is None or self.api_remaining <= 0:
+                self.deck_id = self.client.new_deck(self.decks)
+                self.api_remaining = 52 * self.decks
+            cards = self.client.draw(self.deck_id, min(self.batch, self.api_remaining))
+            self.api_remaining -= len(cards)
+            self.buffer.extend(CARDS[CODE_TO_INDEX[c["code"]]] for c in cards)
+        except Exception as e:
+            log.warning("deck API prefetch failed", error=str(e))
+        finally:
+            self._refilling = False
+
+    def draw_card(self):
+        try:
+            card = self.buffer.popleft()
+            self.client.stats["buffered_cards"] += 1
+        except IndexError:
+            self.fallback_draws += 1
+            self.client.stats["fallback_cards"] += 1
+            card = self.fallback.draw_card()
+        self._maybe_refill()
+        return card
+
+    def draw(self, count=1):
+        return [self.draw_card() for _ in range(count)]
+
+    def undraw(self, cards):
+        self.buffer.extendleft(reversed(cards))
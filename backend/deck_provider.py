@@ -0,0 +1,108 @@
+# //backend/deck_provider.py
+
+"""Common interface for every table deck backend.
+
+All backends hand out the interned ``cards.Card`` objects (the canonical
+card, identified by its ``index`` 0..51) and support:
+
+    draw(count)       bulk draw, returns a list of cards
+    draw_card()       one card
+    undraw(cards)     put just-drawn cards back on top
+    remaining()       cards left before the backend has to reshuffle/refill
+    reshuffle()       start a fresh shoe
+    needs_reshuffle   True once the cut card is out (checked between rounds)
+
+Backends:
+    shoe.Shoe               local shuffled multi-deck shoe ("local")
+    shoe.SeededShoe         deterministic shoe from an integer seed ("seeded")
+    deck_provider.RecordedDeck   replays a fixed card sequence ("recorded")
+    deck_client.PrefetchDeck     deck API cards from a prefetched buffer ("remote")
+"""
+
+from array import array
+
+from cards import CARDS, CODE_TO_INDEX
+
+# a dealer standing on 17 takes about 1.5 extra cards on average
+DEALER_BATCH = 3
+
+
+class DeckProvider:
+
+    needs_reshuffle = False
+
+    def draw(self, count=1):
+        raise NotImplementedError
+
+    def undraw(self, cards):
+        raise NotImplementedError
+
+    def remaining(self):
+        raise NotImplementedError
+
+    def reshuffle(self):
+        raise NotImplementedError
+
+    def draw_card(self):
+        return self.draw(1)[0]
+
+    def deal_round(self, seats):
+        """Deal the opening round in casino order: one card to each seat, the
+        dealer's upcard, a second card to each seat, then the dealer's hole card.
+
+        Returns ``(seat_hands, dealer_hand)``.
+        """
+        cards = self.draw(2 * seats + 2)
+        hands = [[cards[i], cards[seats + 1 + i]] for i in range(seats)]
+        return hands, [cards[seats], cards[-1]]
+
+    def draw_until(self, hand, done, batch=DEALER_BATCH):
+        """Append cards to ``hand`` until ``done(hand)``, reserving them ``batch``
+        at a time and returning any unused cards to the deck."""
+        while not done(hand):
+            cards = self.draw(batch)
+            for used, card in enumerate(cards, 1):
+                hand.append(card)
+                if done(hand):
+                    self.undraw(cards[used:])
+                    break
+        return hand
+
+
+class RecordedDeck(DeckProvider):
+    """Deals a fixed sequence of cards, e.g. a logged shoe or a test scenario.
+    Reshuffling (or running out) starts the sequence again from the top."""
+
+    def __init__(self, indices):
+        self.cards = array("B", indices)
+        if not self.cards:
+            raise ValueError("A recorded deck needs at least one card.")
+        self.position = 0
+
+    @classmethod
+    def from_codes(cls, codes):
+        """Build from API codes such as ``["AS", "0H", "KD"]``."""
+        return cls(CODE_TO_INDEX[code] for code in codes)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def remaining(self):
+        return len(self.cards) - self.position
+
+    def reshuffle(self):
+        self.position = 0
+
+    def draw(self, count=1):
+        out = []
+        while count > 0:
+            if self.position >= len(self.cards):
+                self.position = 0
+            chunk = self.cards[self.position:self.position + count]
+            self.position += len(chunk)
+            count -= len(chunk)
+            out.extend(CARDS[i] for i in chunk)
+        return out
+
+    def undraw(self, cards):
+        self.position = max(0, self.position - len(cards))
@@ -0,0 +1,95 @@
+# //backend/deck_stub.py
+
+"""Local stand-in for deckofcardsapi.com, used by benchmarks and tests.
+
+Serves the two endpoints the backend uses (``/api/deck/new/shuffle/`` and
+``/api/deck/<id>/draw/``) with the same JSON shape as the real API.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import random
+import threading
+import uuid
+
+from cards import card_from_index
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+        server = self.server
+        server.requests += 1
+        if server.fail:
+            return self._send(500, {"success": False})
+
+        if parts[-2:] == ["new", "shuffle"]:
+            count = int(query.get("deck_count", ["1"])[0])
+            deck_id = uuid.uuid4().hex[:12]
+            cards = list(range(52)) * count
+            random.shuffle(cards)
+            server.decks[deck_id] = cards
+            return self._send(200, {"success": True, "deck_id": deck_id, "shuffled": True, "remaining": len(cards)})
+
+        if parts[-1] == "draw" and len(parts) >= 2:
+            cards = server.decks.get(parts[-2])
+            if cards is None:
+                return self._send(404, {"success": False, "error": "Deck ID does not exist."})
+            count = int(query.get("count", ["1"])[0])
+            drawn = [cards.pop() for _ in range(min(count, len(cards)))]
+            return self._send(200, {
+                "success": True,
+                "deck_id": parts[-2],
+                "cards": [card_from_index(i) for i in drawn],
+                "remaining": len(cards),
+            })
+
+        self._send(404, {"success": False})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class DeckStub:
+    """Run the stub server on a free localhost port in a daemon thread."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.decks = {}
+        self.server.requests = 0
+        self.server.fail = False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/api/deck"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def set_failing(self, fail=True):
+        self.server.fail = fail
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,30 @@
+# //backend/encoded.py
+
+"""Pre-encoded JSON payloads for Socket.IO emits.
+
+The server's packets are encoded with this module (``SocketIO(json=...)``).
+``dumps`` works like ``json.dumps`` except that an ``Encoded`` payload is
+spliced in as its cached text. That way a snapshot emitted many times is
+serialized once, not once per emit.
+"""
+
+import json
+
+loads = json.loads
+
+
+class Encoded:
+    """A payload and its JSON text. ``data`` is kept for server-side readers."""
+
+    __slots__ = ("data", "text")
+
+    def __init__(self, data):
+        self.data = data
+        self.text = json.dumps(data, separators=(",", ":"))
+
+
+def dumps(obj, **kwargs):
+    if isinstance(obj, list) and any(isinstance(item, Encoded) for item in obj):
+        return "[" + ",".join(item.text if isinstance(item, Encoded) else json.dumps(item, **kwargs)
+                              for item in obj) + "]"
+    return json.dumps(obj, **kwargs)
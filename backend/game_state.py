@@ -0,0 +1,90 @@
+# //backend/game_state.py
+
+"""Versioned table state: full snapshots and the compact deltas between them.
+
+Every delta takes the next value of the table's ``seq`` counter, and every
+snapshot carries the current one, so a client that sees a jump in ``seq``
+knows it missed an event and asks for a ``resync``.
+
+Delta events (all carry ``seq``):
+    player_joined  {playerId, player}
+    player_left    {playerId}
+    bet_placed     {playerId, pending_bet}   (the stake for the next round)
+    round_started  {dealer, players, turn}
+    card_dealt     {playerId, card, score}
+    turn_changed   {turn}
+    round_over     {dealer, results}   (results: player_id -> outcome label)
+"""
+
+from hand import calculate_score
+
+DELTA_EVENTS = ("player_joined", "player_left", "bet_placed", "round_started",
+                "card_dealt", "turn_changed", "round_over")
+
+HIDDEN_CARD = {"value": "hidden", "suit": "hidden", "code": "BACK", "image": None, "hidden": True}
+
+
+def current_turn(table):
+    """player_id whose turn it is, or None outside a round."""
+    if table.game_started and table.current_turn_index < len(table.turn_order):
+        return table.turn_order[table.current_turn_index]
+    return None
+
+
+def dealer_view(table, reveal=None):
+    """Dealer hand as clients may see it: hole card hidden while the round runs
+    unless ``reveal`` says otherwise."""
+    hand = table.dealer.hand
+    if reveal is None:
+        reveal = not table.game_started
+    if not reveal and hand:
+        return {"hand": [hand[0], HIDDEN_CARD], "score": "?"}
+    return {"hand": list(hand), "score": calculate_score(hand)}
+
+
+def players_view(table):
+    return {player_id: seat.view() for player_id, seat in table.seats.items()}
+
+
+def build_state(table, reveal=None):
+    """Full snapshot, sent on join and resync (tables.Table.state() caches it)."""
+    game_started = table.game_started
+    return {
+        "seq": table.seq,
+        "dealer": dealer_view(table, reveal),
+        "players": players_view(table),
+        "turn": current_turn(table),
+        "reveal_dealer_hand": not game_started,
+        "reveal_hands": not game_started,
+        "game_over": not game_started,
+    }
+
+
+def next_seq(table):
+    """Advance the table to its next sequence number, for a delta or for a
+    broadcast snapshot that replaces one."""
+    table.touch()
+    table.seq += 1
+    return table.seq
+
+
+def make_delta(table, **fields):
+    """Stamp a delta with the table's next sequence number."""
+    fields["seq"] = next_seq(table)
+    return fields
+
+
+def round_started(table):
+    return make_delta(table, dealer=dealer_view(table), players=players_view(table), turn=current_turn(table))
+
+
+def card_dealt(table, player_id, card, score):
+    return make_delta(table, playerId=player_id, card=card, score=score)
+
+
+def turn_changed(table):
+    return make_delta(table, turn=current_turn(table))
+
+
+def round_over(table, results):
+    return make_delta(table, dealer=dealer_view(table), results=results)
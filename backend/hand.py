@@ -0,0 +1,111 @@
+# //backend/hand.py
+
+"""Blackjack hands with running totals.
+
+``Hand`` is a list of card dicts (so it serializes to the same JSON as the
+plain lists it replaces) that updates its hard total and ace count as cards
+are appended, making score lookups O(1).
+"""
+
+from cards import CARD_VALUES
+
+
+def card_points(card):
+    """Blackjack value of a card, with aces counted as 11."""
+    try:
+        return card.points
+    except AttributeError:
+        return CARD_VALUES.get(card["value"], 0)
+
+
+def calculate_score(hand):
+    if isinstance(hand, Hand):
+        return hand.score
+    score, aces = 0, 0
+    for card in hand:
+        score += CARD_VALUES.get(card["value"], 0)
+        if card["value"] == "ACE":
+            aces += 1
+    while score > 21 and aces:
+        score -= 10
+        aces -= 1
+    return score
+
+
+class Hand(list):
+    """List of cards with a cached hard total (aces as 1) and ace count."""
+
+    __slots__ = ("hard", "aces")
+
+    def __init__(self, cards=()):
+        super().__init__()
+        self.hard = 0
+        self.aces = 0
+        self.extend(cards)
+
+    def _add(self, card):
+        points = card_points(card)
+        if points == 11:
+            self.aces += 1
+            points = 1
+        self.hard += points
+
+    def _recount(self):
+        self.hard = self.aces = 0
+        for card in self:
+            self._add(card)
+
+    def append(self, card):
+        super().append(card)
+        self._add(card)
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    # anything that removes or replaces cards falls back to a full recount
+    def _recounting(name):
+        method = getattr(list, name)
+
+        def wrapper(self, *args):
+            result = method(self, *args)
+            self._recount()
+            return result
+        wrapper.__name__ = name
+        return wrapper
+
+    insert = _recounting("insert")
+    pop = _recounting("pop")
+    remove = _recounting("remove")
+    clear = _recounting("clear")
+    __setitem__ = _recounting("__setitem__")
+    __delitem__ = _recounting("__delitem__")
+    del _recounting
+
+    def __reduce__(self):
+        return Hand, (list(self),)
+
+    @property
+    def soft(self):
+        """True when an ace is currently counted as 11."""
+        return self.aces > 0 and self.hard + 10 <= 21
+
+    @property
+    def score(self):
+        return self.hard + 10 if self.soft else self.hard
+
+    @property
+    def is_bust(self):
+        return self.hard > 21
+
+    @property
+    def is_blackjack(self):
+        return len(self) == 2 and self.score == 21
+
+    @property
+    def is_soft_17(self):
+        return self.soft and self.hard == 7
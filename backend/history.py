@@ -0,0 +1,507 @@
+# //backend/history.py
+
+"""Append-only round history: every bet, deal, hit, stay and result.
+
+``RoundLog`` packs each event into a few bytes and appends it to an
+in-memory buffer under a short lock. The buffer goes to disk once it holds
+``flush_bytes``, and ``run()`` (a background task) writes what is left and
+fsyncs every ``fsync_interval`` seconds. An event costs a ``struct.pack``
+and a ``bytearray`` append on the hot path. A crash loses at most the last
+interval.
+
+The log is a series of segment files ``<prefix>-<n>.log``. At
+``segment_bytes`` the segment is sealed: its index ``<prefix>-<n>.idx`` is
+written beside it and a new segment starts. A restart always starts a new
+segment, and segments left unsealed by a crash get their index then.
+
+Segment layout (little endian): a 16-byte header ``b"BJRL"``, version u16,
+2 pad bytes and start time f64 (unix seconds). Then records, each a 15-byte
+header ``kind u8, payload length u16, table u32, round u32, ms u32`` (ms
+since the segment started) and a payload:
+
+    NAME    utf-8 text. Numbers the string in ``table`` for this segment.
+            Table ids and player ids are written once per segment.
+    BET     player u32, amount f64. ``round`` is the round it is staked on.
+    DEAL    seat count u8, then per seat player u32, bet f64, cards;
+            then the dealer's cards
+    HIT     player u32, card u8
+    STAY    player u32
+    RESULT  the dealer's final cards, then count u8 and per seat
+            player u32, outcome u8 (index into ``OUTCOMES``)
+
+Cards are a count u8 followed by one ``cards.CARDS`` index u8 per card.
+Rounds are numbered per table from 1. A table that is evicted and created
+again starts from 1 again.
+
+Index layout: a 16-byte header ``b"BJRI"``, version u16, 2 pad bytes,
+entry count u32 and name count u32. Then the entries, one per
+(table, round) in the segment, sorted: table u32, round u32, offset u64 of
+the round's first record. The segment's names follow, each a u16 length and
+utf-8. ``RoundIndex`` memory-maps the file and binary-searches the entries.
+
+``History`` reads a log directory back. It follows the index into sealed
+segments and streams the open one. ``Round.replay`` recomputes every
+outcome from the recorded cards and ``Round.mismatches`` lists the seats
+whose recorded result disagrees.
+"""
+
+from collections import Counter
+import glob
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from cards import card_from_index, card_code
+from hand import Hand
+from rules import Rules, outcome_label
+
+MAGIC = b"BJRL"
+INDEX_MAGIC = b"BJRI"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxd")
+INDEX_HEADER = struct.Struct("<4sHxxII")
+RECORD = struct.Struct("<BHIII")
+ENTRY = struct.Struct("<IIQ")
+NAME_LENGTH = struct.Struct("<H")
+
+NAME, BET, DEAL, HIT, STAY, RESULT = range(6)
+KINDS = ("name", "bet", "deal", "hit", "stay", "result")
+OUTCOMES = ("Win", "Push", "Lose", "Lose (bust)")
+OUTCOME_CODES = {label: code for code, label in enumerate(OUTCOMES)}
+
+PLAYER = struct.Struct("<I")
+PLAYER_AMOUNT = struct.Struct("<Id")
+PLAYER_CARD = struct.Struct("<IB")
+PLAYER_OUTCOME = struct.Struct("<IB")
+
+# the round field of a NAME record
+NO_ROUND = 0
+
+
+def _cards(hand):
+    return bytes((len(hand), *(card.index for card in hand)))
+
+
+def _amount(value):
+    # bets arrive from clients as they were sent
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class RoundLog:
+    """Writer for one process's history. Safe to call from any handler."""
+
+    def __init__(self, directory, prefix="rounds", segment_bytes=16 << 20, flush_bytes=64 << 10,
+                 fsync_interval=1.0, clock=time.time):
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_bytes = segment_bytes
+        self.flush_bytes = flush_bytes
+        self.fsync_interval = fsync_interval
+        self.clock = clock
+        self.stats = Counter()
+        self.closed = False
+        self._lock = threading.Lock()         # buffer, file writes and rotation
+        self._sync_lock = threading.Lock()    # keeps a segment open while it is fsynced
+        self._buffer = bytearray()
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+        for path in segment_paths(directory, prefix):
+            if not os.path.exists(index_path(path)):
+                build_index(path)
+        existing = segment_paths(directory, prefix)
+        self._number = _segment_number(existing[-1]) + 1 if existing else 0
+        self._open_segment()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.prefix}-{self._number:06d}.log")
+
+    def _open_segment(self):
+        self._start = self.clock()
+        self._file = open(self.path, "xb")
+        self._written = HEADER.size
+        self._file.write(HEADER.pack(MAGIC, VERSION, self._start))
+        self._file.flush()
+        self._names = {}           # text -> number in this segment
+        self._name_list = []
+        self._entries = []         # (table, round, offset)
+        self._last_round = {}      # table number -> round of its latest entry
+
+    def _name(self, text):
+        number = self._names.get(text)
+        if number is None:
+            number = self._names[text] = len(self._name_list)
+            self._name_list.append(text)
+            data = text.encode()
+            self._buffer += RECORD.pack(NAME, len(data), number, NO_ROUND, 0) + data
+        return number
+
+    def _append(self, kind, table_id, round_no, payload):
+        """Buffer one record. ``payload`` is a function of the name lookup, so
+        player numbers are assigned under the lock."""
+        with self._lock:
+            if self.closed:
+                return
+            table = self._name(table_id)
+            data = payload(self._name)
+            if self._last_round.get(table) != round_no:
+                self._last_round[table] = round_no
+                self._entries.append((table, round_no, self._written + len(self._buffer)))
+            ms = int((self.clock() - self._start) * 1000)
+            self._buffer += RECORD.pack(kind, len(data), table, round_no, ms) + data
+            self.stats[KINDS[kind]] += 1
+            if len(self._buffer) >= self.flush_bytes:
+                self._write()
+
+    def bet(self, table_id, round_no, player_id, amount):
+        self._append(BET, table_id, round_no, lambda name: PLAYER_AMOUNT.pack(name(player_id), _amount(amount)))
+
+    def deal(self, table_id, round_no, seats, dealer_hand):
+        """``seats`` yields (player_id, bet, hand) in turn order."""
+        seats = list(seats)
+
+        def payload(name):
+            parts = [bytes((len(seats),))]
+            for player_id, bet, hand in seats:
+                parts.append(PLAYER_AMOUNT.pack(name(player_id), _amount(bet)))
+                parts.append(_cards(hand))
+            parts.append(_cards(dealer_hand))
+            return b"".join(parts)
+        self._append(DEAL, table_id, round_no, payload)
+
+    def hit(self, table_id, round_no, player_id, card):
+        self._append(HIT, table_id, round_no, lambda name: PLAYER_CARD.pack(name(player_id), card.index))
+
+    def stay(self, table_id, round_no, player_id):
+        self._append(STAY, table_id, round_no, lambda name: PLAYER.pack(name(player_id)))
+
+    def result(self, table_id, round_no, dealer_hand, outcomes):
+        """``outcomes`` yields (player_id, outcome label from rules.outcome_label)."""
+        outcomes = list(outcomes)
+
+        def payload(name):
+            parts = [_cards(dealer_hand), bytes((len(outcomes),))]
+            parts += [PLAYER_OUTCOME.pack(name(player_id), OUTCOME_CODES[label]) for player_id, label in outcomes]
+            return b"".join(parts)
+        self._append(RESULT, table_id, round_no, payload)
+
+    def _write(self):
+        # caller holds self._lock
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._written += len(self._buffer)
+            self.stats["bytes"] += len(self._buffer)
+            self.stats["writes"] += 1
+            self._buffer.clear()
+        if self._written >= self.segment_bytes:
+            self._seal()
+            self._number += 1
+            self._open_segment()
+
+    def _seal(self):
+        # caller holds self._lock
+        with self._sync_lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+        write_index(index_path(self.path), self._entries, self._name_list)
+        self.stats["segments"] += 1
+
+    def flush(self, fsync=False):
+        """Write the buffer out, and with ``fsync`` force it to disk."""
+        with self._lock:
+            if self.closed:
+                return
+            self._write()
+            file = self._file
+            self._sync_lock.acquire()
+        try:
+            if fsync:
+                os.fsync(file.fileno())
+                self.stats["fsyncs"] += 1
+        finally:
+            self._sync_lock.release()
+
+    def run(self, sleep=time.sleep):
+        """Flush and fsync every ``fsync_interval`` until closed. Run it as a
+        background task."""
+        while not self.closed:
+            sleep(self.fsync_interval)
+            self.flush(fsync=True)
+
+    def close(self):
+        """Write everything out and seal the current segment."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._write()
+            self._seal()
+
+
+def _segment_number(path):
+    return int(os.path.basename(path).rsplit("-", 1)[1].split(".")[0])
+
+
+def segment_paths(directory, prefix="*"):
+    """The directory's segments, oldest first within each prefix."""
+    return sorted(glob.glob(os.path.join(glob.escape(directory), f"{prefix}-*.log")))
+
+
+def index_path(path):
+    return path[:-len(".log")] + ".idx"
+
+
+def write_index(path, entries, names):
+    encoded = [name.encode() for name in names]
+    entries = sorted(entries)
+    with open(path + ".tmp", "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, len(entries), len(encoded)))
+        f.write(b"".join(ENTRY.pack(*entry) for entry in entries))
+        f.write(b"".join(NAME_LENGTH.pack(len(data)) + data for data in encoded))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def read_records(path, offset=None):
+    """Stream a segment's records as (offset, kind, table, round, ms, payload),
+    from ``offset`` or the first record. Stops at a truncated record."""
+    with open(path, "rb") as f:
+        magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a round log (version {VERSION})")
+        position = HEADER.size if offset is None else offset
+        f.seek(position)
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, length, table, round_no, ms = RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield position, kind, table, round_no, ms, payload
+            position += RECORD.size + length
+
+
+def segment_start(path):
+    with open(path, "rb") as f:
+        return HEADER.unpack(f.read(HEADER.size))[2]
+
+
+def build_index(path):
+    """Index a segment from its records, for one a crash left unsealed."""
+    names, entries, last_round = [], [], {}
+    for offset, kind, table, round_no, _, payload in read_records(path):
+        if kind == NAME:
+            names.append(payload.decode())
+        elif last_round.get(table) != round_no:
+            last_round[table] = round_no
+            entries.append((table, round_no, offset))
+    write_index(index_path(path), entries, names)
+
+
+class RoundIndex:
+    """Memory-mapped index of one sealed segment."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, name_count = INDEX_HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a round log index (version {VERSION})")
+        self.names = []
+        position = INDEX_HEADER.size + self.count * ENTRY.size
+        for _ in range(name_count):
+            (length,) = NAME_LENGTH.unpack_from(self._map, position)
+            position += NAME_LENGTH.size
+            self.names.append(self._map[position:position + length].decode())
+            position += length
+        self.numbers = {name: number for number, name in enumerate(self.names)}
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._map, INDEX_HEADER.size + i * ENTRY.size)
+
+    def _first(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[:2] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, table_id, round_no=None):
+        """[(round, offset)] for the table's rounds in this segment."""
+        table = self.numbers.get(table_id)
+        if table is None:
+            return []
+        found = []
+        for i in range(self._first((table, round_no or 0)), self.count):
+            entry_table, entry_round, offset = self._entry(i)
+            if entry_table != table or (round_no is not None and entry_round != round_no):
+                break
+            found.append((entry_round, offset))
+        return found
+
+    def close(self):
+        self._map.close()
+
+
+class Round:
+    """One table round as recorded: bets, cards, actions and results."""
+
+    __slots__ = ("table_id", "round", "started", "seats", "dealer", "outcomes", "complete")
+
+    def __init__(self, table_id, round_no, started):
+        self.table_id = table_id
+        self.round = round_no
+        self.started = started       # unix time of its first record
+        self.seats = {}              # player_id -> {"bet", "cards", "actions"}
+        self.dealer = []             # card indices; final hand once complete
+        self.outcomes = {}           # player_id -> recorded outcome label
+        self.complete = False
+
+    def _seat(self, player_id):
+        seat = self.seats.get(player_id)
+        if seat is None:
+            seat = self.seats[player_id] = {"bet": 0.0, "cards": [], "actions": []}
+        return seat
+
+    def apply(self, kind, payload, name):
+        """Add one record; ``name`` maps numbers to table and player ids."""
+        if kind == BET:
+            player, amount = PLAYER_AMOUNT.unpack(payload)
+            self._seat(name(player))["bet"] = amount
+        elif kind == DEAL:
+            position = 1
+            for _ in range(payload[0]):
+                player, bet = PLAYER_AMOUNT.unpack_from(payload, position)
+                position += PLAYER_AMOUNT.size
+                count = payload[position]
+                seat = self._seat(name(player))
+                seat["bet"], seat["cards"] = bet, list(payload[position + 1:position + 1 + count])
+                position += 1 + count
+            self.dealer = list(payload[position + 1:position + 1 + payload[position]])
+        elif kind == HIT:
+            player, card = PLAYER_CARD.unpack(payload)
+            seat = self._seat(name(player))
+            seat["cards"].append(card)
+            seat["actions"].append(("hit", card))
+        elif kind == STAY:
+            (player,) = PLAYER.unpack(payload)
+            self._seat(name(player))["actions"].append(("stay",))
+        elif kind == RESULT:
+            count = payload[0]
+            self.dealer = list(payload[1:1 + count])
+            position = 2 + count
+            for _ in range(payload[1 + count]):
+                player, outcome = PLAYER_OUTCOME.unpack_from(payload, position)
+                position += PLAYER_OUTCOME.size
+                self.outcomes[name(player)] = OUTCOMES[outcome]
+            self.complete = True
+
+    def replay(self, rules=Rules()):
+        """Each dealt seat's result recomputed from its cards:
+        player_id -> {"score", "outcome", "net"} (net in units of the bet)."""
+        dealer = Hand(card_from_index(i) for i in self.dealer)
+        results = {}
+        for player_id, seat in self.seats.items():
+            if not seat["cards"]:
+                continue     # bet for this round but never dealt in
+            hand = Hand(card_from_index(i) for i in seat["cards"])
+            args = (hand.score, dealer.score, hand.is_blackjack, dealer.is_blackjack)
+            results[player_id] = {"score": hand.score, "outcome": outcome_label(*args, rules),
+                                  "net": seat["bet"] * rules.settle(*args)}
+        return results
+
+    def mismatches(self, rules=Rules()):
+        """player_ids whose recorded outcome differs from the replayed one."""
+        replayed = self.replay(rules)
+        return sorted(player_id for player_id, label in self.outcomes.items()
+                      if replayed.get(player_id, {}).get("outcome") != label)
+
+    def view(self):
+        """JSON-ready form with card codes."""
+        return {
+            "table_id": self.table_id,
+            "round": self.round,
+            "started": self.started,
+            "complete": self.complete,
+            "dealer": [card_code(i) for i in self.dealer],
+            "seats": {player_id: {"bet": seat["bet"], "cards": [card_code(i) for i in seat["cards"]],
+                                  "actions": [list(action[:1]) + [card_code(i) for i in action[1:]]
+                                              for action in seat["actions"]],
+                                  "outcome": self.outcomes.get(player_id)}
+                      for player_id, seat in self.seats.items()},
+        }
+
+
+class History:
+    """Reader for a log directory. Segments are read lazily, one at a time."""
+
+    def __init__(self, directory, prefix="*"):
+        self.directory = directory
+        self.prefix = prefix
+
+    def rounds(self, table_id, round_no=None):
+        """Yield the table's rounds (or just ``round_no``) in log order. A
+        round split across segments comes back whole."""
+        current = None
+        for number, started, kind, payload, name in self._records(table_id, round_no):
+            if current is not None and current.round != number:
+                yield current
+                current = None
+            if current is None:
+                current = Round(table_id, number, started)
+            current.apply(kind, payload, name)
+            if current.complete:
+                yield current
+                current = None
+        if current is not None:
+            yield current
+
+    def _records(self, table_id, round_no):
+        # (round, unix time, kind, payload, name lookup) for the table's records
+        for path in segment_paths(self.directory, self.prefix):
+            if os.path.exists(index_path(path)):
+                yield from self._indexed(path, table_id, round_no)
+            else:
+                yield from self._scan(path, table_id, round_no)
+
+    def _indexed(self, path, table_id, round_no):
+        index = RoundIndex(index_path(path))
+        try:
+            found = sorted(index.lookup(table_id, round_no), key=lambda entry: entry[1])
+            if not found:
+                return
+            table, name, start = index.numbers[table_id], index.names.__getitem__, segment_start(path)
+        finally:
+            index.close()
+        for wanted, offset in found:
+            for _, kind, record_table, record_round, ms, payload in read_records(path, offset):
+                if kind == NAME or record_table != table:
+                    continue
+                if record_round != wanted:
+                    break
+                yield wanted, start + ms / 1000, kind, payload, name
+                if kind == RESULT:
+                    break
+
+    def _scan(self, path, table_id, round_no):
+        names, start, table = [], segment_start(path), None
+        for _, kind, record_table, record_round, ms, payload in read_records(path):
+            if kind == NAME:
+                names.append(payload.decode())
+                if names[-1] == table_id:
+                    table = record_table
+            elif record_table == table and (round_no is None or record_round == round_no):
+                yield record_round, start + ms / 1000, kind, payload, names.__getitem__
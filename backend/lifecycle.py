@@ -0,0 +1,165 @@
+# //backend/lifecycle.py
+
+"""Table lifecycle: which tables to evict, and when new ones may be created.
+
+``TableLifecycle`` only decides. app.py does the evicting, under the
+table's lock. The decisions are:
+
+* LRU order: every table action moves its table to the back.
+* Reaping: a periodic pass returns tables that have had no seats for
+  ``empty_ttl`` seconds, or no actions at all for ``idle_ttl``.
+* Caps: creating a table beyond ``max_tables`` (or beyond
+  ``max_per_client`` for the creating client) names least recently used
+  tables to evict.
+* Rate limit: each client gets a token bucket for creating tables.
+
+Counters for all of this are in ``stats``.
+"""
+
+from collections import Counter, OrderedDict
+import sys
+import threading
+import time
+
+
+class TokenBucket:
+    """``rate`` tokens per second, up to ``burst`` saved up."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now, tokens=1):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+
+def table_size(table):
+    """Rough bytes held by a table: its containers, seats, hands and deck (cards are shared)."""
+    parts = [table, table.dealer, table.dealer.hand, table.seats, table.by_sid, table.turn_order, table.deck]
+    for seat in table.seats.values():
+        parts += (seat, seat.hand)
+    cards = getattr(table.deck, "cards", None)
+    if cards is not None:
+        parts.append(cards)
+    return sum(sys.getsizeof(part) for part in parts)
+
+
+class TableLifecycle:
+
+    def __init__(self, max_tables=10_000, max_per_client=50, idle_ttl=3600.0, empty_ttl=300.0,
+                 create_rate=1.0, create_burst=60, clock=time.monotonic):
+        self.max_tables = max_tables
+        self.max_per_client = max_per_client
+        self.idle_ttl = idle_ttl
+        self.empty_ttl = empty_ttl
+        self.create_rate = create_rate
+        self.create_burst = create_burst
+        self.clock = clock
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._used = OrderedDict()     # table_id -> last action time, least recent first
+        self._empty_since = {}         # table_id -> when its last seat left
+        self._creator = {}             # table_id -> client
+        self._by_client = {}           # client -> OrderedDict of table_ids, least recent first
+        self._buckets = {}             # client -> TokenBucket
+
+    def __len__(self):
+        return len(self._used)
+
+    def allow_create(self, client):
+        """Take a table-creation token for ``client``; False means rate limited."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.create_rate, self.create_burst, now)
+            if bucket.take(now):
+                return True
+        self.stats["creates_rate_limited"] += 1
+        return False
+
+    def created(self, table_id, client):
+        """Record a new table. Returns table_ids to evict for the caps, least
+        recently used first; the caller may skip any it cannot evict."""
+        now = self.clock()
+        with self._lock:
+            self.stats["created"] += 1
+            self._used[table_id] = now
+            self._empty_since[table_id] = now
+            self._creator[table_id] = client
+            own = self._by_client.setdefault(client, OrderedDict())
+            own[table_id] = now
+            # the new table is last in both orders, so it is never its own victim
+            victims = list(own)[:max(0, len(own) - self.max_per_client)]
+            for t in self._used:
+                if len(self._used) - len(victims) <= self.max_tables or t == table_id:
+                    break
+                if t not in victims:
+                    victims.append(t)
+            return victims
+
+    def restored(self, table_id, seated):
+        """Track a table brought back from a snapshot at startup. It has no
+        creator and does not count against the caps until it is used."""
+        now = self.clock()
+        with self._lock:
+            self.stats["restored"] += 1
+            self._used[table_id] = now
+            if not seated:
+                self._empty_since[table_id] = now
+
+    def touch(self, table_id, seated):
+        """A table was used; ``seated`` is how many seats it has now."""
+        now = self.clock()
+        with self._lock:
+            if table_id not in self._used:
+                return
+            self._used[table_id] = now
+            self._used.move_to_end(table_id)
+            own = self._by_client.get(self._creator.get(table_id))
+            if own is not None and table_id in own:
+                own.move_to_end(table_id)
+            if seated:
+                self._empty_since.pop(table_id, None)
+            else:
+                self._empty_since.setdefault(table_id, now)
+
+    def expired(self):
+        """Tables due for reaping: ``(table_id, reason)`` pairs. Also drops the
+        rate limit state of clients that have not created tables lately."""
+        now = self.clock()
+        with self._lock:
+            # a bucket that has refilled is the same as a new one
+            self._buckets = {client: bucket for client, bucket in self._buckets.items()
+                             if bucket.tokens + (now - bucket.updated) * bucket.rate < bucket.burst}
+            due = [(t, "empty") for t, since in self._empty_since.items() if now - since >= self.empty_ttl]
+            for table_id, used in self._used.items():
+                if now - used < self.idle_ttl:
+                    break        # the rest were used more recently
+                if table_id not in self._empty_since:
+                    due.append((table_id, "idle"))
+            return due
+
+    def forget(self, table_id, reason, size=0):
+        """A table was evicted (or deleted) for ``reason``, freeing about ``size`` bytes."""
+        with self._lock:
+            if self._used.pop(table_id, None) is None:
+                return
+            self._empty_since.pop(table_id, None)
+            client = self._creator.pop(table_id, None)
+            own = self._by_client.get(client)
+            if own is not None:
+                own.pop(table_id, None)
+                if not own:
+                    del self._by_client[client]
+            self.stats[f"evicted_{reason}"] += 1
+            self.stats["reclaimed_bytes"] += size
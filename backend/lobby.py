@@ -0,0 +1,136 @@
+# //backend/lobby.py
+
+"""Lobby: the open tables, indexed for listing and matchmaking.
+
+The lobby keeps its own copy of each table's seat count, stakes and phase
+("betting" between rounds, "playing" during one). app.py pushes changes in
+on join, disconnect, round start and round end, so the lobby never scans
+``rooms``.
+
+Tables with a free seat sit in one sorted list per (phase, stakes), keyed
+``(free seats, seq, table_id)``. ``seq`` is the order tables entered the
+lobby. The head of each list is its fullest table, oldest first, so
+``quick_join`` looks at the head of each list. ``page`` merges the lists
+that match its filters from a bisected cursor. Finding a key is a bisect,
+O(log n). Inserting and removing shift the list, which for a list of
+tuples is a C memmove and stays in the microseconds at 100k tables.
+
+Every change also lands in a pending diff (the latest row per table, plus
+removed table ids). The app drains it on an interval and broadcasts it, so
+subscribers get at most one update per interval however busy the tables
+are.
+"""
+
+from bisect import bisect_left, insort
+import heapq
+import itertools
+import threading
+
+PHASES = ("betting", "playing")
+
+
+class Entry:
+    __slots__ = ("table_id", "seated", "stakes", "phase", "seq")
+
+    def __init__(self, table_id, seated, stakes, phase, seq):
+        self.table_id = table_id
+        self.seated = seated
+        self.stakes = stakes
+        self.phase = phase
+        self.seq = seq
+
+
+class Lobby:
+
+    def __init__(self, seats=7):
+        self.seats = seats
+        self._entries = {}          # table_id -> Entry
+        self._open = {}             # (phase, stakes) -> sorted [(free, seq, table_id)]
+        self._seq = itertools.count()
+        self._changed = {}          # table_id -> row, since the last drain
+        self._removed = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def row(self, entry):
+        return {"table_id": entry.table_id, "seated": entry.seated, "free": max(self.seats - entry.seated, 0),
+                "stakes": entry.stakes, "phase": entry.phase}
+
+    def _unindex(self, entry):
+        free = self.seats - entry.seated
+        if free > 0:
+            keys = self._open[(entry.phase, entry.stakes)]
+            del keys[bisect_left(keys, (free, entry.seq, entry.table_id))]
+
+    def _index(self, entry):
+        free = self.seats - entry.seated
+        if free > 0:
+            insort(self._open.setdefault((entry.phase, entry.stakes), []), (free, entry.seq, entry.table_id))
+
+    def update(self, table_id, seated, stakes=0, phase="betting"):
+        """Add a table or record its new state. Unchanged states cost one lookup."""
+        with self._lock:
+            entry = self._entries.get(table_id)
+            if entry is None:
+                entry = self._entries[table_id] = Entry(table_id, seated, stakes, phase, next(self._seq))
+                self._removed.discard(table_id)
+            elif (entry.seated, entry.stakes, entry.phase) == (seated, stakes, phase):
+                return
+            else:
+                self._unindex(entry)
+                entry.seated, entry.stakes, entry.phase = seated, stakes, phase
+            self._index(entry)
+            self._changed[table_id] = self.row(entry)
+
+    def remove(self, table_id):
+        with self._lock:
+            entry = self._entries.pop(table_id, None)
+            if entry is None:
+                return
+            self._unindex(entry)
+            self._changed.pop(table_id, None)
+            self._removed.add(table_id)
+
+    def _lists(self, stakes, phase):
+        return [keys for (list_phase, list_stakes), keys in self._open.items()
+                if keys and (phase is None or list_phase == phase) and (stakes is None or list_stakes == stakes)]
+
+    def quick_join(self, stakes=None):
+        """The fullest table with a free seat, preferring tables between rounds,
+        or None if every table is full."""
+        with self._lock:
+            for phase in PHASES:
+                heads = [keys[0] for keys in self._lists(stakes, phase)]
+                if heads:
+                    return min(heads)[2]
+        return None
+
+    def page(self, stakes=None, phase=None, cursor=None, limit=50):
+        """Up to ``limit`` (at least 1) tables with a free seat, fullest first,
+        as (rows, next cursor). The cursor is the one returned with the
+        previous page."""
+        start = (0, 0)
+        if cursor:
+            free, seq = (int(part) for part in cursor.split(".", 1))
+            start = (free, seq + 1)
+        with self._lock:
+            heads = []
+            for keys in self._lists(stakes, phase):
+                i = bisect_left(keys, start)
+                heads.append(keys[i:i + limit + 1])
+            keys = list(itertools.islice(heapq.merge(*heads), limit + 1))
+            rows = [self.row(self._entries[table_id]) for _, _, table_id in keys[:limit]]
+        more = len(keys) > limit
+        return rows, (f"{keys[limit - 1][0]}.{keys[limit - 1][1]}" if more else None)
+
+    def drain(self):
+        """The diff since the last drain, {"changed": [rows], "removed": [ids]},
+        or None if nothing changed."""
+        with self._lock:
+            if not self._changed and not self._removed:
+                return None
+            diff = {"changed": list(self._changed.values()), "removed": sorted(self._removed)}
+            self._changed, self._removed = {}, set()
+        return diff
@@ -0,0 +1,31 @@
+# //backend/locks.py
+
+"""Locks for the in-memory registries.
+
+Actions on one table are serialized on that table's lock while different
+tables run in parallel. ``registry`` guards inserts and removals in the
+global ``rooms``/``players`` dicts. Never wait on a table lock while holding
+``registry``; taking ``registry`` inside a table lock is fine.
+
+Table locks are striped: a fixed pool of ``stripes`` locks, and a table uses
+the one its id hashes to. Nothing is allocated per table, so events naming
+tables that do not exist cannot grow the pool. Two tables that share a
+stripe serialize on each other, which with the default 1024 stripes is rare
+and only ever costs a short wait.
+"""
+
+import threading
+
+
+class TableLocks:
+
+    def __init__(self, stripes=1024):
+        self.registry = threading.RLock()
+        self._stripes = tuple(threading.RLock() for _ in range(stripes))
+
+    def __call__(self, table_id):
+        """The (re-entrant) lock for ``table_id``."""
+        return self._stripes[hash(table_id) % len(self._stripes)]
+
+    def __len__(self):
+        return len(self._stripes)
@@ -0,0 +1,164 @@
+# //backend/logs.py
+
+"""Structured logging: leveled JSON lines, written off the request path.
+
+Modules log through ``get_logger(name)``. Keyword fields become JSON keys:
+
+    log.debug("hit", table_id=table_id, turn_order=lambda: list(room.turn_order))
+
+A disabled level costs one ``isEnabledFor`` check. The message is not
+formatted and field values are not read. A callable field is only called
+once the record passes the level and sampling checks, so anything
+expensive to build goes behind a ``lambda``.
+
+``setup()`` attaches a ``QueueHandler`` to the ``blackjack`` logger. A
+handler thread only puts the record on a queue. A ``QueueListener``
+thread encodes and writes it. Callables are resolved before the record
+is queued, in the handler's thread, while it still holds the table lock.
+
+Sampling works per table. A table is either in the sample or not, decided
+by a hash of its ``table_id``, so a sampled table keeps every record and
+reads as a complete story. Warnings and errors are never sampled out.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import zlib
+
+ROOT = "blackjack"
+
+
+class StructLogger:
+    """``logging.Logger`` front end whose keyword arguments become the
+    record's ``fields``. The level check comes first, so a disabled call
+    costs one method call and the kwargs dict."""
+
+    __slots__ = ("logger",)
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def _log(self, level, msg, fields, exc_info=None):
+        self.logger._log(level, msg, (), exc_info=exc_info, extra={"fields": fields}, stacklevel=2)
+
+    def debug(self, msg, **fields):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, msg, fields)
+
+    def info(self, msg, **fields):
+        if self.logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, msg, fields)
+
+    def warning(self, msg, **fields):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, msg, fields)
+
+    def error(self, msg, **fields):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, msg, fields)
+
+    def exception(self, msg, **fields):
+        """ERROR with the traceback of the exception being handled."""
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, msg, fields, exc_info=True)
+
+
+def get_logger(name):
+    return StructLogger(logging.getLogger(f"{ROOT}.{name}"))
+
+
+def table_sampled(table_id, rate):
+    """Whether ``table_id`` is in the ``rate`` fraction of tables whose records are kept."""
+    return rate >= 1 or (zlib.crc32(str(table_id).encode()) % 10_000) < rate * 10_000
+
+
+class TableSampler(logging.Filter):
+    """Keep records below WARNING only for the sampled tables. Records with
+    no table_id always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        table_id = getattr(record, "fields", {}).get("table_id")
+        return table_id is None or table_sampled(table_id, self.rate)
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {"ts": round(record.created, 6), "level": record.levelname, "logger": record.name,
+                 "msg": record.getMessage()}
+        entry.update(getattr(record, "fields", ()))
+        # JsonQueueHandler renders exc_info to exc_text before queueing
+        exc = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc:
+            entry["exc"] = exc
+        return json.dumps(entry, default=str)
+
+
+class JsonQueueHandler(logging.handlers.QueueHandler):
+    """Resolves lazy fields in the logging thread, leaves encoding to the listener."""
+
+    def prepare(self, record):
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = {k: v() if callable(v) else v for k, v in fields.items()}
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def setup(level="INFO", stream=None, sample=1.0):
+    """Route the ``blackjack`` loggers through a queue to JSON lines on
+    ``stream`` (stderr by default). ``level`` "OFF" disables them. Calling
+    it again replaces the previous setup."""
+    global _listener
+    root = logging.getLogger(ROOT)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.propagate = False
+    if str(level).upper() == "OFF":
+        root.setLevel(logging.CRITICAL + 1)
+        return None
+
+    root.setLevel(str(level).upper())
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter())
+    records = queue.Queue()    # eventlet patches queue.Queue, not SimpleQueue
+    handler = JsonQueueHandler(records)
+    handler.addFilter(TableSampler(sample))
+    root.addHandler(handler)
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    return _listener
+
+
+def flush():
+    """Stop the listener after it writes every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(flush)
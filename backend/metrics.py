@@ -0,0 +1,151 @@
+# //backend/metrics.py
+
+"""Prometheus text exposition without the client library.
+
+There are two kinds of metric:
+
+* ``Histogram``: latency histograms filled on the hot path by
+  ``Metrics.timed``. One observation is two ``perf_counter`` calls, a
+  bisect and a short lock.
+* Collected metrics (``counter``/``gauge``): callables read only when
+  ``/metrics`` is scraped. They expose the counters the rest of the code
+  already keeps (``Outbox.counts``, ``DeckClient.stats``,
+  ``TableLifecycle.stats``), so counting costs nothing extra.
+
+A disabled ``Metrics`` returns the undecorated function from ``timed`` and
+renders nothing, so instrumentation can stay in place with no overhead.
+"""
+
+from bisect import bisect_left
+import functools
+import threading
+import time
+
+# seconds; socket handlers run from tens of microseconds to a few milliseconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label value."""
+
+    def __init__(self, name, help, label=None, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}      # label value -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, label=None):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {label: list(series) for label, series in self._series.items()}
+        for label, series in sorted(snapshot.items(), key=lambda item: str(item[0])):
+            base = [(self.label, label)] if self.label else []
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                total += count
+                lines.append(f"{self.name}_bucket{_labels(base + [('le', bound)])} {total}")
+            lines.append(f"{self.name}_sum{_labels(base)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(base)} {total}")
+        return lines
+
+
+class ByteCountingJson:
+    """Wraps a ``json``-like module for ``SocketIO(json=...)`` and counts what
+    it encodes. python-socketio encodes an emit once however many clients
+    it goes to, so this is bytes per emit, not bytes on the wire."""
+
+    def __init__(self, module):
+        self.module = module
+        self.loads = module.loads
+        self.packets = 0
+        self.bytes = 0
+
+    def dumps(self, obj, *args, **kwargs):
+        text = self.module.dumps(obj, *args, **kwargs)
+        self.packets += 1
+        self.bytes += len(text)
+        return text
+
+
+class Metrics:
+
+    def __init__(self, enabled=True, prefix="blackjack"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._histograms = {}
+        self._collected = []     # (name, type, help, label, fn)
+
+    def histogram(self, name, help, label=None, buckets=LATENCY_BUCKETS):
+        name = f"{self.prefix}_{name}"
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, help, label, buckets)
+        return self._histograms[name]
+
+    def timed(self, histogram, label=None):
+        """Decorator observing each call's duration in ``histogram``, even
+        when the call raises. Returns ``fn`` itself when disabled."""
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+            observe, clock = histogram.observe, time.perf_counter
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    observe(clock() - start, label)
+            return wrapper
+        return decorator
+
+    def counter(self, name, help, fn, label=None):
+        """A counter read from ``fn()`` at scrape time: a number, or a mapping
+        of ``label`` values to numbers."""
+        self._collected.append((f"{self.prefix}_{name}", "counter", help, label, fn))
+
+    def gauge(self, name, help, fn, label=None):
+        self._collected.append((f"{self.prefix}_{name}", "gauge", help, label, fn))
+
+    def render(self):
+        """All metrics in the Prometheus text format."""
+        if not self.enabled:
+            return ""
+        lines = []
+        for name, kind, help, label, fn in self._collected:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            value = fn()
+            if isinstance(value, dict):
+                for key, v in sorted(value.items(), key=lambda item: str(item[0])):
+                    lines.append(f"{name}{_labels([(label, key)])} {_number(v)}")
+            else:
+                lines.append(f"{name} {_number(value)}")
+        for histogram in self._histograms.values():
+            lines += histogram.render()
+        return "\n".join(lines) + "\n"
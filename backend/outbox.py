@@ -0,0 +1,117 @@
+# //backend/outbox.py
+
+"""Per-table outbound emit scheduler.
+
+Socket handlers run inside ``Outbox.batch()``. Everything they emit is
+buffered and flushed when the handler returns (or, with ``window`` > 0, when
+the coalescing window closes). At flush time, if a table got more than one
+broadcast state event, they collapse into a single ``game_state`` snapshot
+placed where the last of them was; chat and other events keep their order
+around it. A lone delta is sent unchanged.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import threading
+import time
+
+from game_state import DELTA_EVENTS
+
+STATE_EVENTS = frozenset(("game_state",) + DELTA_EVENTS)
+
+
+class Outbox:
+
+    def __init__(self, send, snapshot, window=0.0, spawn=None, sleep=time.sleep):
+        """``send(event, payload, room, skip_sid)`` does the real emit and
+        ``snapshot(table_id)`` returns a full state (or None if the table is gone).
+        A delayed flush runs after the handler has let go of the table, so
+        ``snapshot`` must take the table's lock itself.
+        ``spawn(fn)`` runs the delayed flush when ``window`` is set."""
+        self.send = send
+        self.snapshot = snapshot
+        self.window = window
+        self.spawn = spawn or (lambda fn: threading.Thread(target=fn, daemon=True).start())
+        self.sleep = sleep
+        self.counts = Counter()
+        self.requested = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts_lock = threading.Lock()     # handlers and timers emit from many threads
+        self._pending = {}
+
+    def stats(self):
+        """Copies of (``requested``, ``counts``): events handlers asked to emit,
+        and events sent after coalescing."""
+        with self._counts_lock:
+            return dict(self.requested), dict(self.counts)
+
+    @contextmanager
+    def batch(self):
+        """Buffer emits made in this thread until the outermost batch exits."""
+        outer = getattr(self._local, "buffer", None) is None
+        if outer:
+            self._local.buffer = []
+        try:
+            yield
+        finally:
+            if outer:
+                buffer, self._local.buffer = self._local.buffer, None
+                self._dispatch(buffer)
+
+    def emit(self, event, payload, table_id, to=None, skip_sid=None):
+        """Queue an event for ``table_id`` (or a single sid with ``to``)."""
+        with self._counts_lock:
+            self.requested[event] += 1
+        item = (event, payload, table_id, to, skip_sid)
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            self._flush_table(table_id, [item])
+        else:
+            buffer.append(item)
+
+    def _dispatch(self, buffer):
+        by_table = {}
+        for item in buffer:
+            by_table.setdefault(item[2], []).append(item)
+        if self.window <= 0:
+            for table_id, items in by_table.items():
+                self._flush_table(table_id, items)
+            return
+        with self._lock:
+            for table_id, items in by_table.items():
+                if table_id in self._pending:
+                    self._pending[table_id].extend(items)
+                else:
+                    self._pending[table_id] = items
+                    self.spawn(lambda t=table_id: self._flush_later(t))
+
+    def _flush_later(self, table_id):
+        self.sleep(self.window)
+        with self._lock:
+            items = self._pending.pop(table_id, [])
+        self._flush_table(table_id, items)
+
+    def _flush_table(self, table_id, items):
+        for event, payload, room, skip_sid in self.coalesce(table_id, items):
+            with self._counts_lock:
+                self.counts[event] += 1
+            self.send(event, payload, room, skip_sid)
+
+    def coalesce(self, table_id, items):
+        """Turn buffered items into the ``(event, payload, room, skip_sid)`` emits to send."""
+        broadcasts = [i for i, (event, _, _, to, _) in enumerate(items) if event in STATE_EVENTS and to is None]
+        merge = len(broadcasts) > 1
+        snapshot = self.snapshot(table_id) if merge else None
+        if snapshot is None:
+            merge = False
+
+        out = []
+        for i, (event, payload, _, to, skip_sid) in enumerate(items):
+            if merge and event in STATE_EVENTS:
+                if i == broadcasts[-1]:
+                    out.append(("game_state", snapshot, table_id, None))
+                # earlier state events (including per-client snapshots) are superseded
+                continue
+            out.append((event, payload, to or table_id, skip_sid))
+        return out
@@ -0,0 +1,62 @@
+# //backend/profiler.py
+
+"""On-demand sampling profiler.
+
+``sample(seconds)`` wakes every ``interval`` and records the Python stack of
+every other thread (``sys._current_frames``). It returns how often each
+stack was seen. ``collapsed()`` prints the hottest stacks in the collapsed
+format that flamegraph.pl and speedscope read: ``frame;frame;frame count``,
+root first. Nothing runs until a sample is asked for, so the hook costs
+nothing the rest of the time.
+
+Only OS threads are visible. Under ``ASYNC_MODE=eventlet`` all green
+threads share one OS thread, so the profile shows whichever green thread is
+running when the sampler wakes.
+"""
+
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+# stacks are cut to this many innermost frames
+MAX_DEPTH = 40
+# a thread whose innermost frame is in one of these is waiting, not working
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "socket.py", "ssl.py", "selector_events.py")
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+def _stack(frame):
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return tuple(reversed(names))
+
+
+def sample(seconds, interval=0.005, include_idle=False, sleep=time.sleep):
+    """Counter of stacks (tuples of "file:function:line", root first) seen
+    across ``seconds`` of sampling, in the calling thread. Threads blocked
+    in a lock, queue or socket wait are left out unless ``include_idle``."""
+    me = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            if not include_idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                continue
+            stacks[_stack(frame)] += 1
+        sleep(interval)
+    return stacks
+
+
+def collapsed(stacks, top=50):
+    """The ``top`` most frequent stacks, one collapsed line each."""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common(top))
@@ -0,0 +1,51 @@
+# //backend/rules.py
+
+"""Table rules shared by the live game (app.py) and the offline simulator.
+
+The rule functions only use comparisons, ``&``, ``|`` and arithmetic, so
+they work the same on plain ints/bools from a ``Hand`` and on NumPy arrays
+of totals. That way the simulator runs the exact code the live game does.
+"""
+
+from dataclasses import dataclass
+
+from shoe import DEFAULT_DECKS, DEFAULT_PENETRATION
+
+DEALER_STANDS_ON = 17
+
+
+@dataclass(frozen=True)
+class Rules:
+    decks: int = DEFAULT_DECKS
+    penetration: float = DEFAULT_PENETRATION
+    hit_soft_17: bool = False     # H17 when True, S17 otherwise
+    blackjack_pays: float = 1.5
+
+    def dealer_hits(self, score, soft):
+        """Whether the dealer draws on ``score`` (``soft`` if an ace counts 11)."""
+        return (score < DEALER_STANDS_ON) | ((score == DEALER_STANDS_ON) & soft & self.hit_soft_17)
+
+    def settle(self, player, dealer, player_blackjack=False, dealer_blackjack=False):
+        """Net result for the player in units of the bet: -1, 0, 1 or ``blackjack_pays``.
+
+        A natural beats any other 21; two naturals push. Otherwise a busted
+        player loses even if the dealer busts too.
+        """
+        bust = player > 21
+        dealer_bust = dealer > 21
+        win = (1 - bust) * (dealer_bust + (1 - dealer_bust) * (player > dealer))
+        lose = bust + (1 - bust) * (1 - dealer_bust) * (player < dealer)
+        natural_win = player_blackjack * (1 - dealer_blackjack)
+        natural_lose = dealer_blackjack * (1 - player_blackjack)
+        no_naturals = (1 - player_blackjack) * (1 - dealer_blackjack)
+        return natural_win * self.blackjack_pays - natural_lose + no_naturals * (win - lose)
+
+
+def outcome_label(player, dealer, player_blackjack=False, dealer_blackjack=False, rules=Rules()):
+    """Result string sent to clients in round_over."""
+    if player > 21:
+        return "Lose (bust)"
+    net = rules.settle(player, dealer, player_blackjack, dealer_blackjack)
+    if net > 0:
+        return "Win"
+    return "Push" if net == 0 else "Lose"
@@ -0,0 +1,181 @@
+# //backend/shards.py
+
+"""Sharded table hosting.
+
+Tables are split across ``SHARD_COUNT`` worker processes by a stable hash of
+``table_id``. Each process keeps ``rooms``/``players`` only for the tables it
+owns. A client may be connected to any worker:
+
+* Table events (join, place_bet, hit, stay, ...) that arrive at a worker
+  that does not own the table are forwarded on the ``route`` channel to the
+  owner. The owner runs the normal handler under the client's sid.
+* Socket.IO emits fan out on the ``socketio`` channel (``QueueManager``), so
+  the owner's broadcasts reach clients connected to any worker.
+
+The message queue is pluggable: anything with ``publish(channel, message,
+shard=None)`` and ``listen(channel)``. ``LocalQueue`` keeps every shard in
+one process (tests), and ``ProcessQueue`` connects workers forked by
+``python shards.py --workers N``, each serving on its own port behind a
+sticky load balancer. ``ProcessQueue`` reads block the whole process, so
+those workers use the default threading ASYNC_MODE.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import zlib
+
+import socketio
+
+import logs
+
+log = logs.get_logger("shards")
+
+CHANNELS = ("route", "socketio")
+
+# set by the launcher in each forked worker before it imports app.py
+QUEUE = None
+
+
+def shard_for(table_id, count):
+    """Owning shard of ``table_id``; the same in every process (unlike hash())."""
+    return zlib.crc32(str(table_id).encode()) % count
+
+
+class LocalQueue:
+    """In-process stand-in message queue: one ``queue.Queue`` per (channel, shard)."""
+
+    def __init__(self, count=1, index=0, boxes=None):
+        self.count = count
+        self.index = index
+        self._boxes = {} if boxes is None else boxes
+
+    def _new_box(self):
+        return queue.Queue()
+
+    def _box(self, channel, shard):
+        box = self._boxes.get((channel, shard))
+        if box is None:
+            box = self._boxes.setdefault((channel, shard), self._new_box())
+        return box
+
+    def shard(self, index):
+        """The same queue as seen from shard ``index``."""
+        return type(self)(self.count, index, self._boxes)
+
+    def publish(self, channel, message, shard=None):
+        """Send to one shard, or with ``shard=None`` to every other shard."""
+        targets = [shard] if shard is not None else [s for s in range(self.count) if s != self.index]
+        for target in targets:
+            self._box(channel, target).put(message)
+
+    def get(self, channel, timeout=None):
+        """Next message for this shard; raises ``queue.Empty`` on timeout."""
+        return self._box(channel, self.index).get(timeout=timeout)
+
+    def listen(self, channel):
+        while True:
+            yield self.get(channel)
+
+
+class ProcessQueue(LocalQueue):
+    """Queues shared by workers forked from one launcher. Every box is created
+    up front because a box made after the fork would exist in one process only."""
+
+    def __init__(self, count=1, index=0, boxes=None):
+        super().__init__(count, index, boxes)
+        if boxes is None:
+            for channel in CHANNELS:
+                for shard in range(count):
+                    self._boxes[(channel, shard)] = multiprocessing.get_context("fork").Queue()
+
+    def _new_box(self):
+        raise KeyError("ProcessQueue boxes are fixed when the queue is created")
+
+
+class QueueManager(socketio.PubSubManager):
+    """Socket.IO client manager that fans emits out over a shard queue."""
+
+    name = "shardqueue"
+
+    def __init__(self, queue, channel="socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.queue = queue
+
+    def _publish(self, data):
+        self.queue.publish(self.channel, data)
+
+    def _listen(self):
+        yield from self.queue.listen(self.channel)
+
+
+class ShardRouter:
+    """Decides which shard runs a table's events and forwards the rest."""
+
+    def __init__(self, index=0, count=1, queue=None):
+        if count > 1 and queue is None:
+            raise ValueError("SHARD_COUNT > 1 needs a message queue; start the workers with shards.py")
+        self.index = index
+        self.count = count
+        self.queue = queue
+        self.remote_seats = {}   # sid -> table_id, for clients whose table lives on another shard
+        self.forwarded = 0
+        self.received = 0
+
+    def owns(self, table_id):
+        return self.count == 1 or table_id is None or shard_for(table_id, self.count) == self.index
+
+    def forward(self, table_id, event, sid, data):
+        self.forwarded += 1
+        self.queue.publish("route", (event, sid, data), shard=shard_for(table_id, self.count))
+
+    def socketio_options(self):
+        """Extra SocketIO() kwargs: a queue-backed client manager when sharded."""
+        return {"client_manager": QueueManager(self.queue)} if self.count > 1 else {}
+
+    def serve(self, dispatch):
+        """Run ``dispatch(event, sid, data)`` for every event forwarded to this shard."""
+        for event, sid, data in self.queue.listen("route"):
+            self.received += 1
+            try:
+                dispatch(event, sid, data)
+            except Exception:
+                log.exception("forwarded event failed", event=event, shard=self.index)
+
+
+def run_worker(shard_queue, index, count, port):
+    import shards    # this file runs as __main__; app.py reads the importable module
+    shards.QUEUE = shard_queue.shard(index)
+    os.environ.update(SHARD_INDEX=str(index), SHARD_COUNT=str(count), PORT=str(port))
+    import app
+    app.main()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game server as N table shards")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 5000)))
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("fork")
+    shard_queue = ProcessQueue(args.workers)
+    workers = [ctx.Process(target=run_worker, args=(shard_queue, i, args.workers, args.port + i))
+               for i in range(args.workers)]
+    for worker in workers:
+        worker.start()
+
+    def stop(signum, frame):
+        for worker in workers:
+            worker.terminate()
+        sys.exit(0)
+    signal.signal(signal.SIGTERM, stop)
+    print(f"{args.workers} shards on ports {args.port}-{args.port + args.workers - 1}")
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# //backend/shoe.py
+
+from array import array
+import random
+
+from cards import CARDS
+from deck_provider import DeckProvider
+
+
+DEFAULT_DECKS = 6
+DEFAULT_PENETRATION = 0.75
+
+# one unshuffled index array per deck count, copied (not rebuilt) per shoe
+_TEMPLATES = {}
+
+
+def shoe_template(decks):
+    template = _TEMPLATES.get(decks)
+    if template is None:
+        template = _TEMPLATES[decks] = array("B", range(len(CARDS))) * decks
+    return template
+
+
+class Shoe(DeckProvider):
+    """Multi-deck shoe stored as a byte array of indices into ``cards.CARDS``.
+
+    Drawing just moves a position pointer, so every draw is O(1). When the
+    position passes the cut card (``penetration`` of the shoe) ``needs_reshuffle``
+    turns on and the table reshuffles between rounds. An exhausted shoe
+    reshuffles itself mid-round rather than failing the draw.
+
+    An order queued with ``queue_order`` (e.g. a shuffle fetched from the deck
+    API in the background) is used at the next shuffle instead of the RNG.
+    """
+
+    def __init__(self, decks=DEFAULT_DECKS, penetration=DEFAULT_PENETRATION, rng=None):
+        if decks < 1:
+            raise ValueError("A shoe needs at least one deck.")
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be in (0, 1].")
+        self.decks = decks
+        self.penetration = penetration
+        # rooms share the module RNG unless a seeded one is passed in
+        self.rng = rng or random
+        self.cards = array("B", shoe_template(decks))
+        self.cut = int(len(self.cards) * penetration)
+        self.position = 0
+        self.next_order = None
+        self.reshuffle()
+
+    @classmethod
+    def restore(cls, cards, position, penetration=DEFAULT_PENETRATION, next_order=None, rng=None):
+        """A shoe in a saved state (see snapshot.py), built without shuffling."""
+        shoe = cls.__new__(cls)
+        shoe.cards = array("B", cards)
+        shoe.decks = len(shoe.cards) // len(CARDS)
+        shoe.penetration = penetration
+        shoe.rng = rng or random
+        shoe.cut = int(len(shoe.cards) * penetration)
+        shoe.position = position
+        shoe.next_order = array("B", next_order) if next_order else None
+        return shoe
+
+    def __len__(self):
+        return len(self.cards)
+
+    def remaining(self):
+        return len(self.cards) - self.position
+
+    @property
+    def needs_reshuffle(self):
+        return self.position >= self.cut
+
+    def reshuffle(self):
+        if self.next_order is not None:
+            self.cards, self.next_order = self.next_order, None
+        else:
+            self.rng.shuffle(self.cards)
+        self.position = 0
+
+    def queue_order(self, indices):
+        """Use ``indices`` as the card order for the next reshuffle."""
+        order = array("B", indices)
+        if len(order) != len(self.cards) or sorted(order) != sorted(self.cards):
+            raise ValueError(f"Order must be a permutation of the {len(self.cards)} shoe cards.")
+        self.next_order = order
+
+    def draw_index(self):
+        if self.position >= len(self.cards):
+            self.reshuffle()
+        index = self.cards[self.position]
+        self.position += 1
+        return index
+
+    def draw_card(self):
+        return CARDS[self.draw_index()]
+
+    def draw(self, count=1):
+        """Reserve ``count`` cards with a single slice of the shoe."""
+        if count > len(self.cards):
+            raise ValueError(f"Cannot draw {count} cards from a {len(self.cards)}-card shoe.")
+        if self.position + count > len(self.cards):
+            self.reshuffle()
+        chunk = self.cards[self.position:self.position + count]
+        self.position += count
+        return [CARDS[i] for i in chunk]
+
+    def undraw(self, cards):
+        """Put the most recently drawn ``cards`` back on top of the shoe."""
+        self.position = max(0, self.position - len(cards))
+
+
+class SeededShoe(Shoe):
+    """Shoe whose every shuffle follows from ``seed``, so a table can be replayed."""
+
+    def __init__(self, seed, decks=DEFAULT_DECKS, penetration=DEFAULT_PENETRATION):
+        self.seed = seed
+        super().__init__(decks, penetration, rng=random.Random(seed))
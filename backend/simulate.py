@@ -0,0 +1,199 @@
+# //backend/simulate.py
+
+"""Offline Monte Carlo blackjack simulator.
+
+Plays many shoes side by side as NumPy arrays: each row is an integer-encoded
+shoe from the live card table, and each round is dealt to every row at once.
+Dealer play and settlement come from ``rules.Rules``, the same code the live
+game uses. Work is split across a process pool, and each worker gets its own
+deterministic seed from ``numpy.random.SeedSequence``.
+
+    python simulate.py --hands 10000000 --strategy basic --h17 --workers 8
+
+Needs NumPy (requirements-bench.txt); the live server does not.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import time
+
+import numpy as np
+
+from cards import CARDS
+from rules import Rules
+
+# hard value of each card index, aces as 1
+HARD_VALUES = np.array([1 if c.points == 11 else c.points for c in CARDS], dtype=np.int8)
+
+# a round never needs more than this many cards, so play stops this far before the shoe's end
+ROUND_RESERVE = 30
+
+OUTCOMES = ("win", "lose", "push", "blackjack", "player_bust", "dealer_bust")
+
+
+# Strategies: (total, soft, dealer_up) arrays -> bool array "hit".
+# dealer_up is the upcard's blackjack value, 2..11.
+
+def mimic_dealer(total, soft, dealer_up):
+    return total < 17
+
+
+def never_bust(total, soft, dealer_up):
+    return (total < 12) | (soft & (total < 18))
+
+
+def basic(total, soft, dealer_up):
+    """Hit/stand basic strategy (no doubles, splits or surrender)."""
+    hard_hit = (total <= 11) | ((total == 12) & ((dealer_up < 4) | (dealer_up > 6))) \
+        | ((total >= 13) & (total <= 16) & (dealer_up >= 7))
+    soft_hit = (total <= 17) | ((total == 18) & (dealer_up >= 9))
+    return np.where(soft, soft_hit, hard_hit)
+
+
+STRATEGIES = {"mimic_dealer": mimic_dealer, "never_bust": never_bust, "basic": basic}
+
+
+def _score(hard, aces):
+    soft = aces & (hard + 10 <= 21)
+    return np.where(soft, hard + 10, hard), soft
+
+
+def _deal(shoes, pos, rows, hard, aces):
+    cards = HARD_VALUES[shoes[rows, pos[rows]]]
+    pos[rows] += 1
+    hard[rows] += cards
+    aces[rows] |= cards == 1
+
+
+def simulate_batch(rules, strategy, shoes_per_batch, rounds, rng):
+    """Play ``rounds`` rounds (at least) over batches of shoes; returns summed stats."""
+    shoe_size = 52 * rules.decks
+    cut = min(int(shoe_size * rules.penetration), shoe_size - ROUND_RESERVE)
+    if cut <= 0:
+        raise ValueError("Shoe too small for the penetration and round reserve.")
+
+    template = np.tile(np.arange(52, dtype=np.uint8), rules.decks)
+    stats = dict.fromkeys(OUTCOMES, 0)
+    stats.update(hands=0, net=0.0, net_sq=0.0)
+    b = shoes_per_batch
+    all_rows = np.arange(b)
+
+    while stats["hands"] < rounds:
+        shoes = rng.permuted(np.broadcast_to(template, (b, shoe_size)), axis=1)
+        pos = np.zeros(b, dtype=np.int64)
+        while True:
+            live = pos < cut
+            if not live.any():
+                break
+            rows = all_rows[live]
+            n = len(rows)
+            p_hard, d_hard = np.zeros(b, np.int64), np.zeros(b, np.int64)
+            p_aces, d_aces = np.zeros(b, bool), np.zeros(b, bool)
+
+            # casino order: player, dealer up, player, dealer hole
+            _deal(shoes, pos, rows, p_hard, p_aces)
+            up = HARD_VALUES[shoes[rows, pos[rows]]]
+            _deal(shoes, pos, rows, d_hard, d_aces)
+            _deal(shoes, pos, rows, p_hard, p_aces)
+            _deal(shoes, pos, rows, d_hard, d_aces)
+            up_value = np.zeros(b, np.int64)
+            up_value[rows] = np.where(up == 1, 11, up)
+
+            p_score, _ = _score(p_hard, p_aces)
+            d_score, _ = _score(d_hard, d_aces)
+            p_bj, d_bj = p_score == 21, d_score == 21
+            done = ~live | p_bj | d_bj
+
+            # player acts
+            while True:
+                p_score, p_soft = _score(p_hard, p_aces)
+                acting = ~done & (p_score < 21) & strategy(p_score, p_soft, up_value)
+                if not acting.any():
+                    break
+                _deal(shoes, pos, all_rows[acting], p_hard, p_aces)
+            p_score, _ = _score(p_hard, p_aces)
+
+            # dealer draws by the live rules unless every player hand is settled already
+            dealer_done = done | (p_score > 21)
+            while True:
+                d_score, d_soft = _score(d_hard, d_aces)
+                drawing = ~dealer_done & rules.dealer_hits(d_score, d_soft)
+                if not drawing.any():
+                    break
+                _deal(shoes, pos, all_rows[drawing], d_hard, d_aces)
+            d_score, _ = _score(d_hard, d_aces)
+
+            p, d = p_score[rows], d_score[rows]
+            pbj, dbj = p_bj[rows], d_bj[rows]
+            net = rules.settle(p, d, pbj, dbj)
+            stats["hands"] += n
+            stats["net"] += float(net.sum())
+            stats["net_sq"] += float((net * net).sum())
+            stats["win"] += int((net > 0).sum())
+            stats["lose"] += int((net < 0).sum())
+            stats["push"] += int((net == 0).sum())
+            stats["blackjack"] += int((pbj & ~dbj).sum())
+            stats["player_bust"] += int((p > 21).sum())
+            stats["dealer_bust"] += int(((d > 21) & (p <= 21) & ~pbj & ~dbj).sum())
+    return stats
+
+
+def _worker(args):
+    rules, strategy_name, hands, seed, shoes_per_batch = args
+    rng = np.random.default_rng(seed)
+    return simulate_batch(rules, STRATEGIES[strategy_name], shoes_per_batch, hands, rng)
+
+
+def simulate(rules=Rules(), strategy="basic", hands=1_000_000, workers=1, seed=0, shoes_per_batch=4096):
+    """Play about ``hands`` hands and return EV, variance and outcome rates.
+
+    Results are deterministic for a given ``seed`` and ``workers``.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    share = -(-hands // workers)
+    jobs = [(rules, strategy, share, s, shoes_per_batch) for s in seeds]
+
+    start = time.perf_counter()
+    if workers == 1:
+        parts = [_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_worker, jobs))
+    elapsed = time.perf_counter() - start
+
+    total = {k: sum(p[k] for p in parts) for k in parts[0]}
+    n = total["hands"]
+    ev = total["net"] / n
+    variance = total["net_sq"] / n - ev * ev
+    return {
+        "rules": {"decks": rules.decks, "penetration": rules.penetration,
+                  "hit_soft_17": rules.hit_soft_17, "blackjack_pays": rules.blackjack_pays},
+        "strategy": strategy,
+        "hands": n,
+        "ev": ev,
+        "variance": variance,
+        "std_error": (variance / n) ** 0.5,
+        "outcomes": {k: total[k] / n for k in OUTCOMES},
+        "hands_per_sec": n / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo blackjack simulator")
+    parser.add_argument("--hands", type=int, default=1_000_000)
+    parser.add_argument("--decks", type=int, default=Rules.decks)
+    parser.add_argument("--penetration", type=float, default=Rules.penetration)
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--blackjack-pays", type=float, default=Rules.blackjack_pays)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="basic")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rules = Rules(args.decks, args.penetration, args.h17, args.blackjack_pays)
+    print(json.dumps(simulate(rules, args.strategy, args.hands, args.workers, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
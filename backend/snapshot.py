@@ -0,0 +1,310 @@
+# //backend/snapshot.py
+
+"""Snapshots of every table, so a restart resumes games where they were.
+
+``Snapshotter.snapshot()`` runs off the request path (a background task,
+and once more at exit). Tables are encoded one at a time under their own
+lock, so a pass never stops the other tables. Each table's bytes are
+cached with the table and the ``Table.version`` they were taken at, and a
+table whose version has not moved since is not locked or encoded again. The file is
+written to a temporary name, fsynced and renamed over the previous one, so
+a crash mid-write leaves the last complete snapshot.
+
+``read_snapshot()`` rebuilds the tables at startup. Seats come back
+without sockets. A player reclaims a seat by joining the table with the
+same ``playerId`` (``Table.add_seat`` keeps the seat and hand); until then
+the seat is not dealt in (``Table.seated``).
+
+File layout (little endian): a 20-byte header ``b"BJSN"``, version u16,
+2 pad bytes, table count u32 and creation time f64 (unix seconds). Then one
+block per table: length u32 and
+
+    table_id, stakes f64, round u32, seq u32, game_started u8, turn index u16
+    deck      kind u8 and its state (below)
+    dealer    cards, score i16
+    turn order  count u16, player_ids
+    seats     count u16, then per seat: player_id, username, bet f64,
+              pending bet f64 (NaN for none), cards
+
+Strings are a u16 length and utf-8. Cards are a count u8 and one
+``cards.CARDS`` index u8 each. Deck kinds:
+
+    SHOE      penetration f64, position u32, shoe (u16 length and indices),
+              queued order (the same, length 0 for none)
+    SEEDED    a SHOE, then the seed as a string, the Mersenne Twister state
+              (625 u32) and its gauss_next f64
+    RECORDED  position u32, u32 length and indices
+    REMOTE    decks u8, buffered cards (u16 length and indices), then the
+              fallback SHOE. The API deck id is not kept: the restored deck
+              starts a new API deck when it refills.
+"""
+
+from array import array
+import gc
+import math
+import os
+import random
+import struct
+import threading
+import time
+
+from cards import CARDS
+from deck_client import PrefetchDeck
+from deck_provider import RecordedDeck
+from hand import Hand
+from shoe import Shoe, SeededShoe
+from tables import Table, Seat
+
+MAGIC = b"BJSN"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxId")
+BLOCK = struct.Struct("<I")
+TABLE_HEAD = struct.Struct("<dIIBH")
+SHOE_HEAD = struct.Struct("<dI")
+SEAT_BETS = struct.Struct("<dd")
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+RECORDED_HEAD = struct.Struct("<II")
+DEALER_TAIL = struct.Struct("<hH")
+F64 = struct.Struct("<d")
+
+SHOE, SEEDED, RECORDED, REMOTE = range(4)
+MT_WORDS = 625
+
+
+def _str(text):
+    data = text.encode()
+    return U16.pack(len(data)) + data
+
+
+def _cards(hand):
+    return bytes((len(hand), *(card.index for card in hand)))
+
+
+def _indices(values):
+    return U16.pack(len(values)) + bytes(values)
+
+
+def _number(value):
+    # bets are whatever the client sent; anything that is not a number is dropped
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _shoe(deck):
+    return (SHOE_HEAD.pack(deck.penetration, deck.position) + _indices(deck.cards)
+            + _indices(deck.next_order if deck.next_order is not None else b""))
+
+
+def _deck(deck):
+    kind = type(deck)
+    if kind is Shoe:
+        return U8.pack(SHOE) + _shoe(deck)
+    if kind is SeededShoe:
+        _, words, gauss = deck.rng.getstate()
+        return (U8.pack(SEEDED) + _shoe(deck) + _str(str(deck.seed)) + array("I", words).tobytes()
+                + F64.pack(math.nan if gauss is None else gauss))
+    if kind is RecordedDeck:
+        return U8.pack(RECORDED) + RECORDED_HEAD.pack(deck.position, len(deck.cards)) + bytes(deck.cards)
+    if kind is PrefetchDeck:
+        return (U8.pack(REMOTE) + U8.pack(deck.decks) + _indices([card.index for card in list(deck.buffer)])
+                + _shoe(deck.fallback))
+    raise TypeError(f"Cannot snapshot a {kind.__name__} deck")
+
+
+def encode_table(table):
+    """One table's snapshot block, without the length prefix."""
+    parts = [_str(table.table_id),
+             TABLE_HEAD.pack(table.stakes, table.round, table.seq, table.game_started, table.current_turn_index),
+             _deck(table.deck),
+             _cards(table.dealer.hand), DEALER_TAIL.pack(table.dealer.score, len(table.turn_order))]
+    parts += [_str(player_id) for player_id in table.turn_order]
+    parts.append(U16.pack(len(table.seats)))
+    for seat in table.seats.values():
+        parts += (_str(seat.player_id), _str(seat.username),
+                  SEAT_BETS.pack(_number(seat.bet), _number(seat.pending_bet)), _cards(seat.hand))
+    return b"".join(parts)
+
+
+# hard points (aces as 1) and ace flag per card index, to rebuild a Hand's totals
+_HARD = bytes(1 if card.points == 11 else card.points for card in CARDS)
+_ACES = bytes(card.points == 11 for card in CARDS)
+
+
+def _restored_number(value):
+    if value != value:      # NaN
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _read_str(data, pos):
+    (length,) = U16.unpack_from(data, pos)
+    pos += U16.size + length
+    return str(data[pos - length:pos], "utf-8"), pos
+
+
+def _read_indices(data, pos):
+    (length,) = U16.unpack_from(data, pos)
+    pos += U16.size + length
+    return data[pos - length:pos], pos
+
+
+def _read_hand(data, pos):
+    # sets the totals directly rather than appending card by card
+    indices = data[pos + 1:pos + 1 + data[pos]]
+    hand = Hand()
+    list.extend(hand, [CARDS[i] for i in indices])
+    hand.hard = sum(_HARD[i] for i in indices)
+    hand.aces = sum(_ACES[i] for i in indices)
+    return hand, pos + 1 + len(indices)
+
+
+def _read_shoe(data, pos, cls=Shoe, rng=None):
+    penetration, position = SHOE_HEAD.unpack_from(data, pos)
+    cards, pos = _read_indices(data, pos + SHOE_HEAD.size)
+    next_order, pos = _read_indices(data, pos)
+    return cls.restore(cards, position, penetration, next_order or None, rng), pos
+
+
+def _read_deck(data, pos, remote_deck):
+    kind = data[pos]
+    pos += 1
+    if kind == SHOE:
+        return _read_shoe(data, pos)
+    if kind == SEEDED:
+        shoe, pos = _read_shoe(data, pos, SeededShoe, random.Random())
+        seed, pos = _read_str(data, pos)
+        shoe.seed = int(seed)
+        words = array("I")
+        words.frombytes(data[pos:pos + MT_WORDS * 4])
+        (gauss,) = F64.unpack_from(data, pos + MT_WORDS * 4)
+        shoe.rng.setstate((3, tuple(words), _restored_number(gauss)))
+        return shoe, pos + MT_WORDS * 4 + F64.size
+    if kind == RECORDED:
+        position, length = RECORDED_HEAD.unpack_from(data, pos)
+        pos += RECORDED_HEAD.size + length
+        deck = RecordedDeck(data[pos - length:pos])
+        deck.position = position
+        return deck, pos
+    if kind == REMOTE:
+        decks = data[pos]
+        buffered, pos = _read_indices(data, pos + 1)
+        fallback, pos = _read_shoe(data, pos)
+        if remote_deck is None:
+            return fallback, pos
+        deck = remote_deck(decks, fallback)
+        deck.buffer.extendleft(CARDS[i] for i in reversed(buffered))
+        return deck, pos
+    raise ValueError(f"Unknown deck kind {kind}")
+
+
+def decode_table(data, pos=0, remote_deck=None):
+    """Rebuild a table from its block. ``remote_deck(decks, fallback)`` makes
+    the deck for a table that dealt from the deck API; without it such a
+    table keeps dealing from its fallback shoe."""
+    table_id, pos = _read_str(data, pos)
+    stakes, round_no, seq, game_started, turn_index = TABLE_HEAD.unpack_from(data, pos)
+    deck, pos = _read_deck(data, pos + TABLE_HEAD.size, remote_deck)
+    table = Table(table_id, deck, _restored_number(stakes))
+    table.round, table.seq, table.game_started, table.current_turn_index = round_no, seq, bool(game_started), turn_index
+    table.dealer.hand, pos = _read_hand(data, pos)
+    table.dealer.score, count = DEALER_TAIL.unpack_from(data, pos)
+    pos += DEALER_TAIL.size
+    turn_order = table.turn_order
+    for _ in range(count):
+        player_id, pos = _read_str(data, pos)
+        turn_order.append(player_id)
+    (count,) = U16.unpack_from(data, pos)
+    pos += U16.size
+    seats = table.seats
+    for _ in range(count):
+        player_id, pos = _read_str(data, pos)
+        username, pos = _read_str(data, pos)
+        seat = seats[player_id] = Seat(player_id, username, None, table_id)
+        bet, pending = SEAT_BETS.unpack_from(data, pos)
+        seat.bet = _restored_number(bet) or 0
+        seat.pending_bet = _restored_number(pending)
+        seat.hand, pos = _read_hand(data, pos + SEAT_BETS.size)
+    return table
+
+
+def write_snapshot(path, blocks, created=None):
+    """Write encoded table blocks to ``path`` atomically."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(blocks), time.time() if created is None else created))
+        for block in blocks:
+            f.write(BLOCK.pack(len(block)))
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path, remote_deck=None):
+    """(creation time, [Table]) from a snapshot file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, count, created = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a table snapshot (version {VERSION})")
+    tables, pos = [], HEADER.size
+    # nothing decoded here is garbage yet, so collections would only slow the load
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(count):
+            (length,) = BLOCK.unpack_from(data, pos)
+            pos += BLOCK.size
+            tables.append(decode_table(data, pos, remote_deck))
+            pos += length
+    finally:
+        if collecting:
+            gc.enable()
+    return created, tables
+
+
+class Snapshotter:
+    """Periodic snapshots of ``rooms``, taking each table under ``lock_for(table_id)``."""
+
+    def __init__(self, path, rooms, lock_for, interval=10.0):
+        self.path = path
+        self.rooms = rooms
+        self.lock_for = lock_for
+        self.interval = interval
+        self.stats = {"snapshots": 0, "tables": 0, "encoded": 0, "bytes": 0, "seconds": 0.0}
+        self._cache = {}        # table_id -> (table, version, block)
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Write one snapshot; returns how many tables were encoded afresh."""
+        with self._lock:
+            start = time.perf_counter()
+            cache, fresh, blocks = {}, 0, []
+            for table_id, table in list(self.rooms.items()):
+                cached = self._cache.get(table_id)
+                # a table evicted and created again under the same id starts its versions over
+                if cached is None or cached[0] is not table or cached[1] != table.version:
+                    with self.lock_for(table_id):
+                        if self.rooms.get(table_id) is not table:
+                            continue
+                        cached = (table, table.version, encode_table(table))
+                    fresh += 1
+                cache[table_id] = cached
+                blocks.append(cached[2])
+            self._cache = cache
+            write_snapshot(self.path, blocks)
+            self.stats["snapshots"] += 1
+            self.stats["tables"] = len(blocks)
+            self.stats["encoded"] += fresh
+            self.stats["bytes"] = os.path.getsize(self.path)
+            self.stats["seconds"] = time.perf_counter() - start
+            return fresh
+
+    def run(self, sleep=time.sleep):
+        """Snapshot every ``interval`` seconds. Run it as a background task."""
+        while True:
+            sleep(self.interval)
+            self.snapshot()
@@ -0,0 +1,199 @@
+# //backend/strategy_tables.py
+
+"""Precomputed dealer-outcome and hit/stand tables for the ``hint`` event.
+
+``python strategy_tables.py`` computes, for every shoe configuration in
+``CONFIGS``:
+
+* the exact distribution of the dealer's final result (17..21, bust,
+  natural) for each upcard. This is a recursion over the shoe composition
+  minus the upcard, using ``rules.Rules.dealer_hits``.
+* the stand/hit EV and best action for every (player total, soft, upcard).
+  Player draws use the same composition.
+
+It writes them to ``strategy.bin``. The server memory-maps that file at
+startup and every hint is a few offset reads.
+
+File layout (little endian): a 16-byte header ``b"BJST"``, version u32,
+config count u32 and record size u32, followed by one fixed-size record per
+config:
+    decks u8, hit_soft_17 u8, 6 pad bytes
+    dealer   float32[10 upcards][7]         17, 18, 19, 20, 21, bust, natural
+    ev       float32[2 soft][18 totals][10 upcards][2]   stand, hit
+    action   u8[2 soft][18 totals][10 upcards]           0 stand, 1 hit
+"""
+
+from functools import lru_cache
+import mmap
+import os
+import struct
+
+from rules import Rules
+
+MAGIC = b"BJST"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+CONFIG_HEADER = struct.Struct("<BB6x")
+
+UPCARDS = range(2, 12)          # blackjack value of the dealer upcard, ace = 11
+TOTALS = range(4, 22)           # player score
+DEALER_OUTCOMES = ("17", "18", "19", "20", "21", "bust", "natural")
+
+DEALER_SIZE = len(UPCARDS) * len(DEALER_OUTCOMES) * 4
+EV_SIZE = 2 * len(TOTALS) * len(UPCARDS) * 2 * 4
+ACTION_SIZE = 2 * len(TOTALS) * len(UPCARDS)
+RECORD_SIZE = CONFIG_HEADER.size + DEALER_SIZE + EV_SIZE + ACTION_SIZE
+
+CONFIGS = [(decks, h17) for decks in (1, 2, 4, 6, 8) for h17 in (False, True)]
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "strategy.bin")
+
+
+def _score(hard, ace):
+    soft = ace and hard + 10 <= 21
+    return (hard + 10 if soft else hard), soft
+
+
+def dealer_distribution(decks, upcard, rules):
+    """Probability of each DEALER_OUTCOMES entry given the upcard value (2..11)."""
+    counts = [0] + [4 * decks] * 9 + [16 * decks]   # index = hard card value 1..10
+    up = 1 if upcard == 11 else upcard
+    counts[up] -= 1
+
+    @lru_cache(maxsize=None)
+    def play(hard, ace, counts, first):
+        score, soft = _score(hard, ace)
+        if not first:
+            if score > 21:
+                return (0.0,) * 5 + (1.0, 0.0)
+            if not rules.dealer_hits(score, soft):
+                out = [0.0] * 7
+                out[score - 17] = 1.0
+                return tuple(out)
+        total = sum(counts)
+        result = [0.0] * 7
+        for value in range(1, 11):
+            if not counts[value]:
+                continue
+            p = counts[value] / total
+            rest = counts[:value] + (counts[value] - 1,) + counts[value + 1:]
+            if first and _score(hard + value, ace or value == 1)[0] == 21:
+                result[6] += p
+                continue
+            for i, q in enumerate(play(hard + value, ace or value == 1, rest, False)):
+                result[i] += p * q
+        return tuple(result)
+
+    return play(up, up == 1, tuple(counts), True)
+
+
+def player_tables(decks, dealer, upcard):
+    """``{(score, soft): (ev_stand, ev_hit)}`` against one upcard's dealer distribution."""
+    counts = [0] + [4 * decks] * 9 + [16 * decks]
+    counts[1 if upcard == 11 else upcard] -= 1
+    total = sum(counts)
+    probs = [c / total for c in counts]
+
+    def stand(score):
+        final = dict(zip((17, 18, 19, 20, 21), dealer[:5]))
+        ev = dealer[5] - dealer[6]              # dealer busts / dealer natural
+        for dealer_score, p in final.items():
+            ev += p * ((score > dealer_score) - (score < dealer_score))
+        return ev
+
+    @lru_cache(maxsize=None)
+    def best(hard, ace):
+        if hard > 21:
+            return -1.0
+        score, _ = _score(hard, ace)
+        return max(stand(score), hit(hard, ace))
+
+    @lru_cache(maxsize=None)
+    def hit(hard, ace):
+        return sum(p * best(hard + v, ace or v == 1) for v, p in enumerate(probs) if p)
+
+    table = {}
+    for score in TOTALS:
+        table[(score, False)] = (stand(score), hit(score, False))
+        if score >= 12:
+            table[(score, True)] = (stand(score), hit(score - 10, True))
+    return table
+
+
+def build_record(decks, h17):
+    rules = Rules(decks=decks, hit_soft_17=h17)
+    out = bytearray(CONFIG_HEADER.pack(decks, h17))
+    evs = [[[(0.0, 0.0)] * len(UPCARDS) for _ in TOTALS] for _ in range(2)]
+    for u, upcard in enumerate(UPCARDS):
+        dealer = dealer_distribution(decks, upcard, rules)
+        out += struct.pack("<7f", *dealer)
+        for (score, soft), ev in player_tables(decks, dealer, upcard).items():
+            evs[soft][score - TOTALS.start][u] = ev
+    for soft in range(2):
+        for row in evs[soft]:
+            for ev in row:
+                out += struct.pack("<2f", *ev)
+    for soft in range(2):
+        for row in evs[soft]:
+            out += bytes(1 if hit_ev > stand_ev else 0 for stand_ev, hit_ev in row)
+    assert len(out) == RECORD_SIZE
+    return bytes(out)
+
+
+def build(path=DEFAULT_PATH, configs=CONFIGS):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(configs), RECORD_SIZE))
+        for decks, h17 in configs:
+            f.write(build_record(decks, h17))
+
+
+class StrategyTables:
+    """Memory-mapped view of a strategy file; every lookup is O(1)."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, record_size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a v{VERSION} strategy file")
+        self.configs = {}
+        for i in range(count):
+            offset = HEADER.size + i * RECORD_SIZE
+            decks, h17 = CONFIG_HEADER.unpack_from(self._map, offset)
+            self.configs[(decks, bool(h17))] = offset
+
+    def close(self):
+        self._map.close()
+
+    def _record(self, decks, h17):
+        offset = self.configs.get((decks, h17))
+        if offset is None:
+            # closest deck count with the same soft-17 rule
+            nearest = min((d for d, h in self.configs if h == h17), key=lambda d: abs(d - decks))
+            offset = self.configs[(nearest, h17)]
+        return offset
+
+    def dealer(self, upcard, decks=6, h17=False):
+        offset = self._record(decks, h17) + CONFIG_HEADER.size + (upcard - UPCARDS.start) * 28
+        return dict(zip(DEALER_OUTCOMES, struct.unpack_from("<7f", self._map, offset)))
+
+    def hint(self, score, soft, upcard, decks=6, h17=False):
+        """Best action for a player ``score`` (``soft`` if an ace counts 11) against
+        a dealer ``upcard`` value 2..11. Totals under 4 count as 4."""
+        score = max(score, TOTALS.start)
+        if score > 21:
+            return None
+        soft = bool(soft) and score >= 12
+        cell = (int(soft) * len(TOTALS) + score - TOTALS.start) * len(UPCARDS) + upcard - UPCARDS.start
+        base = self._record(decks, h17) + CONFIG_HEADER.size
+        ev_stand, ev_hit = struct.unpack_from("<2f", self._map, base + DEALER_SIZE + cell * 8)
+        action = self._map[base + DEALER_SIZE + EV_SIZE + cell]
+        return {"action": "hit" if action else "stand", "ev_stand": ev_stand, "ev_hit": ev_hit}
+
+
+if __name__ == "__main__":
+    import time
+    start = time.perf_counter()
+    build()
+    print(f"Wrote {DEFAULT_PATH} ({os.path.getsize(DEFAULT_PATH):,} bytes, {len(CONFIGS)} configs) "
+          f"in {time.perf_counter() - start:.1f}s")
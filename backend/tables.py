@@ -0,0 +1,141 @@
+# //backend/tables.py
+
+"""Typed table state: ``Table``, ``Seat`` and ``DealerState``.
+
+All three use ``__slots__``, which makes 100k tables a fraction of the size
+of the nested dicts they replace and makes attribute reads cheaper than key
+lookups. A table indexes its seats twice: ``seats`` by player_id, in join
+order, and ``by_sid`` by socket sid. The global ``players`` registry in
+app.py maps a sid to the same ``Seat`` objects.
+
+The client-facing shapes (``Seat.view()``, ``Table.state()``) are the same
+as before: game_state.py builds them.
+
+Snapshots are cached per table on ``version``. Every state change must call
+``touch()``; game_state.make_delta does it for every delta. Each view (dealer
+hole card hidden or revealed) is built and JSON-encoded at most once per
+version and then reused for every game_state emit and resync.
+"""
+
+from collections import Counter
+
+from encoded import Encoded
+from game_state import build_state
+from hand import Hand
+
+# snapshot cache hits and misses across all tables, served by /emit-stats
+SNAPSHOT_STATS = Counter()
+
+
+class Seat:
+    __slots__ = ("player_id", "username", "sid", "table_id", "hand", "bet", "pending_bet", "result")
+
+    def __init__(self, player_id, username, sid, table_id):
+        self.player_id = player_id
+        self.username = username
+        self.sid = sid
+        self.table_id = table_id
+        self.hand = Hand()
+        self.bet = 0               # stake in the current round
+        self.pending_bet = None    # placed for the next round
+        self.result = None         # outcome label once the round is over
+
+    def view(self):
+        """The seat as clients see it in snapshots and deltas."""
+        return {"username": self.username, "hand": list(self.hand), "score": self.hand.score, "bet": self.bet,
+                "pending_bet": self.pending_bet, "result": self.result}
+
+
+class DealerState:
+    __slots__ = ("hand", "score")
+
+    def __init__(self, hand=None):
+        self.hand = hand if hand is not None else Hand()
+        self.score = 0
+
+
+class Table:
+    __slots__ = ("table_id", "deck", "stakes", "dealer", "seats", "by_sid", "game_started",
+                 "turn_order", "current_turn_index", "round", "timer", "seq", "version",
+                 "_cached_version", "_hidden", "_revealed")
+
+    def __init__(self, table_id, deck, stakes=0):
+        self.table_id = table_id
+        self.deck = deck
+        self.stakes = stakes        # minimum bet, 0 for none
+        self.dealer = DealerState()
+        self.seats = {}             # player_id -> Seat
+        self.by_sid = {}            # sid -> Seat
+        self.game_started = False
+        self.turn_order = []        # player_ids
+        self.current_turn_index = 0
+        self.round = 0              # rounds dealt, numbering the round history
+        self.timer = None           # pending deadline on app.timers: turn, betting or restart
+        self.seq = 0
+        self.version = 0
+        self._cached_version = -1
+        self._hidden = None
+        self._revealed = None
+
+    def touch(self):
+        """Mark the state changed so the next snapshot is rebuilt."""
+        self.version += 1
+
+    def add_seat(self, player_id, username, sid):
+        """Seat a player, or move an existing seat to a new socket on rejoin."""
+        seat = self.seats.get(player_id)
+        if seat is None:
+            seat = self.seats[player_id] = Seat(player_id, username, sid, self.table_id)
+        else:
+            self.by_sid.pop(seat.sid, None)
+            seat.username, seat.sid = username, sid
+        self.by_sid[sid] = seat
+        if player_id not in self.turn_order:
+            self.turn_order.append(player_id)
+        self.touch()
+        return seat
+
+    def remove_seat(self, sid):
+        """Drop the seat on ``sid``; returns it, or None if there was none."""
+        seat = self.by_sid.pop(sid, None)
+        if seat is not None and self.seats.get(seat.player_id) is seat:
+            del self.seats[seat.player_id]
+            self.touch()
+        return seat
+
+    def seated(self):
+        """Seats with a socket: every seat but those restored from a snapshot
+        and not reclaimed yet, which sit out the rounds until they are."""
+        return [seat for seat in self.seats.values() if seat.sid is not None]
+
+    def drop_unclaimed(self):
+        """Drop the restored seats nobody reclaimed; returns their player_ids."""
+        dropped = [player_id for player_id, seat in self.seats.items() if seat.sid is None]
+        for player_id in dropped:
+            del self.seats[player_id]
+        if dropped:
+            self.touch()
+        return dropped
+
+    def bets_placed(self):
+        return sum(1 for seat in self.seated() if seat.pending_bet is not None)
+
+    def state(self, reveal=None):
+        """Encoded full snapshot for this version. By default the dealer's hole
+        card is hidden while a round runs; ``reveal`` forces either view."""
+        if reveal is None:
+            reveal = not self.game_started
+        if self._cached_version != self.version:
+            self._cached_version = self.version
+            self._hidden = self._revealed = None
+        snapshot = self._revealed if reveal else self._hidden
+        if snapshot is not None:
+            SNAPSHOT_STATS["hit"] += 1
+            return snapshot
+        SNAPSHOT_STATS["miss"] += 1
+        snapshot = Encoded(build_state(self, reveal))
+        if reveal:
+            self._revealed = snapshot
+        else:
+            self._hidden = snapshot
+        return snapshot
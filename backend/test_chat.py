@@ -0,0 +1,131 @@
+#//backend/test_chat.py
+
+import unittest
+
+import app as app_module
+from app import rooms
+from chat import Chat
+from test_support import AppTestCase, FakeClock
+
+
+class TestChat(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.chat = Chat(history=3, global_history=2, rate=1.0, burst=2, max_length=10, clock=self.clock)
+
+    def test_rings_keep_the_latest_messages(self):
+        for i in range(5):
+            self.chat.post("t1", "a", f"m{i}")
+        self.chat.post(None, "a", "hello everyone")
+        self.assertEqual([m["message"] for m in self.chat.backlog("t1")], ["m2", "m3", "m4"])
+        [message] = self.chat.backlog(None)
+        self.assertEqual(message, {"username": "a", "message": "hello ever", "tableId": None, "isglobal": True})
+        self.assertEqual(self.chat.backlog("t2"), [])
+
+    def test_drain_batches_per_channel_and_bounds_the_batch(self):
+        for i in range(4):
+            self.chat.post("t1", "a", f"m{i}")
+        self.chat.post("t2", "b", "hi")
+        batches = dict(self.chat.drain())
+        self.assertEqual([m["message"] for m in batches["t1"]], ["m1", "m2", "m3"])
+        self.assertEqual(len(batches["t2"]), 1)
+        self.assertEqual(self.chat.stats["dropped"], 1)
+        self.assertEqual(self.chat.drain(), [])
+
+    def test_rate_limit_per_sender(self):
+        self.assertTrue(self.chat.allow("s1"))
+        self.assertTrue(self.chat.allow("s1"))
+        self.assertFalse(self.chat.allow("s1"))
+        self.assertTrue(self.chat.allow("s2"))
+        self.clock.now += 1
+        self.assertTrue(self.chat.allow("s1"))
+        self.assertEqual(self.chat.stats["rate_limited"], 1)
+
+        self.clock.now += 10
+        self.chat.expire()
+        self.assertEqual(self.chat._buckets, {})
+
+    def test_forget_drops_a_table(self):
+        self.chat.post("t1", "a", "bye")
+        self.chat.forget("t1")
+        self.assertEqual(self.chat.backlog("t1"), [])
+        self.assertEqual(self.chat.drain(), [])
+
+
+class TestAppChat(AppTestCase):
+
+    def patches(self):
+        return {**super().patches(), "chat": Chat(history=5, rate=1.0, burst=3)}
+
+    def test_messages_go_out_in_one_batch_per_table(self):
+        a, b = self.client(), self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        b.emit("join", {"table_id": "t1", "playerId": "pb", "username": "bob"})
+        b.emit("chat_message", {"tableId": "t1", "username": "mallory", "message": " hi "})
+        b.emit("chat_message", {"tableId": "t1", "username": "bob", "message": "gl"})
+        # only System lines go out one by one
+        self.assertEqual({m["username"] for m in self.received(a, "chat_message")}, {"System"})
+        app_module.publish_chat_batches()
+        [batch] = self.received(a, "chat_batch")
+        self.assertEqual(batch["table_id"], "t1")
+        said = [(m["username"], m["message"]) for m in batch["messages"]]
+        self.assertEqual(said, [("bob", "hi"), ("bob", "gl")])
+
+    def test_system_lines_arrive_in_order_with_the_game(self):
+        a = self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        a.get_received()
+        a.emit("stay", {"table_id": "t1"})
+        events = [(p["name"], p["args"][0]) for p in a.get_received()]
+        over = [name for name, _ in events].index("round_over")
+        lines = [(i, data["message"]) for i, (name, data) in enumerate(events) if name == "chat_message"]
+        self.assertEqual(lines[0][1], "alice stays")
+        self.assertLess(lines[0][0], over)
+        self.assertEqual(app_module.chat.backlog("t1")[-1]["username"], "System")
+
+    def test_chat_needs_a_seat_and_a_free_name(self):
+        a, b = self.client(), self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        b.emit("chat_message", {"table_id": "t1", "username": "alice", "message": "hi"})
+        b.emit("chat_message", {"username": "System", "message": "free chips", "isGlobal": True})
+        b.emit("join", {"table_id": "t2", "playerId": "pb", "username": "dealer"})
+        errors = [e["error"] for e in self.received(b, "error_message")]
+        self.assertEqual(errors, ["Join the table to chat there", "That name is reserved", "That name is reserved"])
+        self.assertNotIn("t2", rooms)
+        app_module.publish_chat_batches()
+        self.assertEqual(self.received(a, "chat_batch"), [])
+
+    def test_joiner_gets_the_backlog(self):
+        a = self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        a.emit("chat_message", {"table_id": "t1", "message": "anyone?"})
+        late = self.client()
+        late.emit("join", {"table_id": "t1", "playerId": "pl", "username": "late"})
+        [history] = self.received(late, "chat_history")
+        self.assertEqual(history["table_id"], "t1")
+        self.assertEqual(history["messages"][-1]["message"], "anyone?")
+        self.assertNotIn("late joined the table.", [m["message"] for m in history["messages"]])
+
+    def test_flooding_sender_is_refused(self):
+        a = self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        a.get_received()
+        for i in range(5):
+            a.emit("chat_message", {"table_id": "t1", "message": f"spam {i}"})
+        errors = [e["error"] for e in self.received(a, "error_message")]
+        self.assertEqual(errors, ["Too many chat messages, slow down"] * 2)
+        self.assertEqual(app_module.chat.stats["player"], 3)
+
+    def test_global_messages_reach_everyone_and_new_sockets(self):
+        a, b = self.client(), self.client()
+        a.emit("chat_message", {"username": "alice", "message": "hello all", "isGlobal": True})
+        app_module.publish_chat_batches()
+        [batch] = self.received(b, "chat_batch")
+        self.assertTrue(batch["messages"][0]["isglobal"])
+        [history] = self.received(self.client(), "chat_history")
+        self.assertEqual(history["messages"][0]["message"], "hello all")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#//backend/test_concurrency.py
+
+import random
+import threading
+import time
+import unittest
+from collections import defaultdict
+import app as app_module
+from app import rooms, players
+from lifecycle import TableLifecycle
+from game_state import DELTA_EVENTS
+from hand import calculate_score
+from test_support import AppTestCase
+
+TABLES = 200
+SEATS = 2
+EVENTS = 5000
+THREADS = 16
+
+
+class TestConcurrentTables(AppTestCase):
+
+    def patches(self):
+        return {"lifecycle": TableLifecycle(max_per_client=TABLES, create_burst=TABLES)}
+
+    def setUp(self):
+        super().setUp()
+        self.seats = []
+        for t in range(TABLES):
+            for s in range(SEATS):
+                client = self.client()
+                client.emit("join", {"table_id": f"stress-{t}", "playerId": f"p{t}-{s}", "username": f"u{t}-{s}"})
+                self.seats.append((f"stress-{t}", client))
+
+    def test_hit_stay_bet_storm(self):
+        rng = random.Random(42)
+        # a test client is not thread-safe, so each one is driven by a single thread;
+        # seats of the same table land on different threads and race each other
+        chunks = [[] for _ in range(THREADS)]
+        for _ in range(EVENTS):
+            i = rng.randrange(len(self.seats))
+            chunks[i % THREADS].append((self.seats[i], rng.choice(("hit", "stay", "place_bet"))))
+
+        def worker(chunk):
+            for (table_id, client), action in chunk:
+                client.emit(action, {"table_id": table_id, "bet": 10})
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        print(f"\n{EVENTS} events across {TABLES} tables on {THREADS} threads: "
+              f"{EVENTS / elapsed:,.0f} events/sec")
+
+        last_seq = defaultdict(int)
+        for table_id, client in self.seats:
+            seqs = []
+            for packet in client.get_received():
+                if packet["name"] == "error_message":
+                    self.assertNotIn("Server error", packet["args"][0]["error"])
+                if packet["name"] == "game_state" or packet["name"] in DELTA_EVENTS:
+                    seqs.append(packet["args"][0]["seq"])
+            # every client sees its table's state in order, with no repeats
+            self.assertEqual(seqs, sorted(set(seqs)), table_id)
+            if seqs:
+                last_seq[table_id] = max(last_seq[table_id], seqs[-1])
+
+        for table_id, room in rooms.items():
+            self.assertEqual(room.seq, last_seq[table_id])
+            self.assertLessEqual(room.current_turn_index, len(room.turn_order))
+            self.assertEqual(set(room.by_sid.values()), set(room.seats.values()))
+            for seat in room.seats.values():
+                self.assertIs(players[seat.sid], seat)
+                self.assertEqual(seat.hand.score, calculate_score(list(seat.hand)))
+            if room.game_started:
+                self.assertEqual(len(room.dealer.hand), 2)
+
+
+class TestUnknownTables(AppTestCase):
+
+    def test_events_for_missing_tables_allocate_nothing(self):
+        client = self.client()
+        timers, chats, lobby = len(app_module.timers), len(app_module.chat), len(app_module.lobby)
+        for i in range(500):
+            client.emit("hit", {"table_id": f"missing-{i}"})
+            client.emit("stay", {"table_id": f"missing-{i}"})
+            client.emit("place_bet", {"table_id": f"missing-{i}", "bet": 10})
+            client.emit("resync", {"table_id": f"gone-{i}"})
+            client.emit("chat_message", {"table_id": f"gone-{i}", "message": "hi"})
+        self.assertEqual((rooms, players), ({}, {}))
+        self.assertEqual(app_module.lifecycle.stats["created"], 0)
+        self.assertEqual((len(app_module.timers), len(app_module.chat), len(app_module.lobby)), (timers, chats, lobby))
+
+
+class TestDelayedFlush(AppTestCase):
+
+    def test_snapshot_waits_for_the_table_lock(self):
+        self.client().emit("join", {"table_id": "t1", "playerId": "p1", "username": "ann"})
+        states = []
+        with app_module.table_locks("t1"):
+            flush = threading.Thread(target=lambda: states.append(app_module.locked_state("t1")))
+            flush.start()
+            flush.join(0.2)
+            self.assertEqual(states, [])
+        flush.join()
+        self.assertEqual(list(states[0].data["players"]), ["p1"])
+        self.assertIsNone(app_module.locked_state("gone"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#//backend/test_deck_client.py
+
+import unittest
+from deck_client import CircuitBreaker, CircuitOpen, DeckClient, PrefetchDeck
+from deck_stub import DeckStub
+from test_support import FakeClock
+
+
+def run_now(fn):
+    fn()
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold_and_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=2, reset_after=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.failures, 0)
+
+
+class TestDeckClient(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = DeckStub().__enter__()
+        self.client = DeckClient(self.stub.base_url, timeout=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.__exit__(None, None, None)
+
+    def test_new_deck_and_draw(self):
+        deck_id = self.client.new_deck(2)
+        cards = self.client.draw(deck_id, 5)
+        self.assertEqual(len(cards), 5)
+        self.assertEqual(set(cards[0]), {"value", "suit", "code", "image"})
+
+    def test_prefetch_serves_draws_from_memory(self):
+        deck = PrefetchDeck(self.client, decks=1, batch=20, low_water=5, spawn=run_now)
+        self.assertEqual(len(deck.buffer), 20)
+        requests_before = self.stub.requests
+        for _ in range(15):
+            deck.draw_card()
+        # no request until the buffer dips below the watermark
+        self.assertEqual(self.stub.requests, requests_before)
+        deck.draw_card()
+        self.assertEqual(self.stub.requests, requests_before + 1)
+        self.assertEqual(len(deck.buffer), 24)
+        self.assertEqual(deck.fallback_draws, 0)
+
+    def test_replaces_exhausted_api_deck(self):
+        deck = PrefetchDeck(self.client, decks=1, batch=52, low_water=1, spawn=run_now)
+        codes = [deck.draw_card()["code"] for _ in range(60)]
+        self.assertEqual(len(set(codes[:52])), 52)
+        self.assertEqual(deck.fallback_draws, 0)
+
+    def test_breaker_switches_to_local_shoe(self):
+        self.stub.set_failing()
+        deck = PrefetchDeck(self.client, decks=1, batch=10, low_water=5, spawn=run_now)
+        for _ in range(5):
+            self.assertIsNotNone(deck.draw_card())
+        self.assertTrue(self.client.breaker.is_open)
+        failed_requests = self.stub.requests
+        for _ in range(20):
+            deck.draw_card()
+        # open breaker: no more requests, every card comes from the fallback shoe
+        self.assertEqual(self.stub.requests, failed_requests)
+        self.assertEqual(deck.fallback_draws, 25)
+        with self.assertRaises(CircuitOpen):
+            self.client.new_deck()
+        stats = self.client.stats
+        self.assertEqual((stats["error"], stats["ok"], stats["fallback_cards"]), (3, 0, 25))
+        self.assertGreaterEqual(stats["circuit_open"], 1)
+
+    def test_deal_round_and_undraw(self):
+        deck = PrefetchDeck(self.client, decks=1, batch=52, low_water=1, spawn=run_now)
+        hands, dealer = deck.deal_round(3)
+        self.assertEqual([len(h) for h in hands], [2, 2, 2])
+        drawn = deck.draw(2)
+        deck.undraw(drawn)
+        self.assertEqual(deck.draw(2), drawn)
+
+
+if __name__ == '__main__':
+    unittest.main()
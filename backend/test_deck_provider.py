@@ -0,0 +1,119 @@
+#//backend/test_deck_provider.py
+
+import unittest
+from cards import Card
+from deck_client import DeckClient, PrefetchDeck
+from deck_provider import DeckProvider, RecordedDeck
+from deck_stub import DeckStub
+from shoe import Shoe, SeededShoe
+
+
+class ProviderContract:
+    """Checks every DeckProvider backend must pass; mixed into one TestCase per backend."""
+
+    def make(self):
+        raise NotImplementedError
+
+    def test_bulk_draw(self):
+        deck = self.make()
+        self.assertIsInstance(deck, DeckProvider)
+        before = deck.remaining()
+        cards = deck.draw(5)
+        self.assertEqual(len(cards), 5)
+        self.assertTrue(all(isinstance(c, Card) for c in cards))
+        self.assertEqual(deck.remaining(), before - 5)
+
+    def test_undraw(self):
+        deck = self.make()
+        cards = deck.draw(3)
+        deck.undraw(cards)
+        self.assertEqual(deck.draw(3), cards)
+
+    def test_deal_round(self):
+        hands, dealer = self.make().deal_round(7)
+        self.assertEqual(len(hands), 7)
+        self.assertEqual(len(dealer), 2)
+
+    def test_reshuffle(self):
+        deck = self.make()
+        deck.draw(10)
+        deck.reshuffle()
+        self.assertIsInstance(deck.draw_card(), Card)
+
+
+class TestShoe(ProviderContract, unittest.TestCase):
+    def make(self):
+        return Shoe(2)
+
+
+class TestSeededShoe(ProviderContract, unittest.TestCase):
+    def make(self):
+        return SeededShoe(11, 2)
+
+    def test_same_seed_same_cards(self):
+        a, b = SeededShoe(5), SeededShoe(5)
+        self.assertEqual(a.draw(50), b.draw(50))
+        a.reshuffle()
+        b.reshuffle()
+        self.assertEqual(a.draw(50), b.draw(50))
+        self.assertNotEqual(SeededShoe(6).draw(20), SeededShoe(5).draw(20))
+
+
+class TestRecordedDeck(ProviderContract, unittest.TestCase):
+    def make(self):
+        return RecordedDeck(range(52))
+
+    def test_replays_in_order_and_loops(self):
+        deck = RecordedDeck.from_codes(["AS", "0H", "KD"])
+        self.assertEqual([c["code"] for c in deck.draw(5)], ["AS", "0H", "KD", "AS", "0H"])
+        deck.reshuffle()
+        self.assertEqual(deck.draw_card()["code"], "AS")
+
+    def test_rejects_empty_and_unknown_codes(self):
+        with self.assertRaises(ValueError):
+            RecordedDeck([])
+        with self.assertRaises(KeyError):
+            RecordedDeck.from_codes(["ZZ"])
+
+
+class TestPrefetchDeck(ProviderContract, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = DeckStub().__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.__exit__(None, None, None)
+
+    def make(self):
+        client = DeckClient(self.stub.base_url, timeout=2)
+        self.addCleanup(client.close)
+        return PrefetchDeck(client, decks=1, batch=52, low_water=1, spawn=lambda fn: fn())
+
+
+class TestRoomDeckConfig(unittest.TestCase):
+
+    def setUp(self):
+        from app import app, rooms
+        self.client = app.test_client()
+        self.rooms = rooms
+
+    def test_create_room_with_recorded_deck(self):
+        resp = self.client.post("/create-room", json={"deck": {"source": "recorded", "codes": ["AS", "KD"]}})
+        self.assertEqual(resp.status_code, 200)
+        deck = self.rooms[resp.get_json()["table_id"]].deck
+        self.assertIsInstance(deck, RecordedDeck)
+
+    def test_create_room_with_seeded_deck(self):
+        resp = self.client.post("/create-room", json={"deck": {"source": "seeded", "seed": 3, "decks": 1}})
+        deck = self.rooms[resp.get_json()["table_id"]].deck
+        self.assertEqual((deck.seed, len(deck)), (3, 52))
+
+    def test_create_room_rejects_bad_config(self):
+        resp = self.client.post("/create-room", json={"deck": {"source": "tarot"}})
+        self.assertEqual(resp.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
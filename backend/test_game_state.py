@@ -0,0 +1,77 @@
+#//backend/test_game_state.py
+
+import json
+import random
+import unittest
+import game_state
+from app import rooms
+from hand import Hand
+from shoe import Shoe
+from tables import Table, DealerState
+from test_support import AppTestCase
+
+
+def make_room():
+    shoe = Shoe(decks=1, rng=random.Random(3))
+    hands, dealer = shoe.deal_round(2)
+    room = Table("t1", shoe)
+    for (player_id, username, sid), cards in zip((("p1", "ann", "s1"), ("p2", "bob", "s2")), hands):
+        room.add_seat(player_id, username, sid).hand = Hand(cards)
+    room.dealer = DealerState(Hand(dealer))
+    room.game_started = True
+    return room
+
+
+class TestGameState(unittest.TestCase):
+
+    def test_deltas_are_sequenced(self):
+        room = make_room()
+        seqs = [
+            game_state.round_started(room)["seq"],
+            game_state.card_dealt(room, "p1", room.deck.draw_card(), 12)["seq"],
+            game_state.turn_changed(room)["seq"],
+        ]
+        self.assertEqual(seqs, [1, 2, 3])
+        self.assertEqual(game_state.build_state(room)["seq"], 3)
+        # snapshots never advance the sequence
+        self.assertEqual(game_state.build_state(room)["seq"], 3)
+
+    def test_dealer_hole_card_hidden_during_round(self):
+        room = make_room()
+        dealer = game_state.build_state(room)["dealer"]
+        self.assertEqual(dealer["score"], "?")
+        self.assertTrue(dealer["hand"][1]["hidden"])
+        room.game_started = False
+        over = game_state.round_over(room, {"p1": "Win", "p2": "Lose (bust)"})
+        self.assertEqual(over["results"]["p2"], "Lose (bust)")
+        self.assertEqual(over["dealer"]["hand"], room.dealer.hand)
+        self.assertEqual(over["dealer"]["score"], room.dealer.hand.score)
+
+    def test_turn(self):
+        room = make_room()
+        self.assertEqual(game_state.turn_changed(room)["turn"], "p1")
+        room.current_turn_index = 2
+        self.assertIsNone(game_state.current_turn(room))
+
+    def test_card_delta_is_small(self):
+        room = make_room()
+        delta = game_state.card_dealt(room, "p1", room.deck.draw_card(), 15)
+        snapshot = game_state.build_state(room)
+        self.assertLess(len(json.dumps(delta)), len(json.dumps(snapshot)) / 3)
+
+
+class TestAppRoundOver(AppTestCase):
+
+    def test_results_survive_coalescing(self):
+        client = self.client()
+        client.emit("join", {"table_id": "t1", "playerId": "p1", "username": "ann"})
+        rooms["t1"].seats["p1"].hand = Hand([{"value": "KING", "suit": "HEARTS"}, {"value": "QUEEN", "suit": "CLUBS"}])
+        client.get_received()
+        # the bust's card_dealt and round_over leave in one batch and merge into a snapshot
+        client.emit("hit", {"table_id": "t1"})
+        [state] = [p["args"][0] for p in client.get_received() if p["name"] == "game_state"]
+        self.assertEqual(state["players"]["p1"]["result"], "Lose (bust)")
+
+
+if __name__ == '__main__':
+    unittest.main()
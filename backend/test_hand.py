@@ -0,0 +1,68 @@
+#//backend/test_hand.py
+
+import json
+import pickle
+import random
+import unittest
+from cards import CARDS, CODE_TO_INDEX
+from hand import Hand, calculate_score
+
+
+def cards(*codes):
+    return [CARDS[CODE_TO_INDEX[c]] for c in codes]
+
+
+class TestHand(unittest.TestCase):
+
+    def test_matches_calculate_score(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            dealt = [rng.choice(CARDS) for _ in range(rng.randint(0, 6))]
+            hand = Hand()
+            for card in dealt:
+                hand.append(card)
+                self.assertEqual(hand.score, calculate_score(list(hand)))
+
+    def test_plain_dict_cards(self):
+        hand = Hand([{"value": "ACE"}, {"value": "9"}])
+        self.assertEqual(hand.score, 20)
+        self.assertTrue(hand.soft)
+
+    def test_soft_and_hard(self):
+        hand = Hand(cards("AS", "6H"))
+        self.assertTrue(hand.soft)
+        self.assertTrue(hand.is_soft_17)
+        hand.append(CARDS[CODE_TO_INDEX["KD"]])
+        self.assertFalse(hand.soft)
+        self.assertEqual(hand.score, 17)
+        self.assertFalse(hand.is_soft_17)
+
+    def test_blackjack_and_bust(self):
+        self.assertTrue(Hand(cards("AS", "KH")).is_blackjack)
+        self.assertFalse(Hand(cards("7S", "7H", "7D")).is_blackjack)
+        bust = Hand(cards("KS", "QH", "2D"))
+        self.assertTrue(bust.is_bust)
+        self.assertEqual(bust.score, 22)
+
+    def test_multiple_aces(self):
+        self.assertEqual(Hand(cards("AS", "AD", "9H")).score, 21)
+
+    def test_removal_recounts(self):
+        hand = Hand(cards("AS", "KH", "5D"))
+        hand.pop()
+        self.assertEqual(hand.score, 21)
+        del hand[0]
+        self.assertEqual(hand.score, 10)
+        hand.clear()
+        self.assertEqual(hand.score, 0)
+
+    def test_serializes_like_a_list(self):
+        hand = Hand(cards("AS", "KH"))
+        self.assertEqual(json.dumps(hand), json.dumps(list(hand)))
+        restored = pickle.loads(pickle.dumps(hand))
+        self.assertIsInstance(restored, Hand)
+        self.assertEqual(restored.score, 21)
+
+
+if __name__ == '__main__':
+    unittest.main()
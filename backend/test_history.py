@@ -0,0 +1,134 @@
+#//backend/test_history.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import app as app_module
+from app import app, socketio, rooms, players
+from cards import CODE_TO_INDEX, CARDS
+from hand import Hand
+from history import RoundLog, History, RoundIndex, read_records, index_path, segment_paths, HEADER
+
+
+def hand(*codes):
+    return Hand(CARDS[CODE_TO_INDEX[code]] for code in codes)
+
+
+class TestRoundLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def play(self, log, table_id, round_no, outcome="Win"):
+        log.bet(table_id, round_no, "p1", 10)
+        log.deal(table_id, round_no, [("p1", 10, hand("0H", "6S"))], hand("9C", "8D"))
+        log.hit(table_id, round_no, "p1", CARDS[CODE_TO_INDEX["3C"]])
+        log.stay(table_id, round_no, "p1")
+        log.result(table_id, round_no, hand("9C", "8D"), [("p1", outcome)])
+
+    def test_round_trip_from_the_open_segment(self):
+        log = RoundLog(self.dir)
+        self.play(log, "t1", 1)
+        self.play(log, "t2", 1)
+        self.play(log, "t1", 2, outcome="Lose")
+        log.flush()
+
+        got = list(History(self.dir).rounds("t1"))
+        self.assertEqual([r.round for r in got], [1, 2])
+        first = got[0].view()
+        self.assertTrue(first["complete"])
+        self.assertEqual(first["dealer"], ["9C", "8D"])
+        self.assertEqual(first["seats"]["p1"], {"bet": 10.0, "cards": ["0H", "6S", "3C"],
+                                               "actions": [["hit", "3C"], ["stay"]], "outcome": "Win"})
+        self.assertEqual(got[0].replay()["p1"], {"score": 19, "outcome": "Win", "net": 10.0})
+        self.assertEqual(got[0].mismatches(), [])
+        self.assertEqual(got[1].mismatches(), ["p1"])
+        log.close()
+
+    def test_sealed_segments_are_read_through_the_index(self):
+        log = RoundLog(self.dir, segment_bytes=200, flush_bytes=100)
+        for round_no in range(1, 6):
+            self.play(log, "t1", round_no)
+            self.play(log, "t2", round_no)
+        log.close()
+
+        paths = segment_paths(self.dir)
+        self.assertGreater(len(paths), 1)
+        self.assertTrue(all(os.path.exists(index_path(path)) for path in paths))
+        index = RoundIndex(index_path(paths[0]))
+        self.assertEqual([r for r, _ in index.lookup("t2")], [1])
+        self.assertEqual(index.lookup("nobody"), [])
+        index.close()
+
+        self.assertEqual([r.round for r in History(self.dir).rounds("t2")], [1, 2, 3, 4, 5])
+        [three] = History(self.dir).rounds("t1", 3)
+        self.assertEqual((three.round, three.complete, three.outcomes), (3, True, {"p1": "Win"}))
+
+    def test_restart_indexes_a_crashed_segment_and_skips_a_torn_record(self):
+        log = RoundLog(self.dir)
+        self.play(log, "t1", 1)
+        log.flush()
+        path = log.path
+        with open(path, "ab") as f:
+            f.write(b"\x01\x20")     # half a record header
+        log.closed = True            # simulate the process dying
+
+        RoundLog(self.dir).close()
+        self.assertTrue(os.path.exists(index_path(path)))
+        self.assertEqual(sum(1 for _ in read_records(path)), 7)    # 2 names and 5 events
+        [round_one] = History(self.dir).rounds("t1")
+        self.assertTrue(round_one.complete)
+
+    def test_buffer_is_written_in_batches(self):
+        log = RoundLog(self.dir, flush_bytes=1 << 20)
+        self.play(log, "t1", 1)
+        self.assertEqual(os.path.getsize(log.path), HEADER.size)
+        log.flush(fsync=True)
+        self.assertGreater(os.path.getsize(log.path), HEADER.size)
+        self.assertEqual((log.stats["writes"], log.stats["fsyncs"]), (1, 1))
+        log.close()
+
+
+class TestAppHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        rooms.clear()
+        players.clear()
+        log = RoundLog(self.dir)
+        for name, value in (("history", log), ("HISTORY_DIR", self.dir)):
+            patcher = mock.patch.object(app_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(log.close)
+
+    def test_rounds_are_recorded_and_served(self):
+        client = socketio.test_client(app)
+        client.emit("join", {"table_id": "hist", "playerId": "p1", "username": "a"})
+        client.emit("stay", {"table_id": "hist"})                      # a single seat is dealt in on join
+        client.emit("place_bet", {"table_id": "hist", "bet": 25})     # and again once it bets
+        client.emit("stay", {"table_id": "hist"})
+        overs = [p["args"][0] for p in client.get_received() if p["name"] == "round_over"]
+        client.disconnect()
+
+        response = app.test_client().get("/history/hist")
+        self.assertEqual([r["round"] for r in response.get_json()["rounds"]], [1, 2])
+        played = app.test_client().get("/history/hist?round=2").get_json()["rounds"][0]
+        self.assertEqual((played["round"], played["complete"], played["mismatches"]), (2, True, []))
+        seat = played["seats"]["p1"]
+        self.assertEqual((seat["bet"], len(seat["cards"]), seat["actions"]), (25.0, 2, [["stay"]]))
+        self.assertIn(seat["outcome"], ("Win", "Push", "Lose"))
+        self.assertGreaterEqual(len(played["dealer"]), 2)
+        # round_over carries the same results the log recorded
+        self.assertEqual(overs[-1]["results"], {"p1": seat["outcome"]})
+
+        self.assertEqual(len(app.test_client().get("/history/hist?limit=-1").get_json()["rounds"]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+#//backend/test_lifecycle.py
+
+import threading
+import unittest
+
+from app import app, rooms, players, table_locks, evict_table
+from lifecycle import TableLifecycle, TokenBucket, table_size
+from shoe import Shoe
+from tables import Table
+from test_support import AppTestCase, FakeClock
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=2, burst=3, now=0)
+        self.assertEqual([bucket.take(0) for _ in range(4)], [True, True, True, False])
+        self.assertTrue(bucket.take(0.5))
+        self.assertFalse(bucket.take(0.5))
+        # refills never go past the burst
+        self.assertEqual(sum(bucket.take(100) for _ in range(5)), 3)
+
+
+class TestTableLifecycle(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.life = TableLifecycle(max_tables=4, max_per_client=2, idle_ttl=100, empty_ttl=10,
+                                   create_rate=1, create_burst=3, clock=self.clock)
+
+    def test_per_client_cap_evicts_least_recently_used(self):
+        self.assertEqual(self.life.created("a", "c1"), [])
+        self.assertEqual(self.life.created("b", "c1"), [])
+        self.life.touch("a", 1)
+        self.assertEqual(self.life.created("c", "c1"), ["b"])
+
+    def test_global_cap_evicts_least_recently_used(self):
+        for i, table_id in enumerate("abcd"):
+            self.life.created(table_id, f"c{i}")
+        self.life.touch("a", 1)
+        self.assertEqual(self.life.created("e", "c9"), ["b"])
+        self.life.forget("b", "cap")
+        self.assertEqual(len(self.life), 4)
+
+    def test_caps_combined(self):
+        for table_id, client in (("a", "c1"), ("b", "c2"), ("c", "c1"), ("d", "c2")):
+            self.life.created(table_id, client)
+        # c1's oldest table also brings the total back under the cap
+        self.assertEqual(self.life.created("e", "c1"), ["a"])
+
+    def test_rate_limit(self):
+        self.assertEqual([self.life.allow_create("c1") for _ in range(4)], [True, True, True, False])
+        self.assertTrue(self.life.allow_create("c2"))
+        self.clock.now = 1
+        self.assertTrue(self.life.allow_create("c1"))
+        self.assertEqual(self.life.stats["creates_rate_limited"], 1)
+        # the reaper forgets buckets once they have refilled
+        self.clock.now = 3
+        self.life.expired()
+        self.assertEqual(list(self.life._buckets), ["c1"])
+        self.clock.now = 5
+        self.life.expired()
+        self.assertEqual(self.life._buckets, {})
+
+    def test_expired(self):
+        self.life.created("empty", "c1")
+        self.life.created("busy", "c1")
+        self.life.touch("busy", 2)
+        self.clock.now = 50
+        self.assertEqual(self.life.expired(), [("empty", "empty")])
+        self.clock.now = 120
+        self.assertEqual(self.life.expired(), [("empty", "empty"), ("busy", "idle")])
+        self.life.touch("busy", 2)
+        self.assertEqual(self.life.expired(), [("empty", "empty")])
+
+    def test_seats_leaving_restarts_empty_timer(self):
+        self.life.created("t", "c1")
+        self.life.touch("t", 1)
+        self.clock.now = 50
+        self.life.touch("t", 0)
+        self.clock.now = 55
+        self.assertEqual(self.life.expired(), [])
+        self.clock.now = 60
+        self.assertEqual(self.life.expired(), [("t", "empty")])
+
+    def test_forget_counts_once(self):
+        self.life.created("t", "c1")
+        self.life.forget("t", "idle", 500)
+        self.life.forget("t", "idle", 500)
+        self.assertEqual((self.life.stats["evicted_idle"], self.life.stats["reclaimed_bytes"]), (1, 500))
+        self.assertEqual(self.life.expired(), [])
+
+    def test_table_size_grows_with_seats(self):
+        table = Table("t", Shoe(1))
+        empty = table_size(table)
+        table.add_seat("p1", "ann", "s1")
+        self.assertGreater(table_size(table), empty)
+
+
+class TestEviction(AppTestCase):
+
+    def patches(self):
+        self.life = TableLifecycle(max_tables=2, max_per_client=10, create_burst=10)
+        return {"lifecycle": self.life}
+
+    def join(self, table_id, player_id):
+        client = self.client()
+        client.emit("join", {"table_id": table_id, "playerId": player_id, "username": player_id})
+        client.get_received()
+        return client
+
+    def test_cap_evicts_oldest_table(self):
+        first = self.join("t1", "p1")
+        self.join("t2", "p2")
+        self.join("t3", "p3")
+        self.assertEqual(sorted(rooms), ["t2", "t3"])
+        self.assertEqual({seat.player_id for seat in players.values()}, {"p2", "p3"})
+        received = first.get_received()
+        self.assertEqual([p["name"] for p in received], ["room_not_found"])
+        self.assertEqual(received[0]["args"][0]["reason"], "cap")
+        # the evicted player's actions no longer reach a table
+        first.emit("hit", {"table_id": "t1"})
+        self.assertNotIn("t1", rooms)
+
+    def test_busy_table_is_skipped(self):
+        self.join("t1", "p1")
+        lock = table_locks("t1")
+        lock.acquire()
+        try:
+            result = []
+            worker = threading.Thread(target=lambda: result.append(evict_table("t1", "idle")))
+            worker.start()
+            worker.join()
+        finally:
+            lock.release()
+        self.assertEqual(result, [False])
+        self.assertIn("t1", rooms)
+
+    def test_table_stats(self):
+        self.join("t1", "p1")
+        self.assertTrue(evict_table("t1", "idle"))
+        stats = app.test_client().get("/table-stats").get_json()
+        self.assertEqual((stats["tables"], stats["players"]), (0, 0))
+        self.assertEqual((stats["created"], stats["evicted_idle"]), (1, 1))
+        self.assertGreater(stats["reclaimed_bytes"], 0)
+
+    def test_create_room_rate_limited(self):
+        self.life.create_burst = 1
+        client = app.test_client()
+        self.assertEqual(client.post("/create-room", json={}).status_code, 200)
+        self.assertEqual(client.post("/create-room", json={}).status_code, 429)
+
+    def test_invalid_create_room_spends_no_token(self):
+        self.life.create_burst = 1
+        client = app.test_client()
+        for deck in ({"source": "nope"}, {"decks": 0}, {"source": "recorded", "codes": ["ZZ"]}):
+            self.assertEqual(client.post("/create-room", json={"deck": deck}).status_code, 400)
+        self.assertEqual(client.post("/create-room", json={"stakes": -1}).status_code, 400)
+        self.assertEqual(client.post("/create-room", json={}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
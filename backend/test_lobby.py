@@ -0,0 +1,125 @@
+#//backend/test_lobby.py
+
+import unittest
+
+import app as app_module
+from app import app, rooms
+from lobby import Lobby
+from test_support import AppTestCase
+
+
+class TestLobby(unittest.TestCase):
+
+    def setUp(self):
+        self.lobby = Lobby(seats=3)
+
+    def test_quick_join_picks_the_fullest_open_table(self):
+        self.lobby.update("empty", 0)
+        self.lobby.update("two", 2)
+        self.lobby.update("full", 3)
+        self.lobby.update("one", 1)
+        self.assertEqual(self.lobby.quick_join(), "two")
+        self.lobby.update("two", 3)
+        self.assertEqual(self.lobby.quick_join(), "one")
+
+    def test_quick_join_prefers_tables_between_rounds_and_filters_stakes(self):
+        self.lobby.update("playing", 2, phase="playing")
+        self.lobby.update("betting", 1)
+        self.lobby.update("high", 2, stakes=100)
+        self.assertEqual(self.lobby.quick_join(stakes=0), "betting")
+        self.assertEqual(self.lobby.quick_join(), "high")
+        self.assertEqual(self.lobby.quick_join(stakes=100), "high")
+        self.assertIsNone(self.lobby.quick_join(stakes=5))
+        self.lobby.update("betting", 3)
+        self.assertEqual(self.lobby.quick_join(stakes=0), "playing")
+
+    def test_pages_follow_the_cursor(self):
+        for i in range(10):
+            self.lobby.update(f"t{i}", i % 3)
+        seen, cursor = [], None
+        while True:
+            rows, cursor = self.lobby.page(cursor=cursor, limit=4)
+            seen += [row["table_id"] for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["t2", "t5", "t8", "t1", "t4", "t7", "t0", "t3", "t6", "t9"])
+        rows, _ = self.lobby.page(phase="playing")
+        self.assertEqual(rows, [])
+
+    def test_diffs_keep_the_latest_row_per_table(self):
+        self.lobby.update("a", 1)
+        self.lobby.update("a", 2)
+        self.lobby.update("b", 1)
+        self.lobby.update("b", 1)
+        diff = self.lobby.drain()
+        self.assertEqual([(row["table_id"], row["seated"], row["free"]) for row in diff["changed"]],
+                         [("a", 2, 1), ("b", 1, 2)])
+        self.assertIsNone(self.lobby.drain())
+        self.lobby.update("a", 3)
+        self.lobby.remove("b")
+        self.assertEqual(self.lobby.drain(), {"changed": [{"table_id": "a", "seated": 3, "free": 0, "stakes": 0,
+                                                           "phase": "betting"}], "removed": ["b"]})
+        self.assertEqual(len(self.lobby), 1)
+
+
+class TestAppLobby(AppTestCase):
+
+    def patches(self):
+        return {**super().patches(), "lobby": Lobby(seats=2), "TABLE_SEATS": 2}
+
+    def test_quick_join_fills_tables_in_turn(self):
+        for i in range(3):
+            self.client().emit("quick_join", {"playerId": f"p{i}", "username": f"u{i}"})
+        seated = sorted(len(room.seats) for room in rooms.values())
+        self.assertEqual(seated, [1, 2])
+
+        tables = app.test_client().get("/tables").get_json()
+        self.assertEqual(tables["total"], 2)
+        [open_table] = tables["tables"]
+        self.assertEqual((open_table["seated"], open_table["free"]), (1, 1))
+
+        self.clients[0].disconnect()
+        self.clients.pop(0)
+        self.assertEqual(len(app.test_client().get("/tables").get_json()["tables"]), 2)
+
+    def test_full_table_refuses_a_new_player(self):
+        for i in range(2):
+            self.client().emit("join", {"table_id": "small", "playerId": f"p{i}", "username": f"u{i}"})
+        late = self.client()
+        late.emit("join", {"table_id": "small", "playerId": "p9", "username": "late"})
+        errors = [p["args"][0]["error"] for p in late.get_received() if p["name"] == "error_message"]
+        self.assertEqual(errors, ["Table is full"])
+        self.assertEqual(len(rooms["small"].seats), 2)
+
+    def test_stakes_set_the_minimum_bet(self):
+        table_id = app.test_client().post("/create-room", json={"stakes": 25}).get_json()["table_id"]
+        [row] = app.test_client().get("/tables?stakes=25").get_json()["tables"]
+        self.assertEqual((row["table_id"], row["stakes"]), (table_id, 25))
+        self.assertEqual(app.test_client().post("/create-room", json={"stakes": -1}).status_code, 400)
+
+        a, b = self.client(), self.client()
+        a.emit("join", {"table_id": table_id, "playerId": "pa", "username": "a"})
+        a.emit("stay", {"table_id": table_id})                # ends the solo round dealt on join
+        b.emit("join", {"table_id": table_id, "playerId": "pb", "username": "b"})
+        b.emit("place_bet", {"table_id": table_id, "bet": 10})
+        self.assertIsNone(rooms[table_id].seats["pb"].pending_bet)
+        b.emit("place_bet", {"table_id": table_id, "bet": 25})
+        self.assertEqual(rooms[table_id].seats["pb"].pending_bet, 25)
+
+    def test_subscribers_get_a_page_then_diffs(self):
+        watcher = self.client()
+        watcher.emit("lobby_subscribe")
+        [tables] = [p["args"][0] for p in watcher.get_received() if p["name"] == "lobby_tables"]
+        self.assertEqual(tables["tables"], [])
+        self.client().emit("join", {"table_id": "t1", "playerId": "p1", "username": "u1"})
+        self.client().emit("join", {"table_id": "t1", "playerId": "p2", "username": "u2"})
+        app_module.publish_lobby_diff()
+        app_module.publish_lobby_diff()
+        updates = [p["args"][0] for p in watcher.get_received() if p["name"] == "lobby_update"]
+        self.assertEqual(len(updates), 1)
+        [row] = updates[0]["changed"]
+        self.assertEqual((row["table_id"], row["seated"], row["phase"]), ("t1", 2, "playing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#//backend/test_logs.py
+
+import io
+import json
+import unittest
+
+import logs
+from logs import TableSampler, table_sampled
+
+
+class TestLogs(unittest.TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+        self.log = logs.get_logger("test")
+
+    def tearDown(self):
+        logs.setup("OFF")
+
+    def lines(self):
+        logs.flush()
+        return [json.loads(line) for line in self.out.getvalue().splitlines()]
+
+    def test_json_lines_with_fields(self):
+        logs.setup("INFO", stream=self.out)
+        self.log.info("player joined", table_id="t1", player_id="p1")
+        self.log.debug("not at info")
+        [line] = self.lines()
+        self.assertEqual((line["level"], line["logger"], line["msg"]), ("INFO", "blackjack.test", "player joined"))
+        self.assertEqual((line["table_id"], line["player_id"]), ("t1", "p1"))
+
+    def test_lazy_fields(self):
+        calls = []
+        logs.setup("INFO", stream=self.out)
+        self.log.debug("skipped", seats=lambda: calls.append(1))
+        self.assertEqual(calls, [])
+        logs.setup("DEBUG", stream=self.out)
+        self.log.debug("built", seats=lambda: calls.append(1) or ["p1"])
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.lines()[0]["seats"], ["p1"])
+
+    def test_off(self):
+        calls = []
+        logs.setup("OFF")
+        self.log.error("nothing", seats=lambda: calls.append(1))
+        self.assertEqual(calls, [])
+
+    def test_exception(self):
+        logs.setup("INFO", stream=self.out)
+        try:
+            raise KeyError("deck")
+        except KeyError:
+            self.log.exception("hit failed", table_id="t1")
+        [line] = self.lines()
+        self.assertEqual(line["level"], "ERROR")
+        self.assertIn("KeyError", line["exc"])
+
+    def test_sampling_is_per_table(self):
+        kept = [t for t in range(1000) if table_sampled(f"t{t}", 0.1)]
+        self.assertTrue(50 < len(kept) < 150)
+        self.assertEqual(kept, [t for t in range(1000) if table_sampled(f"t{t}", 0.1)])
+
+        logs.setup("DEBUG", stream=self.out, sample=0.1)
+        inside, outside = f"t{kept[0]}", next(f"t{t}" for t in range(1000) if t not in kept)
+        for table_id in (inside, outside):
+            self.log.debug("hit", table_id=table_id)
+            self.log.warning("deck low", table_id=table_id)
+        self.log.info("no table")
+        got = [(line["msg"], line.get("table_id")) for line in self.lines()]
+        self.assertEqual(got, [("hit", inside), ("deck low", inside), ("deck low", outside), ("no table", None)])
+
+    def test_sampler_passes_everything_at_full_rate(self):
+        record = logs.logging.LogRecord("x", logs.logging.DEBUG, "", 0, "m", None, None)
+        record.fields = {"table_id": "t1"}
+        self.assertTrue(TableSampler(1.0).filter(record))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#//backend/test_metrics.py
+
+import threading
+import unittest
+from unittest import mock
+
+import app as app_module
+import encoded
+import profiler
+from app import app, socketio, rooms, players
+from metrics import Metrics, ByteCountingJson
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_text(self):
+        metrics = Metrics()
+        latency = metrics.histogram("handler_seconds", "Handler latency", label="handler",
+                                    buckets=(0.001, 0.01))
+        for value in (0.0005, 0.005, 0.005, 2.0):
+            latency.observe(value, "hit")
+        text = metrics.render()
+        self.assertIn("# TYPE blackjack_handler_seconds histogram", text)
+        self.assertIn('blackjack_handler_seconds_bucket{handler="hit",le="0.001"} 1', text)
+        self.assertIn('blackjack_handler_seconds_bucket{handler="hit",le="0.01"} 3', text)
+        self.assertIn('blackjack_handler_seconds_bucket{handler="hit",le="+Inf"} 4', text)
+        self.assertIn('blackjack_handler_seconds_count{handler="hit"} 4', text)
+        self.assertIn('blackjack_handler_seconds_sum{handler="hit"} 2.0105', text)
+
+    def test_collected_metrics(self):
+        metrics = Metrics()
+        counts = {"game_state": 2, 'we"ird': 1}
+        metrics.counter("emits_total", "Emits", lambda: counts, "event")
+        metrics.gauge("tables", "Tables", lambda: 7)
+        text = metrics.render()
+        self.assertIn('blackjack_emits_total{event="game_state"} 2', text)
+        self.assertIn('blackjack_emits_total{event="we\\"ird"} 1', text)
+        self.assertIn("# TYPE blackjack_tables gauge\nblackjack_tables 7\n", text)
+
+    def test_timed(self):
+        metrics = Metrics()
+        latency = metrics.histogram("step_seconds", "Step latency", label="step")
+
+        @metrics.timed(latency, "boom")
+        def boom():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            boom()
+        self.assertIn('blackjack_step_seconds_count{step="boom"} 1', metrics.render())
+
+    def test_disabled_is_free(self):
+        metrics = Metrics(enabled=False)
+        latency = metrics.histogram("step_seconds", "Step latency")
+
+        def step():
+            return 1
+
+        self.assertIs(metrics.timed(latency)(step), step)
+        self.assertEqual(metrics.render(), "")
+
+    def test_byte_counting_json(self):
+        counting = ByteCountingJson(encoded)
+        text = counting.dumps({"a": 1})
+        self.assertEqual((counting.packets, counting.bytes), (1, len(text)))
+        self.assertEqual(counting.loads(text), {"a": 1})
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        rooms.clear()
+        players.clear()
+
+    def test_scrape_after_a_round(self):
+        client = socketio.test_client(app)
+        client.emit("join", {"table_id": "metrics-table", "playerId": "p1", "username": "ann"})
+        client.emit("stay", {"table_id": "metrics-table"})
+        resp = app.test_client().get("/metrics")
+        client.disconnect()
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.content_type.startswith("text/plain"))
+        text = resp.get_data(as_text=True)
+        for handler in ("join", "stay", "emit_game_state"):
+            self.assertIn(f'blackjack_handler_seconds_count{{handler="{handler}"}}', text)
+        self.assertIn("blackjack_dealer_play_seconds_count", text)
+        self.assertIn("blackjack_tables 1", text)
+        self.assertIn('blackjack_emits_total{event="round_over"}', text)
+        self.assertIn("blackjack_emit_bytes_total", text)
+
+    def test_disconnect_is_handled_once(self):
+        def disconnects():
+            for line in app.test_client().get("/metrics").get_data(as_text=True).splitlines():
+                if line.startswith('blackjack_handler_seconds_count{handler="disconnect"}'):
+                    return float(line.split()[1])
+            return 0
+        before = disconnects()
+        socketio.test_client(app).disconnect()
+        self.assertEqual(disconnects() - before, 1)
+
+    def test_profiler_route_off_by_default(self):
+        self.assertEqual(app.test_client().get("/debug/profile?seconds=0").status_code, 404)
+
+    def test_profiler_route_rejects_bad_durations(self):
+        with mock.patch.object(app_module, "PROFILER", True):
+            for query in ("seconds=abc", "seconds=-1", "seconds=nan", "seconds=inf", "top=x", "top=0"):
+                self.assertEqual(app.test_client().get(f"/debug/profile?{query}").status_code, 400, query)
+            response = app.test_client().get("/debug/profile?seconds=0.05&top=3")
+            self.assertEqual(response.status_code, 200)
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_finds_busy_thread(self):
+        stop = threading.Event()
+
+        def spin():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=spin)
+        worker.start()
+        try:
+            stacks = profiler.sample(0.2, interval=0.002)
+        finally:
+            stop.set()
+            worker.join()
+        self.assertTrue(any(any(":spin:" in frame for frame in stack) for stack in stacks))
+        top = profiler.collapsed(stacks, top=1)
+        self.assertEqual(len(top.splitlines()), 1)
+        self.assertTrue(top.rstrip().split(" ")[-1].isdigit())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#//backend/test_outbox.py
+
+import threading
+import unittest
+from outbox import Outbox
+
+
+class TestOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = []
+        self.outbox = Outbox(
+            send=lambda event, payload, room, skip_sid: self.sent.append((event, room, skip_sid)),
+            snapshot=lambda table_id: {"seq": 9, "table": table_id},
+        )
+
+    def test_unbatched_emits_go_straight_out(self):
+        self.outbox.emit("chat_message", {}, "t1")
+        self.assertEqual(self.sent, [("chat_message", "t1", None)])
+
+    def test_single_delta_passes_through(self):
+        with self.outbox.batch():
+            self.outbox.emit("chat_message", {}, "t1")
+            self.outbox.emit("card_dealt", {"seq": 1}, "t1")
+        self.assertEqual([e for e, _, _ in self.sent], ["chat_message", "card_dealt"])
+
+    def test_state_events_merge_into_one_snapshot(self):
+        with self.outbox.batch():
+            self.outbox.emit("chat_message", {"n": 1}, "t1")
+            self.outbox.emit("joined_room", {}, "t1", to="sid-1")
+            self.outbox.emit("player_joined", {"seq": 1}, "t1", skip_sid="sid-1")
+            self.outbox.emit("game_state", {"seq": 1}, "t1", to="sid-1")
+            self.outbox.emit("chat_message", {"n": 2}, "t1")
+            self.outbox.emit("round_started", {"seq": 2}, "t1")
+            self.outbox.emit("chat_message", {"n": 3}, "t1")
+        self.assertEqual(self.sent, [
+            ("chat_message", "t1", None),
+            ("joined_room", "sid-1", None),
+            ("chat_message", "t1", None),
+            ("game_state", "t1", None),
+            ("chat_message", "t1", None),
+        ])
+        requested, sent = self.outbox.stats()
+        self.assertEqual(requested["chat_message"], 3)
+        self.assertEqual(sent["game_state"], 1)
+        self.assertNotIn("round_started", sent)
+
+    def test_tables_flush_separately(self):
+        with self.outbox.batch():
+            self.outbox.emit("turn_changed", {}, "t1")
+            self.outbox.emit("round_over", {}, "t1")
+            self.outbox.emit("turn_changed", {}, "t2")
+        self.assertEqual(self.sent, [("game_state", "t1", None), ("turn_changed", "t2", None)])
+
+    def test_nested_batches_flush_once(self):
+        with self.outbox.batch():
+            with self.outbox.batch():
+                self.outbox.emit("turn_changed", {}, "t1")
+            self.assertEqual(self.sent, [])
+            self.outbox.emit("round_over", {}, "t1")
+        self.assertEqual(self.sent, [("game_state", "t1", None)])
+
+    def test_window_coalesces_across_handlers(self):
+        spawned = []
+        outbox = Outbox(
+            send=lambda event, payload, room, skip_sid: self.sent.append((event, room, skip_sid)),
+            snapshot=lambda table_id: {"seq": 2},
+            window=0.05,
+            spawn=spawned.append,
+            sleep=lambda seconds: None,
+        )
+        with outbox.batch():
+            outbox.emit("card_dealt", {}, "t1")
+        with outbox.batch():
+            outbox.emit("turn_changed", {}, "t1")
+        self.assertEqual(len(spawned), 1)
+        self.assertEqual(self.sent, [])
+        spawned[0]()
+        self.assertEqual(self.sent, [("game_state", "t1", None)])
+
+    def test_counts_add_up_across_threads(self):
+        def worker():
+            for _ in range(2000):
+                self.outbox.emit("chat_message", {}, "t1")
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.outbox.stats(), ({"chat_message": 16000}, {"chat_message": 16000}))
+
+
+if __name__ == '__main__':
+    unittest.main()
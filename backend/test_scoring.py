@@ -1,20 +1,20 @@
 #/backend/test_scoring.py
 
 import unittest
-from app import calculate_score
+from hand import calculate_score
 
 class TestScoring(unittest.TestCase):
-    def test_blackjack(self)
-        hand = [{'rank': 'A', 'suit': '♠'}, {'rank': 'K', 'suit': '♥'}]
+    def test_blackjack(self):
+        hand = [{'value': 'ACE', 'suit': 'SPADES'}, {'value': 'KING', 'suit': 'HEARTS'}]
         self.assertEqual(calculate_score(hand), 21)
 
     def test_multiple_aces(self):
-        hand = [{'rank': 'A', 'suit': '♠'}, {'rank': 'A', 'suit': '♦'}, {'rank': '9', 'suit': '♥'}]
+        hand = [{'value': 'ACE', 'suit': 'SPADES'}, {'value': 'ACE', 'suit': 'DIAMONDS'}, {'value': '9', 'suit': 'HEARTS'}]
         self.assertEqual(calculate_score(hand), 21)
 
     def test_bust(self):
-        hand = [{'rank': '10', 'suit': '♠'}, {'rank': '9', 'suit': '♦'}, {'rank': '5', 'suit': '♥'}]
+        hand = [{'value': '10', 'suit': 'SPADES'}, {'value': '9', 'suit': 'DIAMONDS'}, {'value': '5', 'suit': 'HEARTS'}]
         self.assertEqual(calculate_score(hand), 24)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
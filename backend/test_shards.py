@@ -0,0 +1,101 @@
+#//backend/test_shards.py
+
+import queue
+import unittest
+
+import app as server
+from app import app, socketio, rooms, players
+from shards import LocalQueue, ShardRouter, shard_for
+
+
+def table_on(shard, count=2, prefix="t"):
+    """First table id ``prefix-N`` owned by ``shard``."""
+    n = 0
+    while shard_for(f"{prefix}-{n}", count) != shard:
+        n += 1
+    return f"{prefix}-{n}"
+
+
+class TestShardFor(unittest.TestCase):
+
+    def test_stable_and_spread(self):
+        self.assertEqual(shard_for("abc", 4), shard_for("abc", 4))
+        counts = [0] * 4
+        for i in range(4000):
+            counts[shard_for(f"table-{i}", 4)] += 1
+        for c in counts:
+            self.assertGreater(c, 800)
+
+    def test_local_queue(self):
+        q = LocalQueue(3)
+        q.shard(0).publish("route", "to-2", shard=2)
+        q.shard(1).publish("socketio", "fanout")
+        self.assertEqual(q.shard(2).get("route", timeout=0), "to-2")
+        self.assertEqual(q.shard(0).get("socketio", timeout=0), "fanout")
+        self.assertEqual(q.shard(2).get("socketio", timeout=0), "fanout")
+        with self.assertRaises(queue.Empty):
+            q.shard(1).get("socketio", timeout=0)
+
+    def test_router_needs_queue(self):
+        with self.assertRaises(ValueError):
+            ShardRouter(0, 2)
+        self.assertTrue(ShardRouter().owns("anything"))
+
+
+class TestRouting(unittest.TestCase):
+
+    def setUp(self):
+        rooms.clear()
+        players.clear()
+        self.queue = LocalQueue(2)
+        self.saved = server.router
+        server.router = ShardRouter(0, 2, self.queue.shard(0))
+        self.client = socketio.test_client(app)
+
+    def tearDown(self):
+        self.client.disconnect()
+        server.router = self.saved
+
+    def run_as_owner(self):
+        """Drain what shard 0 forwarded and run it as shard 1 would."""
+        server.router = ShardRouter(1, 2, self.queue.shard(1))
+        while True:
+            try:
+                server.run_routed(*self.queue.shard(1).get("route", timeout=0))
+            except queue.Empty:
+                break
+
+    def test_local_table_runs_here(self):
+        table_id = table_on(0)
+        self.client.emit("join", {"table_id": table_id, "playerId": "p1", "username": "ann"})
+        self.assertIn(table_id, rooms)
+        self.assertEqual(server.router.forwarded, 0)
+
+    def test_remote_table_is_forwarded(self):
+        table_id = table_on(1)
+        self.client.emit("join", {"table_id": table_id, "playerId": "p1", "username": "ann"})
+        self.client.emit("stay", {"table_id": table_id})
+        self.assertNotIn(table_id, rooms)
+        self.assertEqual(server.router.forwarded, 2)
+        self.assertEqual(list(server.router.remote_seats.values()), [table_id])
+
+        self.run_as_owner()
+        self.assertIn(table_id, rooms)
+        names = [p["name"] for p in self.client.get_received()]
+        self.assertIn("game_state", names)
+        self.assertIn("round_over", names)
+
+    def test_start_game_is_forwarded(self):
+        table_id = table_on(1)
+        response = app.test_client().post("/start-game", json={"table_id": table_id})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.queue.shard(1).get("route", timeout=0)[0], "start_game")
+
+    def test_created_rooms_are_owned_here(self):
+        for _ in range(5):
+            table_id = app.test_client().post("/create-room", json={}).get_json()["table_id"]
+            self.assertTrue(server.router.owns(table_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+#//backend/test_snapshot.py
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import app as app_module
+from app import rooms, players
+from cards import CARDS
+from deck_client import DeckClient, PrefetchDeck
+from deck_provider import RecordedDeck
+from hand import Hand
+from lobby import Lobby
+from shoe import Shoe, SeededShoe
+from snapshot import Snapshotter, encode_table, decode_table, read_snapshot
+from tables import Table
+from test_support import AppTestCase
+
+
+def table_with(deck, table_id="t1"):
+    table = Table(table_id, deck, stakes=5)
+    table.add_seat("p1", "alice", "sid1").bet = 10
+    table.add_seat("p2", "bob", "sid2").pending_bet = 7.5
+    for seat in table.seats.values():
+        seat.hand = Hand(deck.draw(2))
+    table.dealer.hand = Hand(deck.draw(2))
+    table.dealer.score = table.dealer.hand.score
+    table.game_started = True
+    table.current_turn_index = 1
+    table.round = 3
+    table.seq = 42
+    return table
+
+
+class TestSnapshotEncoding(unittest.TestCase):
+
+    def round_trip(self, table, remote_deck=None):
+        copy = decode_table(encode_table(table), remote_deck=remote_deck)
+        self.assertEqual((copy.table_id, copy.stakes, copy.round, copy.seq, copy.game_started,
+                          copy.current_turn_index, copy.turn_order),
+                         (table.table_id, table.stakes, table.round, table.seq, table.game_started,
+                          table.current_turn_index, table.turn_order))
+        self.assertEqual(copy.dealer.hand, table.dealer.hand)
+        self.assertEqual(copy.dealer.score, table.dealer.score)
+        for player_id, seat in table.seats.items():
+            restored = copy.seats[player_id]
+            self.assertEqual((restored.username, restored.bet, restored.pending_bet, restored.hand),
+                             (seat.username, seat.bet, seat.pending_bet, seat.hand))
+            self.assertEqual(restored.hand.score, seat.hand.score)
+            self.assertIsNone(restored.sid)
+        self.assertEqual(copy.by_sid, {})
+        return copy
+
+    def test_shoe_deals_on_from_the_same_card(self):
+        table = table_with(Shoe(2))
+        table.deck.queue_order(list(range(52)) * 2)
+        copy = self.round_trip(table)
+        self.assertEqual(copy.deck.draw(20), table.deck.draw(20))
+        copy.deck.reshuffle()
+        table.deck.reshuffle()
+        self.assertEqual(copy.deck.draw(20), table.deck.draw(20))
+
+    def test_seeded_shoe_keeps_its_rng(self):
+        table = table_with(SeededShoe(7, decks=1))
+        copy = self.round_trip(table)
+        self.assertEqual(copy.deck.seed, 7)
+        for _ in range(3):
+            copy.deck.reshuffle()
+            table.deck.reshuffle()
+            self.assertEqual(copy.deck.draw(52), table.deck.draw(52))
+
+    def test_recorded_deck(self):
+        table = table_with(RecordedDeck(range(10, 30)))
+        copy = self.round_trip(table)
+        self.assertEqual(copy.deck.draw(25), table.deck.draw(25))
+
+    def test_remote_deck_keeps_its_buffer(self):
+        # nothing is fetched: refills are never spawned
+        client = DeckClient("http://127.0.0.1:9")
+        self.addCleanup(client.close)
+        deck = PrefetchDeck(client, decks=1, spawn=lambda fn: None)
+        deck.buffer.extend(CARDS[i] for i in range(20))
+        table = table_with(deck)
+        make = lambda decks, fallback: PrefetchDeck(client, decks, fallback=fallback, spawn=lambda fn: None)
+        copy = self.round_trip(table, make)
+        self.assertEqual(list(copy.deck.buffer), list(deck.buffer))
+        self.assertEqual(copy.deck.fallback.draw(5), deck.fallback.draw(5))
+        self.assertIsInstance(self.round_trip(table).deck, Shoe)
+
+
+class TestSnapshotter(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "tables.snap")
+        self.rooms = {f"t{i}": table_with(Shoe(1), f"t{i}") for i in range(5)}
+        locks = {}
+        self.snapshots = Snapshotter(self.path, self.rooms, lambda t: locks.setdefault(t, threading.RLock()))
+
+    def test_only_changed_tables_are_encoded_again(self):
+        self.assertEqual(self.snapshots.snapshot(), 5)
+        self.assertEqual(self.snapshots.snapshot(), 0)
+        self.rooms["t2"].seats["p1"].bet = 99
+        self.rooms["t2"].touch()
+        del self.rooms["t4"]
+        self.assertEqual(self.snapshots.snapshot(), 1)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+        _, tables = read_snapshot(self.path)
+        self.assertEqual([t.table_id for t in tables], ["t0", "t1", "t2", "t3"])
+        self.assertEqual(tables[2].seats["p1"].bet, 99)
+        self.assertEqual(self.snapshots.stats["tables"], 4)
+
+    def test_table_recreated_under_the_same_id_is_encoded_afresh(self):
+        self.snapshots.snapshot()
+        old = self.rooms["t1"]
+        new = self.rooms["t1"] = Table("t1", Shoe(1))
+        new.version = old.version
+        self.assertEqual(self.snapshots.snapshot(), 1)
+        _, tables = read_snapshot(self.path)
+        self.assertEqual(tables[1].seats, {})
+
+    def test_bad_file_is_refused(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            read_snapshot(self.path)
+
+
+class TestAppRestore(AppTestCase):
+
+    def patches(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        path = os.path.join(self.dir, "tables.snap")
+        self.snapshots = Snapshotter(path, rooms, app_module.table_locks)
+        return {**super().patches(), "SNAPSHOT_PATH": path, "snapshots": self.snapshots, "lobby": Lobby()}
+
+    def test_rejoining_player_reclaims_the_seat_mid_round(self):
+        a = self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        room = rooms["t1"]
+        hand = list(room.seats["pa"].hand)
+        self.assertTrue(room.game_started)
+        self.snapshots.snapshot()
+
+        # a restart: the process comes back with nothing in memory and no sockets
+        self.clients.pop().disconnect()
+        rooms.clear()
+        players.clear()
+        self.assertEqual(app_module.restore_tables(), 1)
+        restored = rooms["t1"]
+        self.assertTrue(restored.game_started)
+        self.assertIsNotNone(restored.timer)
+
+        b = self.client()
+        b.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        self.assertIs(rooms["t1"], restored)
+        self.assertEqual(list(restored.seats["pa"].hand), hand)
+        self.assertEqual(restored.round, 1)
+        [state] = [p["args"][0] for p in b.get_received() if p["name"] == "game_state"]
+        self.assertEqual(len(state["players"]["pa"]["hand"]), len(hand))
+
+        b.emit("stay", {"table_id": "t1"})
+        self.assertFalse(restored.game_started)
+
+    def test_unclaimed_seats_sit_out_and_are_dropped(self):
+        a, b = self.client(), self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        b.emit("join", {"table_id": "t1", "playerId": "pb", "username": "bob"})
+        a.emit("stay", {"table_id": "t1"})
+        b.emit("stay", {"table_id": "t1"})
+        for client in (a, b):
+            client.emit("place_bet", {"table_id": "t1", "bet": 5})
+        for client in (a, b):
+            client.emit("stay", {"table_id": "t1"})
+        self.assertTrue(rooms["t1"].seats["pb"].hand)
+        self.snapshots.snapshot()
+
+        for client in self.clients:
+            client.disconnect()
+        self.clients.clear()
+        rooms.clear()
+        players.clear()
+        pending = len(app_module.timers)
+        app_module.restore_tables()
+        room = rooms["t1"]
+        self.assertEqual(len(app_module.timers), pending + 2)   # restart countdown and seat grace
+
+        a = self.client()
+        a.emit("join", {"table_id": "t1", "playerId": "pa", "username": "alice"})
+        a.emit("place_bet", {"table_id": "t1", "bet": 10})
+        # bob has not come back, so alice's bet is everyone's and she is dealt in alone
+        self.assertTrue(room.game_started)
+        self.assertEqual(room.turn_order, ["pa"])
+        self.assertEqual((len(room.seats["pb"].hand), room.seats["pb"].bet), (0, 0))
+
+        a.get_received()
+        app_module.drop_unclaimed_seats("t1")
+        self.assertEqual(list(room.seats), ["pa"])
+        [left] = [p["args"][0] for p in a.get_received() if p["name"] == "player_left"]
+        self.assertEqual(left["playerId"], "pb")
+
+    def test_no_snapshot_restores_nothing(self):
+        self.assertEqual(app_module.restore_tables(), 0)
+        self.assertEqual(rooms, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
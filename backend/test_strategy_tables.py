@@ -0,0 +1,101 @@
+#//backend/test_strategy_tables.py
+
+import os
+import tempfile
+import unittest
+
+from rules import Rules
+from strategy_tables import StrategyTables, build, dealer_distribution, DEFAULT_PATH
+from app import app, socketio, rooms, players
+from cards import CODE_TO_INDEX, card_from_index
+from hand import Hand
+
+
+class TestStrategyTables(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.dir.name, "strategy.bin")
+        build(path, configs=[(1, False), (6, False), (6, True)])
+        cls.tables = StrategyTables(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tables.close()
+        cls.dir.cleanup()
+
+    def test_dealer_distribution_sums_to_one(self):
+        for upcard in range(2, 12):
+            dist = dealer_distribution(6, upcard, Rules())
+            self.assertAlmostEqual(sum(dist), 1.0)
+        # a six busts the dealer about 42% of the time; only tens and aces can become naturals
+        self.assertAlmostEqual(dealer_distribution(6, 6, Rules())[5], 0.42, places=2)
+        self.assertEqual(dealer_distribution(6, 9, Rules())[6], 0.0)
+        self.assertGreater(dealer_distribution(6, 11, Rules())[6], 0.3)
+
+    def test_h17_only_changes_soft_17(self):
+        s17 = dealer_distribution(6, 6, Rules())
+        h17 = dealer_distribution(6, 6, Rules(hit_soft_17=True))
+        self.assertLess(h17[0], s17[0])
+        self.assertGreater(h17[5], s17[5])
+
+    def test_basic_decisions(self):
+        action = lambda score, soft, up: self.tables.hint(score, soft, up)["action"]
+        self.assertEqual(action(16, False, 10), "hit")
+        self.assertEqual(action(16, False, 6), "stand")
+        self.assertEqual(action(12, False, 5), "stand")
+        self.assertEqual(action(12, False, 2), "hit")
+        self.assertEqual(action(11, False, 11), "hit")
+        self.assertEqual(action(17, False, 11), "stand")
+        self.assertEqual(action(18, True, 9), "hit")
+        self.assertEqual(action(18, True, 7), "stand")
+        self.assertEqual(action(21, True, 10), "stand")
+        self.assertIsNone(self.tables.hint(22, False, 10))
+
+    def test_nearest_config(self):
+        self.assertEqual(self.tables.hint(16, False, 10, decks=8), self.tables.hint(16, False, 10, decks=6))
+        self.assertEqual(self.tables.hint(16, False, 10, decks=2), self.tables.hint(16, False, 10, decks=1))
+        self.assertNotEqual(self.tables.dealer(6, h17=True), self.tables.dealer(6, h17=False))
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.dir.name, "junk.bin")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            StrategyTables(path)
+
+
+@unittest.skipUnless(os.path.exists(DEFAULT_PATH), "strategy.bin not built")
+class TestHintEvent(unittest.TestCase):
+
+    def setUp(self):
+        rooms.clear()
+        players.clear()
+        self.client = socketio.test_client(app)
+        self.client.emit("join", {"table_id": "hint-table", "playerId": "p1", "username": "ann"})
+        self.client.get_received()
+
+    def tearDown(self):
+        self.client.disconnect()
+
+    def test_hint_for_own_hand(self):
+        room = rooms["hint-table"]
+        cards = lambda *codes: Hand(card_from_index(CODE_TO_INDEX[c]) for c in codes)
+        room.seats["p1"].hand = cards("0S", "6H")
+        room.dealer.hand = cards("0D", "7C")
+        self.client.emit("hint", {"table_id": "hint-table"})
+        hints = [p["args"][0] for p in self.client.get_received() if p["name"] == "hint"]
+        self.assertEqual(len(hints), 1)
+        self.assertEqual(hints[0]["action"], "hit")
+        self.assertEqual((hints[0]["score"], hints[0]["upcard"]), (16, 10))
+
+    def test_hint_outside_round(self):
+        rooms["hint-table"].game_started = False
+        self.client.emit("hint", {"table_id": "hint-table"})
+        names = [p["name"] for p in self.client.get_received()]
+        self.assertEqual(names, ["error_message"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#//backend/test_support.py
+
+"""Helpers shared by the test modules: a settable clock, and a base class for
+tests that drive app.py through Socket.IO test clients."""
+
+import unittest
+from unittest import mock
+
+import app as app_module
+from app import app, socketio, rooms, players
+from lifecycle import TableLifecycle
+
+
+class FakeClock:
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class AppTestCase(unittest.TestCase):
+    """Starts each test with empty registries and the module attributes from
+    ``patches()`` swapped into app.py. Clients made with ``client()`` are
+    disconnected and pending deadlines cancelled afterwards."""
+
+    def patches(self):
+        """app.py attributes to replace for the test; the default lifts the
+        per-client table limits, since every test client shares one address."""
+        return {"lifecycle": TableLifecycle(max_per_client=100, create_burst=100)}
+
+    def setUp(self):
+        rooms.clear()
+        players.clear()
+        for name, value in self.patches().items():
+            patcher = mock.patch.object(app_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.disconnect()
+        for room in rooms.values():
+            app_module.timers.cancel(room.timer)
+        rooms.clear()
+
+    def client(self):
+        client = socketio.test_client(app)
+        self.clients.append(client)
+        return client
+
+    def received(self, client, event):
+        """Payloads of ``event`` that ``client`` got since the last call."""
+        return [p["args"][0] for p in client.get_received() if p["name"] == event]
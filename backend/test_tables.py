@@ -0,0 +1,76 @@
+#//backend/test_tables.py
+
+import json
+import unittest
+import encoded
+import game_state
+from hand import Hand
+from tables import Table, SNAPSHOT_STATS
+
+
+class TestTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = Table("t1", deck=None)
+        self.ann = self.table.add_seat("p1", "ann", "s1")
+        self.bob = self.table.add_seat("p2", "bob", "s2")
+
+    def test_indexes(self):
+        self.assertEqual(list(self.table.seats), ["p1", "p2"])
+        self.assertIs(self.table.by_sid["s2"], self.bob)
+        self.assertEqual(self.table.turn_order, ["p1", "p2"])
+        with self.assertRaises(AttributeError):
+            self.ann.nickname = "x"
+
+    def test_rejoin_moves_seat_to_new_sid(self):
+        self.ann.hand.append({"value": "KING", "suit": "HEARTS"})
+        seat = self.table.add_seat("p1", "ann", "s9")
+        self.assertIs(seat, self.ann)
+        self.assertNotIn("s1", self.table.by_sid)
+        self.assertEqual(len(seat.hand), 1)
+        self.assertEqual(self.table.turn_order, ["p1", "p2"])
+
+    def test_remove_seat(self):
+        self.assertIs(self.table.remove_seat("s1"), self.ann)
+        self.assertIsNone(self.table.remove_seat("s1"))
+        self.assertEqual(list(self.table.seats), ["p2"])
+
+    def test_pending_bets(self):
+        self.ann.pending_bet = 10
+        self.assertEqual(self.table.bets_placed(), 1)
+        # the bet_placed delta's pending_bet matches what a resync snapshot shows
+        self.assertEqual((self.ann.view()["bet"], self.ann.view()["pending_bet"]), (0, 10))
+
+    def test_state_cached_until_version_moves(self):
+        misses = SNAPSHOT_STATS["miss"]
+        first = self.table.state()
+        self.assertIs(self.table.state(), first)
+        self.assertEqual(first.data["players"]["p1"], {"username": "ann", "hand": [], "score": 0, "bet": 0,
+                                                        "pending_bet": None, "result": None})
+        self.assertEqual(json.loads(first.text), first.data)
+        game_state.make_delta(self.table, playerId="p1", bet=10)
+        second = self.table.state()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.data["seq"], 1)
+        self.assertEqual(SNAPSHOT_STATS["miss"] - misses, 2)
+
+    def test_hidden_and_revealed_views(self):
+        self.table.dealer.hand = Hand([{"value": "KING", "suit": "HEARTS"}, {"value": "9", "suit": "CLUBS"}])
+        self.table.game_started = True
+        self.table.touch()
+        hidden = self.table.state()
+        self.assertEqual(hidden.data["dealer"]["score"], "?")
+        revealed = self.table.state(reveal=True)
+        self.assertEqual(revealed.data["dealer"]["score"], 19)
+        self.assertIs(self.table.state(), hidden)
+        self.assertIs(self.table.state(reveal=True), revealed)
+
+    def test_encoded_payload_spliced_into_packets(self):
+        snapshot = self.table.state()
+        text = encoded.dumps(["game_state", snapshot], separators=(",", ":"))
+        self.assertEqual(json.loads(text), ["game_state", snapshot.data])
+        self.assertEqual(encoded.dumps({"a": 1}), json.dumps({"a": 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#//backend/test_timers.py
+
+import random
+import unittest
+
+import app as app_module
+from app import rooms
+from test_support import AppTestCase, FakeClock
+from timers import TimerWheel
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.wheel = TimerWheel(tick=0.05, clock=self.clock)
+        self.fired = []
+
+    def at(self, seconds):
+        self.clock.now = 1000.0 + seconds
+        self.wheel.advance()
+
+    def test_fires_once_when_due(self):
+        self.wheel.schedule(1.0, self.fired.append, "a")
+        self.at(0.95)
+        self.assertEqual(self.fired, [])
+        self.at(1.0)
+        self.at(5.0)
+        self.assertEqual(self.fired, ["a"])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        timer = self.wheel.schedule(1.0, self.fired.append, "a")
+        self.assertTrue(self.wheel.cancel(timer))
+        self.assertFalse(self.wheel.cancel(timer))
+        self.assertFalse(timer.active)
+        self.at(2.0)
+        self.assertEqual((self.fired, len(self.wheel)), ([], 0))
+
+    def test_never_early_across_every_level(self):
+        wheel = TimerWheel(tick=1.0, clock=self.clock)      # whole seconds keep the longest delays quick to walk
+        rng = random.Random(7)
+        delays = {}
+        for i in range(5000):
+            delay = rng.choice((rng.uniform(0, 200), rng.uniform(0, 10_000), rng.uniform(0, 300_000), rng.uniform(0, 2e6)))
+            delays[i] = delay
+            wheel.schedule(delay, lambda i=i: self.fired.append((i, self.clock.now - 1000.0)))
+        elapsed = 0.0
+        while wheel:
+            elapsed += rng.uniform(0, 3) if elapsed < 1200 else rng.uniform(0, 5000)
+            self.clock.now = 1000.0 + elapsed
+            wheel.advance()
+        self.assertEqual(sorted(i for i, _ in self.fired), list(range(5000)))
+        self.assertTrue(all(at >= delays[i] for i, at in self.fired))
+        # due timers are never held back by more than a tick plus the step that passed them
+        self.assertTrue(all(at - delays[i] <= 4 for i, at in self.fired if delays[i] < 1000))
+
+    def test_callbacks_may_schedule(self):
+        def again(n):
+            self.fired.append(n)
+            if n < 3:
+                self.wheel.schedule(0.1, again, n + 1)
+        self.wheel.schedule(0.1, again, 1)
+        for step in range(1, 20):
+            self.at(step * 0.05)
+        self.assertEqual(self.fired, [1, 2, 3])
+
+    def test_failing_callback_does_not_stop_the_others(self):
+        self.wheel.schedule(0.1, lambda: 1 / 0)
+        self.wheel.schedule(0.1, self.fired.append, "ok")
+        self.at(0.2)
+        self.assertEqual(self.fired, ["ok"])
+
+
+class TestTableDeadlines(AppTestCase):
+
+    def patches(self):
+        self.clock = FakeClock(1000.0)
+        return {**super().patches(), "timers": TimerWheel(tick=0.05, clock=self.clock), "TURN_TIMEOUT": 30.0,
+                "RESTART_DELAY": 5.0, "BETTING_WINDOW": 15.0}
+
+    def setUp(self):
+        super().setUp()
+        self.a, self.b = self.client(), self.client()
+        self.a.emit("join", {"table_id": "afk", "playerId": "pa", "username": "a"})
+        self.b.emit("join", {"table_id": "afk", "playerId": "pb", "username": "b"})
+        self.room = rooms["afk"]
+
+    def wait(self, seconds):
+        self.clock.now += seconds
+        app_module.timers.advance()
+
+    def test_afk_players_time_out_and_the_table_moves_on(self):
+        # the first seat was dealt a solo round on join, and the second joined its turn order
+        self.assertTrue(self.room.game_started)
+        self.assertEqual(self.room.turn_order, ["pa", "pb"])
+
+        self.wait(29)
+        self.assertEqual(self.room.current_turn_index, 0)
+        self.wait(1)
+        self.assertEqual(self.room.current_turn_index, 1)
+        self.wait(30)
+        self.assertFalse(self.room.game_started)
+
+        self.b.emit("place_bet", {"table_id": "afk", "bet": 5})     # during the restart countdown
+        self.wait(5)
+        self.assertEqual([len(seat.hand) for seat in self.room.seats.values()], [0, 0])
+        self.assertIn("countdown", [packet["name"] for packet in self.a.get_received()])
+
+        self.wait(15)
+        self.assertTrue(self.room.game_started)
+        self.assertEqual(self.room.seats["pb"].bet, 5)
+        # pa never bet, so sits this round out
+        self.assertEqual(self.room.turn_order, ["pb"])
+        self.assertEqual((len(self.room.seats["pa"].hand), self.room.seats["pa"].bet), (0, 0))
+
+    def test_an_action_resets_the_turn_deadline(self):
+        self.wait(20)
+        self.a.emit("stay", {"table_id": "afk"})
+        self.wait(20)
+        self.assertEqual(self.room.current_turn_index, 1)
+        self.wait(10)
+        self.assertFalse(self.room.game_started)
+
+    def test_a_deadline_armed_for_an_earlier_turn_does_nothing(self):
+        armed = app_module.timer_token(self.room)
+        self.a.emit("stay", {"table_id": "afk"})
+        # pb's deadline came due, and pa's stale one takes the lock first
+        app_module.timers.cancel(self.room.timer)
+        app_module.run_timer("afk", app_module.turn_timed_out, armed)
+        self.assertEqual(self.room.current_turn_index, 1)
+        app_module.run_timer("afk", app_module.turn_timed_out, app_module.timer_token(self.room))
+        self.assertFalse(self.room.game_started)
+
+    def test_restart_snapshot_takes_the_next_seq(self):
+        self.wait(30)
+        self.wait(30)
+        seq = self.room.seq
+        self.a.get_received()
+        self.wait(5)
+        [state] = [p["args"][0] for p in self.a.get_received() if p["name"] == "game_state"]
+        self.assertEqual(state["seq"], seq + 1)
+
+    def test_nobody_bets_and_the_table_waits(self):
+        self.wait(30)
+        self.wait(30)
+        self.wait(5)
+        self.wait(15)
+        self.assertFalse(self.room.game_started)
+        self.assertIsNone(self.room.timer)
+        self.assertEqual(len(app_module.timers), 0)
+
+        # a late bet opens a new window rather than waiting on the AFK seat forever
+        self.b.emit("place_bet", {"table_id": "afk", "bet": 5})
+        self.assertIsNotNone(self.room.timer)
+        self.wait(15)
+        self.assertTrue(self.room.game_started)
+        self.assertEqual(self.room.turn_order, ["pb"])
+
+
+if __name__ == '__main__':
+    unittest.main()
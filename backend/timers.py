@@ -0,0 +1,151 @@
+# //backend/timers.py
+
+"""Hierarchical timer wheel for per-table deadlines.
+
+Turn timeouts, betting windows and restart countdowns all go through one
+``TimerWheel`` and one background task (``run``) instead of a sleeping
+task per table. Scheduling and cancelling are O(1): a timer goes into a
+set, picked by its expiry tick, and cancelling removes it from that set.
+Every tick the task fires the timers in the current slot of the first
+level.
+
+Time is counted in ticks of ``tick`` seconds. The first level has one slot
+per tick for the next 256 ticks. Each further level has 64 slots, each
+covering a whole turn of the level below. When the first level wraps, the
+next level's current slot is cascaded down and re-placed by its remaining
+delay, like the classic Linux kernel timer wheel. With the default 50 ms
+tick the levels reach about 12.8 s, 13.6 min, 14.6 h and 38.8 days; later
+deadlines wait in the last level and cascade until they fit.
+
+Callbacks run in the task that calls ``advance``, outside the wheel's lock,
+so they may schedule and cancel timers. A timer is never early, and is late
+by at most one tick plus however long earlier callbacks took.
+"""
+
+import math
+import threading
+import time
+
+import logs
+
+log = logs.get_logger("timers")
+
+# slots per level; level 0 is one tick per slot
+LEVELS = (256, 64, 64, 64)
+
+
+class Timer:
+    __slots__ = ("expires", "callback", "args", "bucket")
+
+    def __init__(self, expires, callback, args):
+        self.expires = expires      # tick
+        self.callback = callback
+        self.args = args
+        self.bucket = None          # the slot it waits in; None once fired or cancelled
+
+    @property
+    def active(self):
+        return self.bucket is not None
+
+
+class TimerWheel:
+
+    def __init__(self, tick=0.05, clock=time.monotonic):
+        self.tick = tick
+        self.clock = clock
+        self.fired = 0
+        self._origin = clock()
+        self._tick = 0              # next tick to process
+        self._count = 0
+        self._lock = threading.Lock()
+        self._levels = [[set() for _ in range(size)] for size in LEVELS]
+        self._shifts = []
+        shift = 0
+        for size in LEVELS:
+            self._shifts.append(shift)
+            shift += size.bit_length() - 1
+        self._span = 1 << shift     # ticks the whole wheel covers
+
+    def __len__(self):
+        return self._count
+
+    def _place(self, timer):
+        # caller holds the lock
+        expires = timer.expires
+        delta = expires - self._tick
+        if delta >= self._span:
+            expires = self._tick + self._span - 1
+        for level, shift in enumerate(self._shifts):
+            size = LEVELS[level]
+            if delta < size << shift or level == len(LEVELS) - 1:
+                bucket = self._levels[level][(expires >> shift) & (size - 1)]
+                break
+        bucket.add(timer)
+        timer.bucket = bucket
+
+    def schedule(self, delay, callback, *args):
+        """Call ``callback(*args)`` once ``delay`` seconds have passed."""
+        with self._lock:
+            expires = max(self._tick, math.ceil((self.clock() - self._origin + delay) / self.tick))
+            timer = Timer(expires, callback, args)
+            self._place(timer)
+            self._count += 1
+        return timer
+
+    def cancel(self, timer):
+        """Stop ``timer`` if it has not fired. Returns whether it was pending."""
+        if timer is None:
+            return False
+        with self._lock:
+            if timer.bucket is None:
+                return False
+            timer.bucket.discard(timer)
+            timer.bucket = None
+            self._count -= 1
+            return True
+
+    def _cascade(self, tick):
+        for level in range(1, len(LEVELS)):
+            index = (tick >> self._shifts[level]) & (LEVELS[level] - 1)
+            bucket = self._levels[level][index]
+            if bucket:
+                moving = list(bucket)
+                bucket.clear()
+                for timer in moving:
+                    self._place(timer)
+            if index:
+                break
+
+    def advance(self, now=None):
+        """Fire every timer due by ``now`` (default: the clock). Returns how many fired."""
+        now = self.clock() if now is None else now
+        target = int((now - self._origin) / self.tick)
+        due = []
+        with self._lock:
+            slots = self._levels[0]
+            mask = LEVELS[0] - 1
+            while self._tick <= target:
+                tick = self._tick
+                if tick & mask == 0 and tick:
+                    self._cascade(tick)
+                bucket = slots[tick & mask]
+                if bucket:
+                    due.extend(bucket)
+                    bucket.clear()
+                self._tick += 1
+            for timer in due:
+                timer.bucket = None
+            self._count -= len(due)
+        for timer in due:
+            try:
+                timer.callback(*timer.args)
+            except Exception:
+                log.exception("timer callback failed", callback=getattr(timer.callback, "__name__", None))
+        self.fired += len(due)
+        return len(due)
+
+    def run(self, sleep=time.sleep):
+        """Advance once per tick, forever. Run it as a background task."""
+        while True:
+            sleep(self.tick)
+            self.advance()
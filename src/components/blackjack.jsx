@@ -5,6 +5,7 @@ import React, { useEffect, useState, useCallback, useRef} from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { BACKEND_URL } from '../config';
 import socket from '../socket';
+import { DELTA_EVENTS, applyDelta } from '../gamedelta';
 import DealerHand from './dealerhand';
 import Controls from './controls';
 import TableSeats from './tableseats';
@@ -27,16 +28,26 @@ export default function BlackjackGame({ username, playerId }) {
   const [betAmount, setBetAmount] = useState(10);
   const [betLocked, setBetLocked] = useState(false);
   const [joined, setJoined] = useState(false);
+  const [hint, setHint] = useState(null);
 
   const hasJoinedRef = useRef(false);
+  const stateRef = useRef(null);
+  const resyncPendingRef = useRef(false);
 
   /** Handles incoming game state from the server */
   const handleGameState = useCallback((state) => {
+    stateRef.current = state;
     setGameState(state);
 
     const player = state?.players?.[playerIdStr] || null;
     setPlayerCards(player?.hand || []);
 
+    // our bet_placed may have been folded into this snapshot: unlock once the
+    // server has the bet, or the round it was for has started
+    if (player?.pending_bet != null || state.game_over === false) {
+      setBetLocked(false);
+    }
+
     // Dealer hand
     if (state.reveal_dealer_hand) {
       setDealerCards([...(state.dealer?.hand || [])]);
@@ -87,16 +98,36 @@ export default function BlackjackGame({ username, playerId }) {
       alert("Room does not exist.");
       navigate("/");
     });
-    socket.on('game_state', handleGameState);
+    const handleSnapshot = (state) => {
+      resyncPendingRef.current = false;
+      handleGameState(state);
+    };
+    socket.on('game_state', handleSnapshot);
+
+    // Deltas must arrive in seq order; on a gap ask the server for a full snapshot
+    const deltaHandlers = DELTA_EVENTS.map((type) => {
+      const handler = (delta) => {
+        const prev = stateRef.current;
+        if (prev && delta.seq === prev.seq + 1) {
+          handleGameState(applyDelta(prev, type, delta));
+        } else if ((!prev || delta.seq > prev.seq) && !resyncPendingRef.current) {
+          resyncPendingRef.current = true;
+          socket.emit('resync', { table_id: tableId });
+        }
+      };
+      socket.on(type, handler);
+      return [type, handler];
+    });
 
     return () => {
       socket.off('connect');
       socket.off('connect_error');
       socket.off('disconnect');
       socket.off('room_not_found');
-      socket.off('game_state', handleGameState);
+      socket.off('game_state', handleSnapshot);
+      deltaHandlers.forEach(([type, handler]) => socket.off(type, handler));
     };
-  }, [handleGameState, navigate]);
+  }, [handleGameState, navigate, tableId]);
 
   /** Join table logic */
   useEffect(() => {
@@ -154,6 +185,18 @@ export default function BlackjackGame({ username, playerId }) {
     return () => socket.off('bet_placed', handleBetPlaced);
   }, [playerIdStr]);
 
+  /** Hint listener: the server answers only the player who asked */
+  useEffect(() => {
+    const handleHint = (data) => setHint(data);
+    socket.on('hint', handleHint);
+    return () => socket.off('hint', handleHint);
+  }, []);
+
+  // a hint is only good for the hand it was asked about
+  useEffect(() => {
+    setHint(null);
+  }, [playerCards, dealerCards]);
+
   /** Game control functions */
   const startGame = async () => {
     if (!tableId || !playerIdStr || !joined) {
@@ -179,6 +222,10 @@ export default function BlackjackGame({ username, playerId }) {
     socket.emit('hit', { table_id: tableId, playerId: playerIdStr });
   };
 
+  const askHint = () => {
+    socket.emit('hint', { table_id: tableId, playerId: playerIdStr });
+  };
+
   const stay = () => {
     socket.emit('stay', { table_id: tableId, playerId: playerIdStr });
   };
@@ -221,9 +268,10 @@ export default function BlackjackGame({ username, playerId }) {
     const player = gameState.players[playerIdStr];
     if (!player?.result) return "Game over. Check results!";
     switch (player.result) {
-      case "win": return "You won! 🎉";
-      case "lose": return "You lost. 😞";
-      case "push": return "Push (tie). 🤝";
+      case "Win": return "You won! 🎉";
+      case "Lose": return "You lost. 😞";
+      case "Lose (bust)": return "Bust. You lost. 😞";
+      case "Push": return "Push (tie). 🤝";
       default: return "Game over. Check results!";
     }
   };
@@ -286,6 +334,8 @@ export default function BlackjackGame({ username, playerId }) {
                   onDeal={startGame}
                   onHit={hit}
                   onStay={stay}
+                  onHint={askHint}
+                  hint={hint}
                   onReset={() => navigate(`/table/${tableId}`)}
                   disabled={!playerTurn || gameOver}
                   gameOver={gameOver}
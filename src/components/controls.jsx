@@ -8,6 +8,8 @@ export default function Controls({
   onDeal,
   onHit,
   onStay,
+  onHint,
+  hint,
   disabled,
   gameOver,
   canDeal
@@ -17,6 +19,12 @@ export default function Controls({
       <button onClick={onDeal} disabled={!canDeal}>Deal</button>
       <button onClick={onHit} disabled={disabled || gameOver}>Hit</button>
       <button onClick={onStay} disabled={disabled || gameOver}>Stay</button>
+      <button onClick={onHint} disabled={disabled || gameOver}>Hint</button>
+      {hint && (
+        <span className="hint">
+          Suggested: {hint.action === 'hit' ? 'Hit' : 'Stay'}
+        </span>
+      )}
     </div>
   );
 }
@@ -11,14 +11,20 @@ function GlobalChat({ username }) {
   const chatEndRef = useRef(null);
 
   useEffect(() => {
-    socket.on("chat_message", (data) => {
-      if (data.isglobal) {
-        setChatLog((prev) => [...prev, data]);
-      }
-    });
+    const handleBatch = (data) => {
+      const global = (data.messages || []).filter((msg) => msg.isglobal);
+      if (global.length) setChatLog((prev) => [...prev, ...global]);
+    };
+    // recent global messages, sent on connect
+    const handleHistory = (data) => {
+      if (data.table_id === null) setChatLog(data.messages || []);
+    };
 
+    socket.on("chat_batch", handleBatch);
+    socket.on("chat_history", handleHistory);
     return () => {
-      socket.off("chat_message");
+      socket.off("chat_batch", handleBatch);
+      socket.off("chat_history", handleHistory);
     };
   }, []);
 
@@ -37,13 +43,6 @@ function GlobalChat({ username }) {
       isGlobal: true,
     });
 
-    // RECIEVE
-    socket.on("chat_message", (data) => {
-      if (data.isGlobal) {
-        setChatLog((prev) => [...prev, data]);
-      }
-    });
-
     setMessage("");
   };
 
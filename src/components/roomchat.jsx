@@ -24,17 +24,34 @@ const RoomChat = ({ socket, tableId, playerId, username }) => {
       return;
     }
 
-    const handleMessage = (data) => {
-      console.log("[RoomChat] Received chat_message:", data);
-      if (data.isglobal) return; // Skip global messages
-      if (tableId && data.tableId !== tableId) return;
-      console.log("Local tableId:", tableId, "Message tableId:", data.tableId);
-      if (!tableId && data.tableId) return;
-      setMessages((prev) => [...prev, data]);
+    // messages arrive in batches; keep this table's, skip global ones
+    const forTable = (messages) =>
+      messages.filter((msg) => !msg.isglobal && (tableId ? msg.tableId === tableId : !msg.tableId));
+
+    const handleBatch = (data) => {
+      const mine = forTable(data.messages || []);
+      if (mine.length) setMessages((prev) => [...prev, ...mine]);
+    };
+
+    // recent messages, sent once when joining the table
+    const handleHistory = (data) => {
+      if (data.table_id !== tableId) return;
+      setMessages(forTable(data.messages || []));
     };
 
+    // System lines come one at a time, in order with the game events
+    const handleMessage = (msg) => {
+      if (forTable([msg]).length) setMessages((prev) => [...prev, msg]);
+    };
+
+    socket.on("chat_batch", handleBatch);
+    socket.on("chat_history", handleHistory);
     socket.on("chat_message", handleMessage);
-    return () => socket.off("chat_message", handleMessage);
+    return () => {
+      socket.off("chat_batch", handleBatch);
+      socket.off("chat_history", handleHistory);
+      socket.off("chat_message", handleMessage);
+    };
   }, [socket, tableId]);
 
   const sendMessage = () => {
@@ -51,6 +68,7 @@ const RoomChat = ({ socket, tableId, playerId, username }) => {
     }
 
     socket.emit("chat_message", {
+      table_id: tableId,
       tableId,
       playerId,
       username,
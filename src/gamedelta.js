@@ -0,0 +1,82 @@
+// src/gamedelta.js
+
+// Delta events the backend sends between full game_state snapshots.
+// Each carries a seq number; see backend/game_state.py for the payloads.
+export const DELTA_EVENTS = [
+  "player_joined",
+  "player_left",
+  "bet_placed",
+  "round_started",
+  "card_dealt",
+  "turn_changed",
+  "round_over",
+];
+
+/** Returns the next game state after applying one delta event. */
+export function applyDelta(state, type, delta) {
+  const players = { ...(state.players || {}) };
+  let next = { ...state };
+
+  switch (type) {
+    case "player_joined":
+      players[delta.playerId] = delta.player;
+      next.players = players;
+      break;
+    case "player_left":
+      delete players[delta.playerId];
+      next.players = players;
+      break;
+    case "bet_placed":
+      if (players[delta.playerId]) {
+        // the stake for the next round; "bet" stays the current round's
+        players[delta.playerId] = { ...players[delta.playerId], pending_bet: delta.pending_bet };
+      }
+      next.players = players;
+      break;
+    case "round_started":
+      next = {
+        ...next,
+        dealer: delta.dealer,
+        players: delta.players,
+        turn: delta.turn,
+        reveal_dealer_hand: false,
+        reveal_hands: false,
+        game_over: false,
+      };
+      break;
+    case "card_dealt": {
+      const player = players[delta.playerId];
+      if (player) {
+        players[delta.playerId] = {
+          ...player,
+          hand: [...(player.hand || []), delta.card],
+          score: delta.score,
+        };
+      }
+      next.players = players;
+      break;
+    }
+    case "turn_changed":
+      next.turn = delta.turn;
+      break;
+    case "round_over":
+      for (const [playerId, result] of Object.entries(delta.results || {})) {
+        if (players[playerId]) players[playerId] = { ...players[playerId], result };
+      }
+      next = {
+        ...next,
+        dealer: delta.dealer,
+        players,
+        turn: null,
+        reveal_dealer_hand: true,
+        reveal_hands: true,
+        game_over: true,
+      };
+      break;
+    default:
+      return state;
+  }
+
+  next.seq = delta.seq;
+  return next;
+}